@@ -1,20 +1,27 @@
-"""Agent module initialization."""
-from agents.base_agent import BaseAgent
-from agents.planner_agent import PlannerAgent
-from agents.executor_agent import ExecutorAgent
-from agents.web_research_agent import WebResearchAgent
-from agents.chart_generator_agent import ChartGeneratorAgent
-from agents.chart_summarizer_agent import ChartSummarizerAgent
-from agents.synthesizer_agent import SynthesizerAgent
-from agents.supervisor_agent import SupervisorAgent
+"""Agent module initialization.
 
-__all__ = [
-    "BaseAgent",
-    "PlannerAgent",
-    "ExecutorAgent",
-    "WebResearchAgent",
-    "ChartGeneratorAgent",
-    "ChartSummarizerAgent",
-    "SynthesizerAgent",
-    "SupervisorAgent",
-]
+Agent classes are imported on first attribute access so that importing the
+package does not pull in the LLM client libraries.
+"""
+import importlib
+
+_AGENT_MODULES = {
+    "BaseAgent": "agents.base_agent",
+    "PlannerAgent": "agents.planner_agent",
+    "ExecutorAgent": "agents.executor_agent",
+    "WebResearchAgent": "agents.web_research_agent",
+    "ChartGeneratorAgent": "agents.chart_generator_agent",
+    "ChartSummarizerAgent": "agents.chart_summarizer_agent",
+    "SynthesizerAgent": "agents.synthesizer_agent",
+    "SupervisorAgent": "agents.supervisor_agent",
+}
+
+__all__ = list(_AGENT_MODULES)
+
+
+def __getattr__(name):
+    if name not in _AGENT_MODULES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_AGENT_MODULES[name]), name)
+    globals()[name] = value
+    return value
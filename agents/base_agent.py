@@ -1,9 +1,21 @@
 """Base agent class for all agents in the system."""
+import os
+import time
 import logging
-from typing import Any, Dict, Literal
+import dataclasses
+from typing import Any, Callable, Dict, Iterator, List, Literal, Optional, Tuple
 from abc import ABC, abstractmethod
+from contextlib import contextmanager
 from langgraph.types import Command
-from langchain.schema import HumanMessage
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+import deadlines
+import memory
+import metrics
+import tracing
+from log_utils import payload
+from state import estimate_tokens
+from config import DEADLINE_RESERVE_S, LLM_TIMEOUT_S, MEMORY_PROFILING, PROFILE_NODES
 
 logger = logging.getLogger(__name__)
 
@@ -11,37 +23,186 @@ logger = logging.getLogger(__name__)
 class BaseAgent(ABC):
     """Base class for all agents."""
     
+    # Agents that still run when the deadline is near (they produce the answer)
+    RUNS_PAST_DEADLINE = ("synthesizer",)
+    
     def __init__(self, name: str):
         self.name = name
         self.logger = logging.getLogger(f"agents.{name}")
+        # profiling (and pyinstrument) is only imported when some node is profiled
+        if os.getenv("AGENT_PROFILE", ",".join(PROFILE_NODES)).strip(", "):
+            import profiling
+            if profiling.enabled_for(name):
+                self.invoke = profiling.profiled(self.invoke, name)
+    
+    def __call__(self, state: Dict[str, Any]) -> Command:
+        """
+        Graph node entry point: run the agent in a trace span under the query's deadline.
+        
+        Binds the state's deadline for the LLM and tool calls made by the
+        agent, and hands over to the synthesizer instead of running when
+        less than DEADLINE_RESERVE_S is left. Records the node's latency
+        (and errors) in metrics.
+        """
+        with self.node_run(state, self.name) as span:
+            left = deadlines.remaining(state.get("deadline"))
+            if left is not None and left < DEADLINE_RESERVE_S and self.name not in self.RUNS_PAST_DEADLINE:
+                if span:
+                    span.set(skipped_for_deadline=True)
+                return self.finish_early(state, left)
+            if MEMORY_PROFILING:
+                return self.invoke_measured(state, span)
+            return self.invoke(state)
+    
+    @contextmanager
+    def node_run(self, state: Dict[str, Any], node: str) -> Iterator[Optional[tracing.Span]]:
+        """
+        Run a graph node's work under the query's deadline, in a trace span, recorded in the node metrics.
+        
+        Args:
+            state: Graph state holding the deadline
+            node: Node name for the span and the metrics
+        
+        Yields:
+            The node's span (None when tracing is off)
+        """
+        token = deadlines.bind(state.get("deadline"))
+        started = time.perf_counter()
+        try:
+            with tracing.span(f"node:{node}", node=node, step=state.get("current_step")) as span:
+                yield span
+        except Exception:
+            metrics.NODE_ERRORS.inc(node=node)
+            raise
+        finally:
+            metrics.NODE_DURATION.observe(time.perf_counter() - started, node=node)
+            deadlines.reset(token)
+    
+    def invoke_measured(self, state: Dict[str, Any], span: Optional[tracing.Span]) -> Command:
+        """Run invoke() under memory instrumentation and record the result on the span and in the state."""
+        with memory.NodeMemory(state) as measurement:
+            command = self.invoke(state)
+        update = command.update if isinstance(command.update, dict) else {}
+        record = measurement.record(self.name, update)
+        self.logger.info("[%s] Memory: RSS %+.2f MB, allocated %+.1f KB", self.name.upper(),
+                         record["rss_delta_mb"], record["allocated_kb"])
+        if span:
+            span.set(**{f"memory.{key}": value for key, value in record.items() if key != "node"})
+        return dataclasses.replace(command, update={**update, "memory_stats": [record]})
+    
+    def finish_early(self, state: Dict[str, Any], left: float) -> Command:
+        """Skip this agent and let the synthesizer answer from the outputs gathered so far."""
+        self.logger.warning("[%s] %.0fs left before the deadline; skipping to synthesis", self.name.upper(), left)
+        # Next to the synthesizer in the parallel finish, only the join is left to reach
+        goto = "join" if state.get("parallel_finish") else "synthesizer"
+        return Command(
+            update={
+                "partial": True,
+                "last_reason": f"Deadline reached before {self.name} ran",
+            },
+            goto=goto,
+        )
+    
+    def call_llm(self, llm, messages):
+        """Invoke a chat model with a timeout capped by the query deadline."""
+        return llm.invoke(messages, timeout=deadlines.budget(LLM_TIMEOUT_S))
+    
+    @staticmethod
+    def react_model(llm, tools: List[Any]) -> Callable[[Dict[str, Any], Any], Any]:
+        """
+        Model of a ReAct sub-agent whose calls get a timeout capped by the query deadline, like call_llm.
+        
+        create_react_agent calls it before every model step, so each call
+        gets what is left of the deadline at that point.
+        
+        Args:
+            llm: Chat model of the agent
+            tools: Tools the sub-agent may call
+        
+        Returns:
+            Dynamic model for create_react_agent
+        """
+        model = llm.bind_tools(tools) if tools else llm
+        return lambda state, runtime: model.bind(timeout=deadlines.budget(LLM_TIMEOUT_S))
+    
+    def run_react(self, agent, agent_input: Dict[str, Any], config: Optional[Dict[str, Any]] = None) -> Tuple[Dict[str, Any], bool]:
+        """
+        Run a ReAct sub-agent step by step, stopping early when the deadline is near.
+        
+        Args:
+            agent: Compiled sub-agent graph
+            agent_input: Input state of the sub-agent
+            config: Optional run config (e.g. recursion_limit)
+        
+        Returns:
+            Final (or last reached) sub-agent state, and True if it was cut short
+        """
+        values: Dict[str, Any] = {"messages": []}
+        for values in agent.stream(agent_input, config, stream_mode="values"):
+            left = deadlines.remaining(deadlines.current())
+            if left is not None and left < DEADLINE_RESERVE_S:
+                self.logger.warning("[%s] Stopping tool loop, %.0fs left before the deadline", self.name.upper(), left)
+                return values, True
+        return values, False
+    
+    @staticmethod
+    def react_output(result: Dict[str, Any], cut_short: bool, fallback: str = "") -> str:
+        """
+        Return the output of a ReAct sub-agent run.
+        
+        Args:
+            result: Sub-agent state returned by run_react
+            cut_short: run_react stopped the loop at the deadline
+            fallback: Output when a cut-short loop produced nothing yet
+        
+        Returns:
+            The final answer; for a loop cut short, the latest model or tool
+            output (usually raw tool results), never the input messages
+        """
+        if not cut_short:
+            return result["messages"][-1].content
+        return next((str(msg.content) for msg in reversed(result.get("messages", []))
+                     if isinstance(msg, (AIMessage, ToolMessage)) and msg.content), fallback)
     
     def log_entry(self):
         """Log agent entry."""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         self.logger.info("=" * 80)
-        self.logger.info(f"[{self.name.upper()}] ========== ENTER ==========")
+        self.logger.info("[%s] ========== ENTER ==========", self.name.upper())
         self.logger.info("=" * 80)
     
     def log_exit(self):
         """Log agent exit."""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
         self.logger.info("=" * 80)
-        self.logger.info(f"[{self.name.upper()}] ========== EXIT ==========")
+        self.logger.info("[%s] ========== EXIT ==========", self.name.upper())
         self.logger.info("=" * 80)
     
     def log_state(self, state: Dict[str, Any]):
-        """Log state summary."""
-        self.logger.info(f"[{self.name.upper()}] STATE SUMMARY:")
-        self.logger.info(f"  - user_query: {state.get('user_query', 'N/A')}")
-        self.logger.info(f"  - current_step: {state.get('current_step', 'N/A')}")
-        self.logger.info(f"  - replan_flag: {state.get('replan_flag', False)}")
-        self.logger.info(f"  - agent_query: {state.get('agent_query', 'N/A')}")
-        self.logger.info(f"  - message_count: {len(state.get('messages', []))}")
+        """Log state summary and per-channel sizes (skipped entirely, estimates included, when INFO is off)."""
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        self.logger.info("[%s] STATE SUMMARY:", self.name.upper())
+        self.logger.info("  - user_query: %s", payload(state.get('user_query', 'N/A'), limit=200))
+        self.logger.info("  - current_step: %s", state.get('current_step', 'N/A'))
+        self.logger.info("  - replan_flag: %s", state.get('replan_flag', False))
+        self.logger.info("  - agent_query: %s", payload(state.get('agent_query', 'N/A'), limit=200))
+        messages = state.get('messages', [])
+        self.logger.info("  - state_size: %d messages, ~%d tokens", len(messages), estimate_tokens(messages))
+        # Checkpoint-format size of every channel, largest first
+        sizes = sorted(memory.channel_sizes(state).items(), key=lambda item: -item[1])
+        self.logger.info("  - channel_bytes: %s", ", ".join(f"{name}={size}" for name, size in sizes))
     
     def log_command(self, command: Command):
         """Log command output."""
-        self.logger.info(f"[{self.name.upper()}] COMMAND OUTPUT:")
-        self.logger.info(f"  - goto: {command.goto}")
+        if not self.logger.isEnabledFor(logging.INFO):
+            return
+        self.logger.info("[%s] COMMAND OUTPUT:", self.name.upper())
+        self.logger.info("  - goto: %s", command.goto)
         if hasattr(command, 'update') and command.update:
-            self.logger.info(f"  - update keys: {list(command.update.keys())}")
+            self.logger.info("  - update keys: %s", list(command.update.keys()))
     
     @abstractmethod
     def invoke(self, state: Dict[str, Any]) -> Command:
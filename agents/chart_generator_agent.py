@@ -2,14 +2,37 @@
 import time
 from typing import Any, Dict, Literal
 from langgraph.types import Command
-from langchain.schema import HumanMessage
-from langchain_openai import ChatOpenAI
+from langchain_core.messages import HumanMessage
+from langgraph.errors import GraphRecursionError
 from langgraph.prebuilt import create_react_agent
 
+import artifacts
 from agents.base_agent import BaseAgent
-from tools import python_repl_tool
-from config import LLMConfig
-from prompts import agent_system_prompt, CHART_GENERATOR_PROMPT
+from log_utils import console, payload
+from tools import python_repl_tool, set_repl_variables
+from extraction import format_fact_table
+from config import LLMConfig, CHART_GENERATOR_MAX_ITERATIONS
+from prompts import agent_system_prompt, build_chart_request, CHART_GENERATOR_PROMPT
+
+# Upper bound on research lines handed to the chart model
+MAX_DATA_LINES = 40
+
+
+def extract_data_lines(research: str, max_lines: int = MAX_DATA_LINES) -> str:
+    """
+    Pull the lines that carry numbers out of a research result.
+    
+    Args:
+        research: Prose output of the web researcher
+        max_lines: Maximum number of lines to keep
+    
+    Returns:
+        Newline-joined data lines (tables, bullets, sentences with figures)
+    """
+    lines = [line.strip() for line in research.splitlines()]
+    data_lines = [line for line in lines if any(ch.isdigit() for ch in line)]
+    # Qualitative research: fall back to the leading non-empty lines
+    return "\n".join((data_lines or [line for line in lines if line])[:max_lines])
 
 
 class ChartGeneratorAgent(BaseAgent):
@@ -17,51 +40,68 @@ class ChartGeneratorAgent(BaseAgent):
     
     def __init__(self):
         super().__init__("chart_generator")
-        config = LLMConfig.get_config("chart_generator")
-        llm = ChatOpenAI(**config)
+        llm = LLMConfig.create_llm("chart_generator")
         
         self.agent = create_react_agent(
-            llm,
+            self.react_model(llm, [python_repl_tool]),
             [python_repl_tool],
             prompt=agent_system_prompt(CHART_GENERATOR_PROMPT),
         )
     
-    def invoke(self, state: Dict[str, Any]) -> Command[Literal["executor"]]:
+    def invoke(self, state: Dict[str, Any]) -> Command[Literal["executor", "join"]]:
         """Generate a chart based on the query."""
         start_time = time.time()
         self.log_entry()
         self.log_state(state)
         
+        # Give the chart model only the request and the data it has to plot
+        agent_outputs = state.get("agent_outputs", {}) or {}
+        research_data = state.get("research_data")
+        data = format_fact_table(research_data) or extract_data_lines(agent_outputs.get("web_researcher", ""))
+        chart_input = build_chart_request(
+            chart_request=state.get("agent_query") or state.get("user_query", ""),
+            data=data,
+        )
+        # Expose the typed columns to the chart code so it can plot them directly
+        set_repl_variables(research_data=research_data or {})
+        # Each ReAct iteration is one model step plus one tool step
+        recursion_limit = 2 * CHART_GENERATOR_MAX_ITERATIONS + 1
+        
         # Invoke the agent
-        self.logger.info("[CHART_GENERATOR] Invoking agent...")
+        self.logger.info("[CHART_GENERATOR] Invoking agent (max %d iterations)...", CHART_GENERATOR_MAX_ITERATIONS)
         try:
-            result = self.agent.invoke(state)
+            # python_repl_tool records the charts its code saves
+            with artifacts.recording() as produced:
+                result, cut_short = self.run_react(
+                    self.agent,
+                    {"messages": [HumanMessage(content=chart_input)]},
+                    {"recursion_limit": recursion_limit},
+                )
             self.logger.info("[CHART_GENERATOR] Completed in %.2f seconds", time.time() - start_time)
             self.logger.info("[CHART_GENERATOR] Message count: %d", len(result.get("messages", [])))
             
             if result.get("messages"):
                 last_msg = result["messages"][-1]
-                self.logger.info("[CHART_GENERATOR] Result: %s", last_msg.content)
-                
-                print("\n" + "=" * 50)
-                print("CHART GENERATOR RESULT:")
-                print("=" * 50)
-                print(last_msg.content)
-                print("=" * 50 + "\n")
+                self.logger.info("[CHART_GENERATOR] Result: %s", payload(last_msg.content))
                 
-                # Check if chart was saved
-                if "CHART_PATH:" in last_msg.content:
-                    chart_path = last_msg.content.split("CHART_PATH:")[1].split("\n")[0].strip()
-                    self.logger.info("[CHART_GENERATOR] Chart saved at: %s", chart_path)
-                else:
-                    self.logger.warning("[CHART_GENERATOR] No CHART_PATH found in output!")
+                console("CHART GENERATOR RESULT", last_msg.content)
+            
+            if produced:
+                self.logger.info("[CHART_GENERATOR] Chart saved at: %s", ", ".join(a["path"] for a in produced))
+            else:
+                self.logger.warning("[CHART_GENERATOR] No chart file was saved!")
                     
+        except GraphRecursionError:
+            self.logger.warning("[CHART_GENERATOR] Stopped after %d iterations without a final answer",
+                                CHART_GENERATOR_MAX_ITERATIONS)
+            result, cut_short = {"messages": [HumanMessage(
+                content=f"Chart generation did not finish within {CHART_GENERATOR_MAX_ITERATIONS} iterations.")]}, False
         except Exception as e:
             self.logger.error("[CHART_GENERATOR] Error: %s", str(e))
             raise
         
-        # Get the chart result
-        chart_result = result["messages"][-1].content
+        # Get the chart result (out of time mid-loop: the latest REPL output)
+        chart_result = self.react_output(result, cut_short, "Chart generation stopped at the deadline.")
         
         # Convert last message to HumanMessage
         result["messages"][-1] = HumanMessage(
@@ -70,15 +110,22 @@ class ChartGeneratorAgent(BaseAgent):
         )
         
         # Store in agent_outputs for reliable synthesis
-        agent_outputs = state.get("agent_outputs", {}) or {}
-        agent_outputs["chart_generator"] = chart_result
+        # A new dict: the state's one is shared with the synthesizer running in parallel
+        agent_outputs = {**agent_outputs, "chart_generator": chart_result}
         
+        update = {
+            # The request message is only sub-agent input; keep it out of the shared history
+            "messages": [msg for msg in result["messages"]
+                         if not (msg.type == "human" and msg.content == chart_input)],
+            "agent_outputs": agent_outputs,
+            "artifacts": produced,
+        }
+        if cut_short:
+            update["partial"] = True
         command = Command(
-            update={
-                "messages": result["messages"],
-                "agent_outputs": agent_outputs,
-            },
-            goto="executor",
+            update=update,
+            # Running next to the synthesizer: meet it in the join node
+            goto="join" if state.get("parallel_finish") else "executor",
         )
         
         self.log_command(command)
@@ -2,11 +2,12 @@
 import time
 from typing import Any, Dict, Literal
 from langgraph.types import Command
-from langchain.schema import HumanMessage
-from langchain_openai import ChatOpenAI
+from langchain_core.messages import HumanMessage
 from langgraph.prebuilt import create_react_agent
 
 from agents.base_agent import BaseAgent
+from artifacts import format_artifacts
+from log_utils import console, payload
 from config import LLMConfig
 from prompts import agent_system_prompt, CHART_SUMMARIZER_PROMPT
 
@@ -16,11 +17,10 @@ class ChartSummarizerAgent(BaseAgent):
     
     def __init__(self):
         super().__init__("chart_summarizer")
-        config = LLMConfig.get_config("chart_summarizer")
-        llm = ChatOpenAI(**config)
+        llm = LLMConfig.create_llm("chart_summarizer")
         
         self.agent = create_react_agent(
-            llm,
+            self.react_model(llm, []),
             tools=[],
             prompt=agent_system_prompt(CHART_SUMMARIZER_PROMPT),
         )
@@ -41,6 +41,10 @@ class ChartSummarizerAgent(BaseAgent):
         if not chart_generator_msg:
             self.logger.warning("[CHART_SUMMARIZER] No chart generator message found!")
             chart_generator_msg = "No chart information available."
+        # The saved file's PATH comes from the records of the tool that wrote it
+        charts = [a for a in state.get("artifacts") or [] if a["kind"] == "chart"]
+        if charts:
+            chart_generator_msg = f"Saved charts:\n{format_artifacts(charts)}\n\n{chart_generator_msg}"
         
         # Create a minimal state with only the chart info
         minimal_state = {
@@ -50,43 +54,32 @@ class ChartSummarizerAgent(BaseAgent):
         # Invoke the agent with minimal context
         self.logger.info("[CHART_SUMMARIZER] Invoking agent with minimal state...")
         try:
-            result = self.agent.invoke(minimal_state)
+            result, cut_short = self.run_react(self.agent, minimal_state)
             self.logger.info("[CHART_SUMMARIZER] Completed in %.2f seconds", time.time() - start_time)
             
             if result.get("messages"):
                 last_msg = result["messages"][-1]
-                self.logger.info("[CHART_SUMMARIZER] Summary: %s", last_msg.content)
+                self.logger.info("[CHART_SUMMARIZER] Summary: %s", payload(last_msg.content))
                 
-                print("\n" + "=" * 50)
-                print("CHART SUMMARIZER RESULT:")
-                print("=" * 50)
-                print(last_msg.content)
-                print("=" * 50 + "\n")
+                console("CHART SUMMARIZER RESULT", last_msg.content)
                 
         except Exception as e:
             self.logger.error("[CHART_SUMMARIZER] Error: %s", str(e))
             raise
         
         # Get the summary result
-        summary_result = result["messages"][-1].content
-        
-        # Add the summary to the state messages
-        state["messages"].append(HumanMessage(
-            content=summary_result,
-            name="chart_summarizer"
-        ))
+        summary_result = self.react_output(result, cut_short, "Chart summary stopped at the deadline.")
         
         # Store in agent_outputs for reliable synthesis
-        agent_outputs = state.get("agent_outputs", {}) or {}
-        agent_outputs["chart_summarizer"] = summary_result
+        agent_outputs = {**(state.get("agent_outputs") or {}), "chart_summarizer": summary_result}
         
-        command = Command(
-            update={
-                "messages": state["messages"],
-                "agent_outputs": agent_outputs,
-            },
-            goto="executor",
-        )
+        update = {
+            "messages": [HumanMessage(content=summary_result, name="chart_summarizer")],
+            "agent_outputs": agent_outputs,
+        }
+        if cut_short:
+            update["partial"] = True
+        command = Command(update=update, goto="executor")
         
         self.log_command(command)
         self.log_exit()
@@ -3,12 +3,13 @@ import json
 import time
 from typing import Any, Dict, Literal
 from langgraph.types import Command
-from langchain.schema import HumanMessage
-from langchain_openai import ChatOpenAI
+from langchain_core.messages import HumanMessage
 
 from agents.base_agent import BaseAgent
+from log_utils import console, payload
 from prompts import build_executor_prompt
-from config import LLMConfig, MAX_REPLANS
+from config import LLMConfig, ENABLED_AGENTS, MAX_REPLANS, PARALLEL_CHART_SYNTHESIS
+from extraction import merge_tables
 
 
 class ExecutorAgent(BaseAgent):
@@ -16,10 +17,9 @@ class ExecutorAgent(BaseAgent):
     
     def __init__(self):
         super().__init__("executor")
-        config = LLMConfig.get_config("executor")
-        self.llm = ChatOpenAI(**config)
+        self.llm = LLMConfig.create_llm("executor")
     
-    def invoke(self, state: Dict[str, Any]) -> Command[Literal['planner', 'web_researcher', 'chart_generator', 'chart_summarizer', 'synthesizer']]:
+    def invoke(self, state: Dict[str, Any]) -> Command[Literal['planner', 'executor', 'web_researcher', 'chart_generator', 'chart_summarizer', 'synthesizer', 'join']]:
         """Execute the plan and route to the next agent."""
         start_time = time.time()
         self.log_entry()
@@ -28,10 +28,18 @@ class ExecutorAgent(BaseAgent):
         plan: Dict[str, Any] = state.get("plan", {})
         step: int = state.get("current_step", 1)
         
-        self.logger.info("[EXECUTOR] Current plan: %s", json.dumps(plan, indent=2))
+        self.logger.info("[EXECUTOR] Current plan: %s", payload(plan))
         self.logger.info("[EXECUTOR] Current step: %d", step)
         self.logger.info("[EXECUTOR] Replan flag: %s", state.get("replan_flag"))
         
+        # Commit research that ran speculatively while the plan was validated
+        speculation = state.get("speculative_research")
+        if speculation and step == 1 and speculation.get("plan") == plan:
+            command = self.commit_speculation(state, speculation)
+            self.log_command(command)
+            self.log_exit()
+            return command
+        
         # Check if replan flag is set
         if state.get("replan_flag"):
             planned_agent = plan.get(str(step), {}).get("agent")
@@ -42,7 +50,7 @@ class ExecutorAgent(BaseAgent):
                     "replan_flag": False,
                     "current_step": step + 1,
                 },
-                goto=planned_agent,
+                goto=self.route(planned_agent, state),
             )
             self.log_command(command)
             self.log_exit()
@@ -62,15 +70,11 @@ class ExecutorAgent(BaseAgent):
             enabled_agents=state.get("enabled_agents")
         )
         
-        llm_reply = self.llm.invoke([prompt])
+        llm_reply = self.call_llm(self.llm, [prompt])
         self.logger.info("[EXECUTOR] LLM response received in %.2f seconds", time.time() - start_time)
-        self.logger.info("[EXECUTOR] LLM reply: %s", llm_reply.content)
+        self.logger.info("[EXECUTOR] LLM reply: %s", payload(llm_reply.content))
         
-        print("\n" + "=" * 50)
-        print("EXECUTOR RESPONSE:")
-        print("=" * 50)
-        print(llm_reply.content)
-        print("=" * 50 + "\n")
+        console("EXECUTOR RESPONSE", llm_reply.content)
         
         # Parse executor decision
         try:
@@ -118,7 +122,7 @@ class ExecutorAgent(BaseAgent):
                 self.logger.info("[EXECUTOR] Replanning allowed. Updated replans: %s", replans)
                 command = Command(update=updates, goto="planner")
             else:
-                next_agent = plan.get(str(step + 1), {}).get("agent", "synthesizer")
+                next_agent = self.route(plan.get(str(step + 1), {}).get("agent", "synthesizer"), state)
                 updates["current_step"] = step + 1
                 self.logger.warning("[EXECUTOR] MAX REPLANS REACHED. Moving to: %s", next_agent)
                 command = Command(update=updates, goto=next_agent)
@@ -128,7 +132,14 @@ class ExecutorAgent(BaseAgent):
             self.logger.info("  - Planned agent: %s", planned_agent)
             self.logger.info("  - Goto: %s", goto)
             
-            if goto == planned_agent:
+            goto = self.route(goto, state)
+            if goto == planned_agent and self.can_finish_in_parallel(plan, step):
+                # Synthesis only needs the research, so it runs next to the chart
+                updates["current_step"] = step + 2
+                updates["parallel_finish"] = True
+                self.logger.info("[EXECUTOR] Running chart_generator and synthesizer in parallel")
+                goto = ["chart_generator", "synthesizer"]
+            elif goto == planned_agent:
                 updates["current_step"] = step + 1
                 self.logger.info("[EXECUTOR] Advancing to step %d", step + 1)
             else:
@@ -140,3 +151,55 @@ class ExecutorAgent(BaseAgent):
         self.log_command(command)
         self.log_exit()
         return command
+    
+    def route(self, goto: Any, state: Dict[str, Any]) -> str:
+        """
+        Return the node to route to: goto if the graph has that node, otherwise the synthesizer.
+        
+        Graphs only contain the core nodes and the enabled agents, so a plan
+        step or LLM decision naming any other agent would fail the run.
+        """
+        from graph import CORE_NODES
+        
+        if goto in CORE_NODES or goto in (state.get("enabled_agents") or ENABLED_AGENTS):
+            return goto
+        self.logger.warning("[EXECUTOR] %s is not an enabled agent; routing to synthesizer", goto)
+        return "synthesizer"
+    
+    @staticmethod
+    def can_finish_in_parallel(plan: Dict[str, Any], step: int) -> bool:
+        """True if the plan ends with this chart_generator step followed by the synthesizer."""
+        return (
+            PARALLEL_CHART_SYNTHESIS
+            and plan.get(str(step), {}).get("agent") == "chart_generator"
+            and plan.get(str(step + 1), {}).get("agent") == "synthesizer"
+            and str(step + 2) not in plan
+        )
+    
+    def commit_speculation(self, state: Dict[str, Any], speculation: Dict[str, Any]) -> Command:
+        """
+        Turn an approved plan's speculative research into the result of step 1.
+        
+        Routes back to the executor, which then continues with step 2 as if
+        the web researcher had just returned.
+        """
+        self.logger.info("[EXECUTOR] Committing speculative research for step 1")
+        
+        agent_outputs = dict(state.get("agent_outputs") or {})
+        agent_outputs["web_researcher"] = speculation["result"]
+        speculation_stats = dict(state.get("speculation_stats") or {})
+        speculation_stats["committed"] = speculation_stats.get("committed", 0) + 1
+        
+        return Command(
+            update={
+                "messages": [HumanMessage(content=speculation["result"], name="web_researcher")],
+                "agent_outputs": agent_outputs,
+                "research_data": merge_tables(state.get("research_data"), speculation["research_data"]),
+                "agent_query": speculation["query"],
+                "last_reason": "Speculative research for step 1 committed after plan approval",
+                "current_step": 2,
+                "speculative_research": None,
+                "speculation_stats": speculation_stats,
+            },
+            goto="executor",
+        )
@@ -3,12 +3,12 @@ import json
 import time
 from typing import Any, Dict
 from langgraph.types import Command
-from langchain.schema import HumanMessage
-from langchain_openai import ChatOpenAI
+from langchain_core.messages import HumanMessage
 
 from agents.base_agent import BaseAgent
+from log_utils import console, payload
 from prompts import build_plan_prompt
-from config import LLMConfig
+from config import LLMConfig, SPECULATIVE_RESEARCH
 
 
 class PlannerAgent(BaseAgent):
@@ -16,8 +16,7 @@ class PlannerAgent(BaseAgent):
     
     def __init__(self):
         super().__init__("planner")
-        config = LLMConfig.get_config("planner")
-        self.llm = ChatOpenAI(**config)
+        self.llm = LLMConfig.create_llm("planner")
     
     def invoke(self, state: Dict[str, Any]) -> Command:
         """Create or update the execution plan."""
@@ -62,15 +61,11 @@ class PlannerAgent(BaseAgent):
             enabled_agents=state.get("enabled_agents")
         )
         
-        llm_reply = self.llm.invoke([prompt])
+        llm_reply = self.call_llm(self.llm, [prompt])
         self.logger.info("[PLANNER] LLM response received in %.2f seconds", time.time() - start_time)
-        self.logger.info("[PLANNER] LLM reply: %s", llm_reply.content)
+        self.logger.info("[PLANNER] LLM reply: %s", payload(llm_reply.content))
         
-        print("\n" + "=" * 50)
-        print("PLANNER RESPONSE:")
-        print("=" * 50)
-        print(llm_reply.content)
-        print("=" * 50 + "\n")
+        console("PLANNER RESPONSE", llm_reply.content)
         
         # Parse the plan
         try:
@@ -78,7 +73,7 @@ class PlannerAgent(BaseAgent):
                 llm_reply.content, str) else str(llm_reply.content)
             parsed_plan = json.loads(content_str)
             self.logger.info("[PLANNER] Successfully parsed plan JSON")
-            self.logger.info("[PLANNER] Parsed plan: %s", json.dumps(parsed_plan, indent=2))
+            self.logger.info("[PLANNER] Parsed plan: %s", payload(parsed_plan))
         except json.JSONDecodeError as e:
             self.logger.error("[PLANNER] Invalid JSON from planner: %s", llm_reply.content)
             self.logger.error("[PLANNER] JSON decode error: %s", str(e))
@@ -94,6 +89,22 @@ class PlannerAgent(BaseAgent):
             replan_attempts["total"] = replan_attempts.get("total", 0) + 1
             self.logger.info("[PLANNER] Replan attempt #%d", replan_attempts["total"])
         
+        # A speculative result still pending here belongs to a rejected plan
+        speculation_stats = dict(state.get("speculation_stats") or {})
+        if state.get("speculative_research"):
+            speculation_stats["discarded"] = speculation_stats.get("discarded", 0) + 1
+            self.logger.info("[PLANNER] Discarding speculative research from the rejected plan")
+        
+        # Start the first research step alongside plan validation
+        current_step = 1 if not replan else state["current_step"]
+        goto = ["supervisor"]
+        if (SPECULATIVE_RESEARCH and current_step == 1
+                and parsed_plan.get("1", {}).get("agent") == "web_researcher"
+                and "web_researcher" in (state.get("enabled_agents") or [])):
+            speculation_stats["started"] = speculation_stats.get("started", 0) + 1
+            goto.append("speculative_researcher")
+            self.logger.info("[PLANNER] Starting speculative research for step 1")
+        
         # Create command
         command = Command(
             update={
@@ -102,14 +113,16 @@ class PlannerAgent(BaseAgent):
                     content=llm_reply.content,
                     name="replan" if replan else "initial_plan")],
                 "user_query": state.get("user_query", state["messages"][0].content),
-                "current_step": 1 if not replan else state["current_step"],
+                "current_step": current_step,
                 "replan_flag": False,  # Reset replan flag after planning
                 "replan_attempts": replan_attempts,  # Track attempts
                 "supervisor_feedback": {},  # Clear supervisor feedback
                 "supervisor_approved": False,  # Reset approval status
                 "enabled_agents": state.get("enabled_agents"),
+                "speculative_research": None,
+                "speculation_stats": speculation_stats,
             },
-            goto="supervisor",  # Always route to supervisor for validation
+            goto=goto,  # Always route to supervisor for validation
         )
         
         self.log_command(command)
@@ -3,9 +3,10 @@ import time
 from typing import Any, Dict, Literal
 from langgraph.types import Command
 from langchain_core.messages import HumanMessage
-from langchain_openai import ChatOpenAI
 
+import metrics
 from agents.base_agent import BaseAgent
+from log_utils import console, payload
 from config import LLMConfig, MAX_REPLANS
 from prompts import build_supervisor_prompt
 
@@ -15,8 +16,7 @@ class SupervisorAgent(BaseAgent):
     
     def __init__(self):
         super().__init__("supervisor")
-        config = LLMConfig.get_config("supervisor")
-        self.llm = ChatOpenAI(**config)
+        self.llm = LLMConfig.create_llm("supervisor")
     
     def invoke(self, state: Dict[str, Any]) -> Command[Literal['executor', 'planner']]:
         """
@@ -52,15 +52,11 @@ class SupervisorAgent(BaseAgent):
         
         # Invoke LLM for plan analysis
         self.logger.info("[SUPERVISOR] Invoking LLM for plan validation...")
-        llm_reply = self.llm.invoke([prompt])
+        llm_reply = self.call_llm(self.llm, [prompt])
         self.logger.info("[SUPERVISOR] LLM response received in %.2f seconds", time.time() - start_time)
-        self.logger.info("[SUPERVISOR] LLM reply: %s", llm_reply.content)
+        self.logger.info("[SUPERVISOR] LLM reply: %s", payload(llm_reply.content))
         
-        print("\n" + "=" * 50)
-        print("SUPERVISOR ANALYSIS:")
-        print("=" * 50)
-        print(llm_reply.content)
-        print("=" * 50 + "\n")
+        console("SUPERVISOR ANALYSIS", llm_reply.content)
         
         # Parse supervisor decision
         try:
@@ -96,6 +92,7 @@ class SupervisorAgent(BaseAgent):
         # Build command
         if needs_replan:
             self.logger.info("[SUPERVISOR] Triggering replan due to: %s", reason)
+            metrics.SUPERVISOR_REJECTIONS.inc()
             command = Command(
                 update={
                     "messages": [HumanMessage(content=llm_reply.content, name="supervisor")],
@@ -2,13 +2,15 @@
 import time
 from typing import Any, Dict, Literal
 from langgraph.types import Command
-from langchain.schema import HumanMessage
-from langchain_openai import ChatOpenAI
+from langchain_core.messages import HumanMessage
 from langgraph.graph import END
 
 from agents.base_agent import BaseAgent
+from artifacts import format_artifacts
+from log_utils import console
+from analytics import compute_statistics, format_statistics
 from config import LLMConfig
-from prompts import SYNTHESIZER_INSTRUCTIONS
+from prompts import SYNTHESIZER_INSTRUCTIONS, SYNTHESIZER_PARTIAL_NOTE
 
 
 class SynthesizerAgent(BaseAgent):
@@ -16,10 +18,9 @@ class SynthesizerAgent(BaseAgent):
     
     def __init__(self):
         super().__init__("synthesizer")
-        config = LLMConfig.get_config("synthesizer")
-        self.llm = ChatOpenAI(**config)
+        self.llm = LLMConfig.create_llm("synthesizer")
     
-    def invoke(self, state: Dict[str, Any]) -> Command[Literal["__end__"]]:
+    def invoke(self, state: Dict[str, Any]) -> Command[Literal["__end__", "join"]]:
         """Create a concise final answer from all agent outputs."""
         start_time = time.time()
         self.log_entry()
@@ -34,17 +35,32 @@ class SynthesizerAgent(BaseAgent):
             if agent_name in agent_outputs and agent_outputs[agent_name]:
                 context_parts.append(f"[{agent_name}]:\n{agent_outputs[agent_name]}")
         
+        user_question = state.get("user_query", "")
+        self.logger.info("[SYNTHESIZER] User question: %s", user_question)
+        
+        # Files produced by the tools (charts), as recorded by them
+        produced = format_artifacts(state.get("artifacts"))
+        if produced:
+            context_parts.append(f"[artifacts]:\n{produced}")
+        
+        # Exact figures computed locally, so the model doesn't do the arithmetic
+        statistics = format_statistics(compute_statistics(state.get("research_data"), user_question))
+        if statistics:
+            context_parts.append(f"[computed_statistics]:\n{statistics}")
+        
         context = "\n\n---\n\n".join(context_parts) if context_parts else "No agent data available."
         
-        self.logger.info("[SYNTHESIZER] Using %d agent outputs", len(context_parts))
+        self.logger.info("[SYNTHESIZER] Using %d context blocks", len(context_parts))
         
-        user_question = state.get("user_query", "")
-        self.logger.info("[SYNTHESIZER] User question: %s", user_question)
+        instructions = SYNTHESIZER_INSTRUCTIONS
+        if state.get("partial"):
+            self.logger.warning("[SYNTHESIZER] Deadline reached earlier; writing a partial answer")
+            instructions += SYNTHESIZER_PARTIAL_NOTE
         
         summary_prompt = [
             HumanMessage(content=(
                 f"User question: {user_question}\n\n"
-                f"{SYNTHESIZER_INSTRUCTIONS}\n\n"
+                f"{instructions}\n\n"
                 f"Context (from agents):\n\n{context}"
             ))
         ]
@@ -52,16 +68,12 @@ class SynthesizerAgent(BaseAgent):
         # Invoke LLM
         self.logger.info("[SYNTHESIZER] Invoking LLM...")
         try:
-            llm_reply = self.llm.invoke(summary_prompt)
+            llm_reply = self.call_llm(self.llm, summary_prompt)
             answer = llm_reply.content.strip()
             
             self.logger.info("[SYNTHESIZER] Completed in %.2f seconds", time.time() - start_time)
             
-            print("\n" + "=" * 50)
-            print("SYNTHESIZER FINAL ANSWER:")
-            print("=" * 50)
-            print(answer)
-            print("=" * 50 + "\n")
+            console("SYNTHESIZER FINAL ANSWER", answer)
         except Exception as e:
             self.logger.error("[SYNTHESIZER] Error during synthesis: %s", str(e))
             answer = f"Error generating final answer: {str(e)}"
@@ -71,7 +83,8 @@ class SynthesizerAgent(BaseAgent):
                 "final_answer": answer,
                 "messages": [HumanMessage(content=answer, name="synthesizer")],
             },
-            goto=END,
+            # Running next to the chart generator: the join node adds its notes
+            goto="join" if state.get("parallel_finish") else END,
         )
         
         self.log_command(command)
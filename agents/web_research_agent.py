@@ -2,13 +2,15 @@
 import time
 from typing import Any, Dict, Literal
 from langgraph.types import Command
-from langchain.schema import HumanMessage
-from langchain_openai import ChatOpenAI
+from langchain_core.messages import HumanMessage
 from langgraph.prebuilt import create_react_agent
 
+import deadlines
 from agents.base_agent import BaseAgent
+from log_utils import console, payload
+from extraction import extract_facts, merge_tables
 from tools import web_search_tool
-from config import LLMConfig
+from config import LLMConfig, DEADLINE_RESERVE_S
 from prompts import WEB_RESEARCH_PROMPT
 
 
@@ -17,11 +19,10 @@ class WebResearchAgent(BaseAgent):
     
     def __init__(self):
         super().__init__("web_researcher")
-        config = LLMConfig.get_config("researcher")
-        llm = ChatOpenAI(**config)
+        llm = LLMConfig.create_llm("researcher")
         
         self.agent = create_react_agent(
-            llm,
+            self.react_model(llm, [web_search_tool]),
             tools=[web_search_tool],
             prompt=WEB_RESEARCH_PROMPT,
         )
@@ -38,26 +39,22 @@ class WebResearchAgent(BaseAgent):
         # Invoke the agent
         self.logger.info("[WEB_RESEARCHER] Invoking agent...")
         try:
-            result = self.agent.invoke({"messages": agent_query})
+            result, cut_short = self.run_react(self.agent, {"messages": agent_query})
             self.logger.info("[WEB_RESEARCHER] Completed in %.2f seconds", time.time() - start_time)
             self.logger.info("[WEB_RESEARCHER] Message count: %d", len(result.get("messages", [])))
             
             if result.get("messages"):
                 last_msg = result["messages"][-1]
-                self.logger.info("[WEB_RESEARCHER] Result (truncated): %s", str(last_msg.content)[:500])
+                self.logger.info("[WEB_RESEARCHER] Result: %s", payload(last_msg.content, limit=500))
                 
-                print("\n" + "=" * 50)
-                print("WEB RESEARCHER RESULT:")
-                print("=" * 50)
-                print(last_msg.content[:1000] if len(last_msg.content) > 1000 else last_msg.content)
-                print("=" * 50 + "\n")
+                console("WEB RESEARCHER RESULT", last_msg.content, limit=1000)
                 
         except Exception as e:
             self.logger.error("[WEB_RESEARCHER] Error: %s", str(e))
             raise
         
-        # Get the research result
-        research_result = result["messages"][-1].content
+        # Get the research result (out of time mid-loop: the latest search results)
+        research_result = self.react_output(result, cut_short, "No research results before the deadline.")
         
         # Convert last message to HumanMessage
         result["messages"][-1] = HumanMessage(
@@ -66,17 +63,62 @@ class WebResearchAgent(BaseAgent):
         )
         
         # Store in agent_outputs for reliable synthesis
-        agent_outputs = state.get("agent_outputs", {}) or {}
-        agent_outputs["web_researcher"] = research_result
+        agent_outputs = {**(state.get("agent_outputs") or {}), "web_researcher": research_result}
         
-        command = Command(
-            update={
-                "messages": result["messages"],
-                "agent_outputs": agent_outputs,
-            },
-            goto="executor",
-        )
+        # Parse the numbers once here so downstream agents don't re-read the prose
+        research_data = merge_tables(state.get("research_data"), extract_facts(research_result))
+        
+        update = {
+            "messages": result["messages"],
+            "agent_outputs": agent_outputs,
+            "research_data": research_data,
+        }
+        if cut_short:
+            update["partial"] = True
+        command = Command(update=update, goto="executor")
         
         self.log_command(command)
         self.log_exit()
         return command
+    
+    def speculate(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run the plan's first research step while the supervisor validates the plan.
+        
+        The result is parked in ``speculative_research``; the executor commits
+        it once the plan is approved and the planner discards it on a replan.
+        Failures are logged and swallowed, since the normal path still runs.
+        """
+        start_time = time.time()
+        plan = state.get("plan", {}) or {}
+        query = plan.get("1", {}).get("action") or state.get("user_query", "")
+        self.logger.info("[WEB_RESEARCHER] Speculative research: %s", query)
+        
+        try:
+            # Its own span and node metrics, under the run's deadline like every node
+            with self.node_run(state, "speculative_researcher") as span:
+                left = deadlines.remaining(state.get("deadline"))
+                if left is not None and left < DEADLINE_RESERVE_S:
+                    self.logger.info("[WEB_RESEARCHER] %.0fs left before the deadline; no speculative research", left)
+                    if span:
+                        span.set(skipped_for_deadline=True)
+                    return {}
+                result, cut_short = self.run_react(self.agent, {"messages": query})
+        except Exception as e:
+            self.logger.warning("[WEB_RESEARCHER] Speculative research failed: %s", str(e))
+            return {}
+        if cut_short:
+            # The normal research step decides what to do with the time left
+            self.logger.info("[WEB_RESEARCHER] Speculative research stopped at the deadline; discarded")
+            return {}
+        research_result = result["messages"][-1].content
+        
+        self.logger.info("[WEB_RESEARCHER] Speculative research done in %.2f seconds", time.time() - start_time)
+        return {
+            "speculative_research": {
+                "plan": plan,
+                "query": query,
+                "result": research_result,
+                "research_data": extract_facts(research_result),
+            },
+        }
@@ -0,0 +1,188 @@
+"""NumPy-backed statistics over extracted research facts.
+
+Growth rates, projections, totals and rankings are computed here so the
+synthesizer can quote exact figures instead of doing arithmetic in the LLM.
+"""
+import logging
+from collections import defaultdict
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from extraction import FactTable, YEAR_RE, format_value, iter_rows
+
+logger = logging.getLogger(__name__)
+
+# Rows listed per group in rankings
+TOP_N = 5
+
+
+def target_years(text: str) -> List[int]:
+    """Return the distinct years mentioned in a text (e.g. the user query), sorted."""
+    return sorted({int(match.group()) for match in YEAR_RE.finditer(text or "")})
+
+
+def _group(table: Optional[FactTable]) -> Dict[Tuple[str, str, str], List[Dict[str, Any]]]:
+    """Group fact rows by metric: (kind, unit, subject), keeping their original order."""
+    groups: Dict[Tuple[str, str, str], List[Dict[str, Any]]] = defaultdict(list)
+    for row in iter_rows(table):
+        groups[(row["kind"], row["unit"], row["subject"])].append(row)
+    return groups
+
+
+def _series(kind: str, unit: str, subject: str, rows: List[Dict[str, Any]],
+            targets: List[int]) -> Optional[Dict[str, Any]]:
+    """
+    Build growth statistics for the facts of one metric (subject) that span several years.
+
+    A metric with two different values for the same year is ambiguous (two
+    sources, or two things described in one sentence), so it gets no series
+    rather than one that picks a value.
+    """
+    by_year: Dict[int, Dict[str, Any]] = {}
+    for row in rows:
+        if row["year"] is None:
+            continue
+        if row["year"] in by_year and by_year[row["year"]]["value"] != row["value"]:
+            logger.debug("[ANALYTICS] Conflicting %s values for %s; no series", row["year"], subject)
+            return None
+        by_year.setdefault(row["year"], row)
+    # Growth rates are already rates; a series of them has no meaningful growth
+    if kind == "rate" or len(by_year) < 2:
+        return None
+
+    years = np.array(sorted(by_year), dtype=float)
+    values = np.array([by_year[int(year)]["value"] for year in years], dtype=float)
+    span = years[-1] - years[0]
+
+    series: Dict[str, Any] = {
+        "kind": kind,
+        "unit": unit,
+        "label": subject,
+        "points": [(int(year), float(value)) for year, value in zip(years, values)],
+        "start_year": int(years[0]),
+        "end_year": int(years[-1]),
+        "absolute_change": float(values[-1] - values[0]),
+        "cagr": None,
+        "projections": {},
+    }
+    if values[0] != 0:
+        series["percent_change"] = float((values[-1] / values[0] - 1) * 100)
+
+    # Compound growth only makes sense for positive amounts, not for shares
+    if kind != "percent" and values[0] > 0 and values[-1] > 0 and span > 0:
+        cagr = float(np.power(values[-1] / values[0], 1 / span) - 1)
+        series["cagr"] = cagr * 100
+        for year in targets:
+            if year > years[-1]:
+                series["projections"][year] = float(values[-1] * np.power(1 + cagr, year - years[-1]))
+
+    return series
+
+
+def _totals(kind: str, unit: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Sum the amounts one metric (subject) reports for the same year.
+
+    Only parts with distinct labels add up ("$5 billion from cloud and $3
+    billion from ads"); a label seen twice in a year is the same figure
+    restated, so that year gets no total.
+    """
+    # Only amounts reported for the same year add up; percentages never do
+    if kind not in ("currency", "number"):
+        return []
+    by_year: Dict[int, List[Dict[str, Any]]] = defaultdict(list)
+    for row in rows:
+        if row["year"]:
+            by_year[row["year"]].append(row)
+    totals = []
+    for year, same_year in sorted(by_year.items()):
+        labels = [row["label"] for row in same_year]
+        if len(same_year) > 1 and len(set(labels)) == len(labels):
+            values = np.array([row["value"] for row in same_year], dtype=float)
+            totals.append({"kind": kind, "unit": unit, "year": year, "count": len(same_year),
+                           "sum": float(values.sum()), "label": same_year[0]["subject"]})
+    return totals
+
+
+def compute_statistics(table: Optional[FactTable], query: str = "") -> Dict[str, Any]:
+    """
+    Compute growth rates, projections, totals and rankings over a fact table.
+
+    Args:
+        table: Facts extracted from research output
+        query: User query; years it mentions become projection targets
+
+    Returns:
+        Dictionary with "series", "totals" and "rankings" lists
+    """
+    targets = target_years(query)
+    stats: Dict[str, Any] = {"series": [], "totals": [], "rankings": []}
+
+    # Series, totals and rankings never mix metrics or units
+    for (kind, unit, subject), rows in _group(table).items():
+        series = _series(kind, unit, subject, rows, targets)
+        if series:
+            stats["series"].append(series)
+        stats["totals"].extend(_totals(kind, unit, rows))
+
+        values = np.array([row["value"] for row in rows], dtype=float)
+        order = np.argsort(-values, kind="stable")[:TOP_N]
+        ranked = [rows[i] for i in order]
+        if len(ranked) > 1:
+            top, runner_up = ranked[0]["value"], ranked[1]["value"]
+            stats["rankings"].append({
+                "kind": kind,
+                "unit": unit,
+                "label": subject,
+                "rows": [(row["year"], row["value"], row["label"]) for row in ranked],
+                "top_vs_second_ratio": float(top / runner_up) if runner_up else None,
+            })
+
+    logger.info("[ANALYTICS] %d series, %d totals, %d rankings",
+                len(stats["series"]), len(stats["totals"]), len(stats["rankings"]))
+    return stats
+
+
+def format_statistics(stats: Dict[str, Any]) -> str:
+    """
+    Render computed statistics as compact text for the synthesizer prompt.
+
+    Args:
+        stats: Output of compute_statistics
+
+    Returns:
+        Text block, or an empty string if nothing was computed
+    """
+    lines: List[str] = []
+
+    for series in stats.get("series", []):
+        unit = series["unit"]
+        points = ", ".join(f"{year}: {format_value(value, unit)}" for year, value in series["points"])
+        line = f"- {series['label'] or series['kind']} ({points})"
+        if series["kind"] == "percent":
+            line += f"; change {series['absolute_change']:+.2f} percentage points"
+        elif series.get("percent_change") is not None:
+            line += f"; change {series['percent_change']:+.1f}%"
+        if series["cagr"] is not None:
+            line += f"; CAGR {series['start_year']}-{series['end_year']} {series['cagr']:.2f}%"
+        for year, value in series["projections"].items():
+            line += f"; projected {year} at same CAGR: {format_value(value, unit)}"
+        lines.append(line)
+
+    for total in stats.get("totals", []):
+        lines.append(f"- Sum of {total['count']} {total['kind']} values of {total['label'] or 'one metric'} "
+                     f"for {total['year']}: "
+                     f"{format_value(total['sum'], total['unit'])}")
+
+    for ranking in stats.get("rankings", []):
+        ranked = "; ".join(
+            f"{format_value(value, ranking['unit'])} ({year or 'n/a'}, {label})"
+            for year, value, label in ranking["rows"]
+        )
+        line = f"- Largest {ranking['kind']} values of {ranking['label'] or 'one metric'}: {ranked}"
+        if ranking["top_vs_second_ratio"]:
+            line += f"; top is {ranking['top_vs_second_ratio']:.2f}x the second"
+        lines.append(line)
+
+    return "\n".join(lines)
@@ -0,0 +1,113 @@
+"""Typed records of the files a run produces (charts), kept in the ``artifacts`` state channel.
+
+The tool that writes a file records it: python_repl_tool records the charts
+its code rendered with ``save_chart()`` (written once by OutputManager under a
+content-hash name) and any other image the code saved under ``outputs/``.
+The calling agent collects the records with ``recording()`` and returns them
+in its state update; the synthesizer, the join node and OutputManager read
+them from the state instead of parsing message text.
+"""
+import os
+import hashlib
+import mimetypes
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, List, Optional, TypedDict
+
+# File types recorded as charts
+CHART_MIME_PREFIXES = ("image/", "application/pdf")
+
+
+class Artifact(TypedDict):
+    """A file produced during a run."""
+    kind: str  # "chart"
+    path: str
+    mime: str
+    sha256: str
+    size: int
+    notes: Optional[str]
+
+
+# Records of the agent step currently running; context variables follow it
+# into the threads that execute its tool calls
+_records: ContextVar[Optional[List[Artifact]]] = ContextVar("artifacts", default=None)
+
+
+def describe(path: str, kind: str, notes: Optional[str] = None, data: Optional[bytes] = None) -> Artifact:
+    """
+    Build the record of a file.
+
+    Args:
+        path: Where the file is
+        kind: Artifact kind, e.g. "chart"
+        notes: What the file shows
+        data: The file's content when the caller still holds it; otherwise the
+            file is read to hash it
+
+    Returns:
+        The record
+    """
+    if data is not None:
+        digest, size = hashlib.sha256(data), len(data)
+    else:
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 16), b""):
+                digest.update(block)
+        size = os.path.getsize(path)
+    return {
+        "kind": kind,
+        "path": path,
+        "mime": mimetypes.guess_type(path)[0] or "application/octet-stream",
+        "sha256": digest.hexdigest(),
+        "size": size,
+        "notes": notes,
+    }
+
+
+def record(artifact: Artifact):
+    """Add a record to the artifacts collected by the current agent step (ignored outside one)."""
+    records = _records.get()
+    if records is not None:
+        records.append(artifact)
+
+
+@contextmanager
+def recording() -> Iterator[List[Artifact]]:
+    """Collect the artifacts recorded by tools called within the block."""
+    records: List[Artifact] = []
+    token = _records.set(records)
+    try:
+        yield records
+    finally:
+        _records.reset(token)
+
+
+def snapshot(directory: str) -> Dict[str, int]:
+    """Modification times of the files directly in a directory."""
+    try:
+        with os.scandir(directory) as entries:
+            return {entry.path: entry.stat().st_mtime_ns for entry in entries if entry.is_file()}
+    except FileNotFoundError:
+        return {}
+
+
+def changed_charts(before: Dict[str, int], after: Dict[str, int]) -> List[str]:
+    """Chart files that are new or were rewritten between two snapshots."""
+    return sorted(
+        path for path, mtime in after.items()
+        if before.get(path) != mtime and (mimetypes.guess_type(path)[0] or "").startswith(CHART_MIME_PREFIXES)
+    )
+
+
+def latest(artifacts: Optional[List[Artifact]], kind: str) -> Optional[Artifact]:
+    """The most recently recorded artifact of a kind, if any."""
+    return next((artifact for artifact in reversed(artifacts or []) if artifact["kind"] == kind), None)
+
+
+def format_artifacts(artifacts: Optional[List[Artifact]]) -> str:
+    """One line per artifact for agent prompts: kind, path, type and notes."""
+    return "\n".join(
+        f"- {a['kind']}: {a['path']} ({a['mime']}, {a['size']} bytes)" + (f": {a['notes']}" if a["notes"] else "")
+        for a in artifacts or []
+    )
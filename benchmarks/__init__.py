@@ -0,0 +1 @@
+"""Benchmarks for startup, orchestration overhead and load."""
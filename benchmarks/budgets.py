@@ -0,0 +1,150 @@
+"""Cost regression gates: LLM calls, replans, prompt tokens and executor hops per query archetype.
+
+Runs each archetype of benchmarks/e2e.py once offline against the scripted
+fake backends and checks its numbers against the upper bounds in
+benchmarks/baselines/budgets.json. Prompt changes (planner, supervisor and
+executor prompts) that add calls, replans, hops or tokens exceed a budget and
+make the command exit with status 1.
+
+Every full run also rewrites benchmarks/baselines/budget_report.txt, a stable
+plain-text breakdown per archetype and agent, and prints its diff against the
+previous version, so a more expensive path shows up line by line in review.
+
+Usage:
+    python -m benchmarks.budgets              # check; exit 1 if a budget is exceeded
+    python -m benchmarks.budgets --update     # accept the current numbers as the budgets
+"""
+import argparse
+import difflib
+import json
+import math
+import os
+import sys
+import tempfile
+from typing import Any, Dict, List, Optional
+
+from benchmarks.e2e import ROOT, SCENARIOS, run_once
+from benchmarks.fakes import FakeBackends
+
+BUDGETS_PATH = os.path.join("benchmarks", "baselines", "budgets.json")
+REPORT_PATH = os.path.join("benchmarks", "baselines", "budget_report.txt")
+
+# Gated metrics of run_once(); counts must not grow at all, tokens get headroom
+GATED = ("llm_calls_total", "replans", "executor_hops", "prompt_tokens")
+TOKEN_HEADROOM = 0.10
+
+
+def measure(archetypes: List[str]) -> Dict[str, Dict[str, Any]]:
+    """Run each archetype once with zero-latency fakes in a scratch directory."""
+    import log_utils
+    from checkpointing import CheckpointStore
+
+    log_utils.set_quiet()
+    backends = FakeBackends()
+    backends.install()
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="budgets-") as scratch:
+        cwd = os.getcwd()
+        os.chdir(scratch)
+        store = CheckpointStore(os.path.join(scratch, "graph.sqlite"))
+        try:
+            for name in archetypes:
+                result = run_once(name, backends, store)
+                result["prompt_tokens_by_agent"] = dict(backends.prompt_tokens)
+                results[name] = result
+        finally:
+            store.close()
+            os.chdir(cwd)
+            backends.uninstall()
+    return results
+
+
+def check(results: Dict[str, Dict[str, Any]], budgets: Dict[str, Dict[str, int]]) -> List[str]:
+    """Return one message per exceeded budget."""
+    violations = []
+    for name, result in results.items():
+        for metric, limit in budgets.get(name, {}).items():
+            if result[metric] > limit:
+                violations.append(f"{name}: {metric} = {result[metric]} exceeds budget {limit}")
+    return violations
+
+
+def new_budgets(results: Dict[str, Dict[str, Any]]) -> Dict[str, Dict[str, int]]:
+    """Budgets that the given results meet, with TOKEN_HEADROOM on prompt tokens."""
+    return {
+        name: {
+            metric: math.ceil(result[metric] * (1 + TOKEN_HEADROOM)) if metric == "prompt_tokens" else result[metric]
+            for metric in GATED
+        }
+        for name, result in results.items()
+    }
+
+
+def format_report(results: Dict[str, Dict[str, Any]], budgets: Dict[str, Dict[str, int]]) -> str:
+    """Render a stable, diffable breakdown of every archetype."""
+    lines = []
+    for name in sorted(results):
+        result, budget = results[name], budgets.get(name, {})
+        lines.append(f"[{name}]")
+        for metric in GATED:
+            limit = budget.get(metric)
+            lines.append(f"{metric:<24} {result[metric]:>8}   budget {limit if limit is not None else '-'}")
+        lines.append(f"{'hops':<24} {result['hops']:>8}")
+        for node, count in sorted(result["nodes"].items()):
+            lines.append(f"  node {node:<19} {count:>8}")
+        for agent, count in sorted(result["llm_calls"].items()):
+            tokens = result["prompt_tokens_by_agent"].get(agent, 0)
+            lines.append(f"  llm {agent:<20} {count:>8} calls {tokens:>8} prompt tokens")
+        lines.append("")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--archetype", nargs="+", choices=sorted(SCENARIOS), help="Archetypes to run (default: all)")
+    parser.add_argument("--update", action="store_true", help="Write the current numbers as the new budgets")
+    args = parser.parse_args(argv)
+
+    budgets_file = os.path.join(ROOT, BUDGETS_PATH)
+    report_file = os.path.join(ROOT, REPORT_PATH)
+    budgets: Dict[str, Dict[str, int]] = {}
+    if os.path.exists(budgets_file):
+        with open(budgets_file, encoding="utf-8") as f:
+            budgets = json.load(f)
+
+    results = measure(args.archetype or list(SCENARIOS))
+    if args.update:
+        budgets.update(new_budgets(results))
+        with open(budgets_file, "w", encoding="utf-8") as f:
+            json.dump(budgets, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Updated {BUDGETS_PATH}")
+
+    report = format_report(results, budgets)
+    if args.archetype:
+        # A partial report is not comparable with the committed one
+        print(report)
+    else:
+        previous = ""
+        if os.path.exists(report_file):
+            with open(report_file, encoding="utf-8") as f:
+                previous = f.read()
+        with open(report_file, "w", encoding="utf-8") as f:
+            f.write(report)
+        diff = list(difflib.unified_diff(previous.splitlines(), report.splitlines(),
+                                         REPORT_PATH + " (before)", REPORT_PATH + " (now)", lineterm=""))
+        print("\n".join(diff) if diff else report)
+
+    violations = check(results, budgets)
+    for name in results:
+        if name not in budgets:
+            violations.append(f"{name}: no budget (run with --update to add one)")
+    if violations:
+        print("\nBudget check FAILED:\n  " + "\n  ".join(violations))
+        return 1
+    print(f"\nAll {len(results)} archetypes within budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,100 @@
+"""Cold-start benchmark: per-module import cost of the CLI entry point.
+
+Runs ``python -X importtime -c "import <module>"`` in fresh interpreters,
+reports the total and the slowest modules by cumulative import time, and
+appends one record per invocation to a JSONL history file so the numbers
+can be tracked across commits.
+
+Usage:
+    python -m benchmarks.cold_start [--module main] [--runs 5] [--top 15]
+                                    [--history benchmarks/results/cold_start.jsonl]
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from typing import Dict
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_HISTORY = os.path.join("benchmarks", "results", "cold_start.jsonl")
+
+# "import time:   self [us] |  cumulative | imported package" lines from -X importtime
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def measure(module: str) -> Dict[str, int]:
+    """
+    Import a module in a fresh interpreter and return cumulative import times.
+
+    Args:
+        module: Module to import
+
+    Returns:
+        Mapping of top-level-or-nested module name to cumulative microseconds
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    ).stderr
+    cumulative = {}
+    for line in stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            cumulative[match.group(4)] = int(match.group(2))
+    return cumulative
+
+
+def git_revision() -> str:
+    """Return the short commit hash of the working tree, or "unknown"."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="main", help="Module to import")
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters to sample")
+    parser.add_argument("--top", type=int, default=15, help="Modules to list")
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="JSONL file to append the result to")
+    args = parser.parse_args()
+
+    samples = defaultdict(list)
+    for _ in range(args.runs):
+        for name, micros in measure(args.module).items():
+            samples[name].append(micros)
+
+    medians = {name: statistics.median(values) for name, values in samples.items()}
+    total = medians.get(args.module, 0)
+    print(f"import {args.module}: {total / 1000:.1f} ms (median of {args.runs})\n")
+    print(f"{'cumulative ms':>14}  module")
+    top = sorted(medians.items(), key=lambda item: item[1], reverse=True)[:args.top]
+    for name, micros in top:
+        print(f"{micros / 1000:14.1f}  {name}")
+
+    record = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": git_revision(),
+        "python": sys.version.split()[0],
+        "module": args.module,
+        "runs": args.runs,
+        "total_ms": total / 1000,
+        "top": {name: micros / 1000 for name, micros in top},
+    }
+    history = os.path.join(ROOT, args.history)
+    os.makedirs(os.path.dirname(history), exist_ok=True)
+    with open(history, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+    print(f"\nAppended to {args.history}")
+
+
+if __name__ == "__main__":
+    main()
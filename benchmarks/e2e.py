@@ -0,0 +1,257 @@
+"""Offline end-to-end benchmark: orchestration cost of whole graph runs.
+
+Runs representative query shapes through the real graph, checkpointer,
+tracing and report writing, with the LLM and search replaced by the scripted
+fakes of benchmarks/fakes.py, so the numbers measure graph.py and the agents
+rather than API latency:
+
+- research_only:   plan -> research -> synthesis
+- research_chart:  plan -> research -> chart + synthesis (REPL included)
+- replan_loop:     supervisor rejects the first plan, executor asks for one
+                   more replan, then research -> synthesis
+- replan_cap:      executor asks for a replan on every step; MAX_REPLANS and
+                   the supervisor's forced approval must end the loop
+
+Per scenario it reports wall time (median of --runs), hops (node executions),
+LLM calls and prompt tokens per agent, search calls, final state size and peak traced memory
+(from an extra run under tracemalloc), and compares them with a JSON baseline.
+
+Usage:
+    python -m benchmarks.e2e [--runs 5] [--llm-latency 0] [--search-latency 0]
+                             [--scenario NAME ...] [--baseline benchmarks/baselines/e2e.json]
+                             [--save-baseline]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from benchmarks.fakes import FakeBackends
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_BASELINE = os.path.join("benchmarks", "baselines", "e2e.json")
+
+QUERY = "What is the growth of the AI market from 2025 to 2030? Provide statistics and trends."
+
+
+def _decision(goto: str, query: str = "AI market size 2025 to 2030", replan: bool = False) -> Dict[str, Any]:
+    return {"replan": replan, "goto": goto, "reason": f"Step calls for {goto}", "query": query}
+
+
+APPROVE = {"needs_replan": False, "reason": "Plan is efficient", "issues": [], "suggestions": []}
+REJECT = {"needs_replan": True, "reason": "Plan is missing the research step",
+          "issues": ["no research"], "suggestions": ["research first"]}
+
+RESEARCH_PLAN = {
+    "1": {"agent": "web_researcher", "action": "Find AI market size and growth 2025-2030"},
+    "2": {"agent": "synthesizer", "action": "Answer with the figures"},
+}
+CHART_PLAN = {
+    "1": {"agent": "web_researcher", "action": "Find AI market size and growth 2025-2030"},
+    "2": {"agent": "chart_generator", "action": "Line chart of market size by year"},
+    "3": {"agent": "synthesizer", "action": "Answer with the figures and the chart"},
+}
+
+SCENARIOS: Dict[str, Dict[str, Any]] = {
+    "research_only": {
+        "enabled_agents": ["web_researcher", "synthesizer"],
+        "scripts": {
+            "planner": [RESEARCH_PLAN],
+            "supervisor": [APPROVE],
+            "executor": [_decision("web_researcher"), _decision("synthesizer")],
+        },
+    },
+    "research_chart": {
+        "enabled_agents": ["web_researcher", "chart_generator", "synthesizer"],
+        "scripts": {
+            "planner": [CHART_PLAN],
+            "supervisor": [APPROVE],
+            "executor": [_decision("web_researcher"), _decision("chart_generator")],
+        },
+    },
+    "replan_loop": {
+        "enabled_agents": ["web_researcher", "synthesizer"],
+        "scripts": {
+            "planner": [{"1": {"agent": "synthesizer", "action": "Answer from general knowledge"}}, RESEARCH_PLAN],
+            "supervisor": [REJECT, APPROVE],
+            "executor": [_decision("web_researcher", replan=True), _decision("web_researcher"),
+                         _decision("synthesizer")],
+        },
+    },
+    "replan_cap": {
+        "enabled_agents": ["web_researcher", "synthesizer"],
+        "scripts": {
+            "planner": [RESEARCH_PLAN],
+            "supervisor": [APPROVE],
+            "executor": [_decision("web_researcher", replan=True)],
+        },
+    },
+}
+
+# Metrics compared with the baseline (lower is better for all of them)
+COMPARED = ("wall_median_s", "hops", "llm_calls_total", "prompt_tokens", "search_calls", "messages", "state_bytes",
+            "peak_memory_mb")
+
+
+def run_once(name: str, backends: FakeBackends, store) -> Dict[str, Any]:
+    """Run one scenario through the graph and return its metrics."""
+    from graph import build_graph
+    from main import initial_state, run_graph
+    from state import estimate_tokens
+
+    scenario = SCENARIOS[name]
+    backends.load(scenario["scripts"])
+    graph = build_graph(scenario["enabled_agents"], checkpointer=store.saver)
+    thread_id = store.new_thread(QUERY)
+    nodes: Counter = Counter()
+
+    def on_update(update: Dict[str, Any]):
+        nodes.update(update.keys())
+
+    start = time.perf_counter()
+    final_state, _ = run_graph(graph, store, thread_id, initial_state(QUERY, scenario["enabled_agents"]),
+                               QUERY, on_update)
+    wall = time.perf_counter() - start
+
+    llm_calls = backends.llm_calls()
+    messages = final_state.get("messages", [])
+    return {
+        "wall_s": wall,
+        "simulated_latency_s": backends.simulated_s,
+        "hops": sum(nodes.values()),
+        "nodes": dict(nodes),
+        "llm_calls": llm_calls,
+        "llm_calls_total": sum(llm_calls.values()),
+        "prompt_tokens": sum(backends.prompt_tokens.values()),
+        "executor_hops": nodes["executor"],
+        "search_calls": backends.calls["search"],
+        "replans": (final_state.get("replan_attempts") or {}).get("total", 0),
+        "messages": len(messages),
+        "state_tokens": estimate_tokens(messages),
+        "state_bytes": len(json.dumps(final_state, default=str)),
+    }
+
+
+def run_scenario(name: str, backends: FakeBackends, store, runs: int) -> Dict[str, Any]:
+    """Run a scenario ``runs`` times plus once under tracemalloc and aggregate the metrics."""
+    # Untimed warm-up: agent construction, graph compilation and first-use imports
+    run_once(name, backends, store)
+    samples = [run_once(name, backends, store) for _ in range(runs)]
+    tracemalloc.start()
+    try:
+        run_once(name, backends, store)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    walls = [s["wall_s"] for s in samples]
+    overheads = [s["wall_s"] - s["simulated_latency_s"] for s in samples]
+    result = dict(samples[-1])
+    del result["wall_s"], result["simulated_latency_s"]
+    result.update({
+        "wall_median_s": round(statistics.median(walls), 4),
+        "wall_min_s": round(min(walls), 4),
+        "wall_max_s": round(max(walls), 4),
+        # Wall time not spent in simulated latency (approximate when nodes run in parallel)
+        "overhead_median_s": round(statistics.median(overheads), 4),
+        "peak_memory_mb": round(peak / 2**20, 2),
+    })
+    return result
+
+
+def compare(results: Dict[str, Dict[str, Any]], baseline: Dict[str, Any]) -> List[str]:
+    """Return one line per compared metric: baseline, current and relative change."""
+    lines = [f"{'scenario':<16} {'metric':<16} {'baseline':>12} {'current':>12} {'change':>8}"]
+    for name, result in results.items():
+        old = baseline.get("scenarios", {}).get(name)
+        if old is None:
+            lines.append(f"{name:<16} (not in baseline)")
+            continue
+        for metric in COMPARED:
+            before, after = old.get(metric), result.get(metric)
+            if before is None or after is None:
+                continue
+            change = f"{(after - before) / before:+.1%}" if before else ("=" if after == before else "new")
+            lines.append(f"{name:<16} {metric:<16} {before:>12} {after:>12} {change:>8}")
+    return lines
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Timed runs per scenario")
+    parser.add_argument("--scenario", nargs="+", choices=sorted(SCENARIOS), help="Scenarios to run (default: all)")
+    parser.add_argument("--llm-latency", default="0", help="Fake LLM latency: SECONDS, uniform:LOW,HIGH, "
+                                                           "normal:MEAN,SD or lognormal:MEDIAN,SIGMA")
+    parser.add_argument("--search-latency", default="0", help="Fake search latency (same forms)")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the latency samples")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="JSON baseline to compare with")
+    parser.add_argument("--save-baseline", action="store_true", help="Write the results as the new baseline")
+    parser.add_argument("--json", help="Also write the results to this file")
+    args = parser.parse_args(argv)
+
+    import log_utils
+    from checkpointing import CheckpointStore
+    from benchmarks.cold_start import git_revision
+
+    log_utils.set_quiet()
+    backends = FakeBackends(args.llm_latency, args.search_latency, args.seed)
+    backends.install()
+    baseline_path = os.path.join(ROOT, args.baseline)
+    results = {}
+
+    # Reports, traces, charts and checkpoints go to a scratch directory
+    with tempfile.TemporaryDirectory(prefix="e2e-bench-") as scratch:
+        cwd = os.getcwd()
+        os.chdir(scratch)
+        store = CheckpointStore(os.path.join(scratch, "graph.sqlite"))
+        try:
+            for name in args.scenario or SCENARIOS:
+                results[name] = run_scenario(name, backends, store, args.runs)
+        finally:
+            store.close()
+            os.chdir(cwd)
+            backends.uninstall()
+
+    print(f"{'scenario':<16} {'wall p50':>10} {'overhead':>10} {'hops':>5} {'llm':>4} {'search':>6} "
+          f"{'msgs':>5} {'state KB':>9} {'peak MB':>8}")
+    for name, r in results.items():
+        print(f"{name:<16} {r['wall_median_s'] * 1000:8.1f}ms {r['overhead_median_s'] * 1000:8.1f}ms "
+              f"{r['hops']:>5} {r['llm_calls_total']:>4} {r['search_calls']:>6} {r['messages']:>5} "
+              f"{r['state_bytes'] / 1024:9.1f} {r['peak_memory_mb']:8.2f}")
+
+    record = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "revision": git_revision(),
+        "python": sys.version.split()[0],
+        "runs": args.runs,
+        "llm_latency": args.llm_latency,
+        "search_latency": args.search_latency,
+        "scenarios": results,
+    }
+
+    if os.path.exists(baseline_path) and not args.save_baseline:
+        with open(baseline_path, encoding="utf-8") as f:
+            baseline = json.load(f)
+        print(f"\nCompared with {args.baseline} ({baseline.get('revision')}):")
+        print("\n".join(compare(results, baseline)))
+
+    if args.save_baseline:
+        os.makedirs(os.path.dirname(baseline_path), exist_ok=True)
+        with open(baseline_path, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"\nSaved baseline to {args.baseline}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(record, f, indent=2)
+    return record
+
+
+if __name__ == "__main__":
+    main()
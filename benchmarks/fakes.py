@@ -0,0 +1,217 @@
+"""Scripted chat models and search backend for offline benchmarks.
+
+FakeBackends replaces every agent's chat model (through
+LLMConfig.set_model_factory) and the web search (through
+tools.set_search_backend). The planner, supervisor and executor answer from
+per-scenario scripts of canned JSON replies; the ReAct agents call their tool
+once and then answer; every call sleeps for a latency drawn from a
+configurable distribution. Calls and prompt tokens are counted per agent type.
+
+Concurrent runs of different scenarios (load tests) register their scripts
+with register() and tag each query with tag(); the scripted agents find the
+tag in their prompt and follow that run's script.
+"""
+import json
+import math
+import random
+import re
+import threading
+import time
+from collections import Counter
+from typing import Any, Dict, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+
+import tools
+from config import LLMConfig
+from state import estimate_tokens
+
+# Agent types whose replies come from the scenario script, in call order
+SCRIPTED_ROLES = ("planner", "supervisor", "executor")
+
+# "[bench:<run>:<scenario>]" suffix added to a query by FakeBackends.tag()
+TAG_RE = re.compile(r"\[bench:(\w+):(\w+)\]")
+
+RESEARCH_RESULT = (
+    "The global AI market was valued at $184.0 billion in 2024 and is projected to reach "
+    "$826.7 billion by 2030, a CAGR of 28.5%.\n"
+    "- 2025: $243.7 billion\n"
+    "- 2026: $313.2 billion\n"
+    "- 2027: $402.5 billion\n"
+    "Adoption rose to 72% of companies in 2024 from 55% in 2023."
+)
+SEARCH_RESULTS = {
+    "results": [
+        {"url": f"https://example.com/ai-market-{i}", "title": f"AI market report {i}", "content": RESEARCH_RESULT}
+        for i in range(5)
+    ]
+}
+CHART_NOTES = "AI market size 2024-2030."
+CHART_CODE = f"save_chart('ai_market_size', notes={CHART_NOTES!r})"
+# What the fake renderer returns for every save_chart() figure (a PNG signature)
+CHART_PNG = b"\x89PNG\r\n\x1a\n"
+CHART_RESULT = "Line chart of the AI market size from 2024 to 2030."
+
+
+class Latency:
+    """
+    A latency distribution parsed from a spec string:
+
+    - ``"0.05"``: fixed seconds
+    - ``"uniform:LOW,HIGH"``
+    - ``"normal:MEAN,STDDEV"`` (clipped at 0)
+    - ``"lognormal:MEDIAN,SIGMA"``
+    """
+
+    def __init__(self, spec: str = "0", seed: Optional[int] = None):
+        self.spec = spec
+        kind, _, params = spec.partition(":")
+        if not params:
+            kind, params = "fixed", kind
+        self.kind = kind
+        self.params = [float(p) for p in params.split(",")]
+        self.random = random.Random(seed)
+        if kind not in ("fixed", "uniform", "normal", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {spec}")
+
+    def sample(self) -> float:
+        p = self.params
+        if self.kind == "fixed":
+            return p[0]
+        if self.kind == "uniform":
+            return self.random.uniform(p[0], p[1])
+        if self.kind == "normal":
+            return max(0.0, self.random.gauss(p[0], p[1]))
+        return self.random.lognormvariate(math.log(p[0]), p[1])
+
+
+class FakeChatModel(BaseChatModel):
+    """Chat model that answers for one agent type through FakeBackends."""
+
+    agent_type: str
+    backends: Any
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake"
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs) -> ChatResult:
+        message = self.backends.reply(self.agent_type, messages)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+
+class FakeSearch:
+    """Search backend returning canned results after a simulated latency."""
+
+    def __init__(self, backends: "FakeBackends"):
+        self.backends = backends
+
+    def invoke(self, query: str) -> Dict[str, Any]:
+        self.backends.wait(self.backends.search_latency, "search")
+        return SEARCH_RESULTS
+
+
+class FakeBackends:
+    """Scripted LLM and search backends shared by all agents of a process."""
+
+    def __init__(self, llm_latency: str = "0", search_latency: str = "0", seed: int = 0):
+        self.llm_latency = Latency(llm_latency, seed)
+        self.search_latency = Latency(search_latency, seed + 1)
+        self._lock = threading.Lock()
+        self.scripts: Dict[str, List[Dict[str, Any]]] = {}
+        self.scenarios: Dict[str, Dict[str, List[Dict[str, Any]]]] = {}
+        self._tags = 0
+        self.reset()
+
+    def install(self):
+        """Make newly constructed agents, all web searches and chart rendering use these fakes."""
+        LLMConfig.set_model_factory(lambda agent_type, config: FakeChatModel(agent_type=agent_type, backends=self))
+        tools.set_search_backend(FakeSearch(self))
+        tools.set_chart_renderer(lambda fig: CHART_PNG)
+
+    @staticmethod
+    def uninstall():
+        LLMConfig.set_model_factory(None)
+        tools.set_search_backend(None)
+        tools.set_chart_renderer(None)
+
+    def load(self, scripts: Dict[str, List[Dict[str, Any]]]):
+        """
+        Set the canned replies for the next run and reset the counters.
+
+        Args:
+            scripts: Replies per scripted agent type, in call order; the last
+                reply repeats once a script is used up
+        """
+        self.scripts = scripts
+        self.reset()
+
+    def register(self, scenarios: Dict[str, Dict[str, List[Dict[str, Any]]]]):
+        """Make scenario scripts available to queries tagged with tag()."""
+        self.scenarios.update(scenarios)
+
+    def tag(self, query: str, scenario: str) -> str:
+        """Return the query marked as a new run of a registered scenario."""
+        with self._lock:
+            self._tags += 1
+            return f"{query} [bench:{self._tags}:{scenario}]"
+
+    def reset(self):
+        with self._lock:
+            self.calls: Counter = Counter()
+            self.prompt_tokens: Counter = Counter()
+            self.positions: Counter = Counter()
+            self.simulated_s = 0.0
+
+    def wait(self, latency: Latency, kind: str):
+        """Sleep for one sample of a latency distribution and count the call."""
+        with self._lock:
+            delay = latency.sample()
+            self.calls[kind] += 1
+            self.simulated_s += delay
+        if delay > 0:
+            time.sleep(delay)
+
+    def reply(self, agent_type: str, messages) -> AIMessage:
+        """Answer a model call for an agent type."""
+        self.wait(self.llm_latency, agent_type)
+        with self._lock:
+            self.prompt_tokens[agent_type] += estimate_tokens(messages)
+        last = messages[-1]
+
+        if agent_type in SCRIPTED_ROLES:
+            match = TAG_RE.search("\n".join(str(m.content) for m in messages)) if self.scenarios else None
+            run, scripts = (match.group(1), self.scenarios[match.group(2)]) if match else (None, self.scripts)
+            with self._lock:
+                script = scripts[agent_type]
+                position = self.positions[run, agent_type]
+                self.positions[run, agent_type] += 1
+            return AIMessage(content=json.dumps(script[min(position, len(script) - 1)]))
+
+        if agent_type == "researcher":
+            if last.type == "tool":
+                return AIMessage(content=RESEARCH_RESULT)
+            return AIMessage(content="", tool_calls=[
+                {"name": "web_research", "args": {"query": "AI market size 2025 2030"}, "id": "search-1"}])
+
+        if agent_type == "chart_generator":
+            if last.type == "tool":
+                return AIMessage(content=CHART_RESULT)
+            return AIMessage(content="", tool_calls=[
+                {"name": "python_repl_tool", "args": {"code": CHART_CODE}, "id": "chart-1"}])
+
+        if agent_type == "chart_summarizer":
+            return AIMessage(content="The chart shows the AI market growing about 4.5x from 2024 to 2030.")
+
+        return AIMessage(content="The AI market grows from $243.7 billion in 2025 to $826.7 billion in 2030 "
+                                 "(28.5% CAGR), with adoption at 72% of companies.")
+
+    def llm_calls(self) -> Dict[str, int]:
+        """Model calls per agent type in the current run."""
+        with self._lock:
+            return {kind: n for kind, n in self.calls.items() if kind != "search"}
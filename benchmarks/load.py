@@ -0,0 +1,286 @@
+"""Load test: ramp concurrent synthetic users against the query service (or the graph).
+
+Each level runs N closed-loop users for --duration seconds. A user picks a
+query shape from the --mix (the scenarios of benchmarks/e2e.py), sends it,
+waits for the answer, optionally thinks, and repeats. The LLM and search are
+the latency-simulating fakes of benchmarks/fakes.py, so a level measures what
+one process sustains with realistic waits but without API cost.
+
+Targets:
+- service: an in-process QueryService (service.py) over HTTP, with its run
+           slots, bounded queue and 503 rejections
+- graph:   run_graph() called directly from N threads (no admission control)
+
+Per level it records throughput, latency percentiles, queue time (service),
+rejections, peak RSS and peak thread count, and marks the knee: the first
+level where adding users no longer adds KNEE_GAIN more throughput.
+
+Usage:
+    python -m benchmarks.load [--target service] [--levels 1,2,4,8,16] [--duration 20]
+                              [--mix research_only=3,research_chart=1,replan_loop=1]
+                              [--llm-latency lognormal:0.3,0.5] [--search-latency lognormal:0.5,0.5]
+                              [--max-in-flight 2] [--queue-size 8] [--json load.json]
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.e2e import QUERY, SCENARIOS
+from benchmarks.fakes import FakeBackends
+from memory import rss_mb
+
+# A level is past the knee when it adds less than this relative throughput
+KNEE_GAIN = 0.10
+# Seconds a user waits after a 503 before trying again
+REJECT_BACKOFF_S = 0.5
+# Seconds between RSS and thread-count samples
+SAMPLE_INTERVAL_S = 0.1
+
+
+def parse_mix(spec: str) -> Dict[str, float]:
+    """Parse "name=weight,name=weight" into scenario weights."""
+    mix = {}
+    for part in spec.split(","):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario in mix: {name}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def percentiles(values: List[float]) -> Dict[str, Optional[float]]:
+    ordered = sorted(values)
+    if not ordered:
+        return {"p50": None, "p95": None, "p99": None}
+    return {f"p{int(q * 100)}": round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+            for q in (0.50, 0.95, 0.99)}
+
+
+async def http_post(port: int, path: str, payload: Dict[str, Any]) -> Tuple[int, Dict[str, Any]]:
+    """Send one JSON POST to the local service and return (status, body)."""
+    reader, writer = await asyncio.open_connection("127.0.0.1", port)
+    data = json.dumps(payload).encode()
+    writer.write(f"POST {path} HTTP/1.1\r\nHost: localhost\r\nContent-Type: application/json\r\n"
+                 f"Content-Length: {len(data)}\r\nConnection: close\r\n\r\n".encode() + data)
+    await writer.drain()
+    response = await reader.read()
+    writer.close()
+    head, _, body = response.partition(b"\r\n\r\n")
+    return int(head.split()[1]), json.loads(body or b"{}")
+
+
+class LoadTest:
+    """Drives one target through increasing concurrency levels."""
+
+    def __init__(self, args: argparse.Namespace, backends: FakeBackends):
+        self.args = args
+        self.backends = backends
+        self.mix = parse_mix(args.mix)
+        self.random = random.Random(args.seed)
+        self.service = None
+        self.port = None
+        self.store = None
+        self.pool: Optional[ThreadPoolExecutor] = None
+
+    async def start(self):
+        if self.args.target == "service":
+            from service import QueryService
+            self.service = QueryService(self.args.max_in_flight, self.args.queue_size, self.args.request_timeout)
+            self.server = await self.service.start("127.0.0.1", 0)
+            self.port = self.server.sockets[0].getsockname()[1]
+        else:
+            from checkpointing import CheckpointStore
+            self.store = CheckpointStore()
+
+    async def stop(self):
+        if self.service is not None:
+            self.server.close()
+            await self.server.wait_closed()
+            self.service.close()
+        if self.store is not None:
+            self.store.close()
+
+    def pick(self) -> str:
+        names = list(self.mix)
+        return self.random.choices(names, weights=[self.mix[n] for n in names])[0]
+
+    def run_direct(self, query: str, enabled_agents: List[str]) -> Dict[str, Any]:
+        """Run a query straight through the graph (graph target, on a pool thread)."""
+        from graph import build_graph
+        from main import initial_state, run_graph
+
+        graph = build_graph(enabled_agents, checkpointer=self.store.saver)
+        thread_id = self.store.new_thread(query)
+        started = time.monotonic()
+        run_graph(graph, self.store, thread_id, initial_state(query, enabled_agents), query)
+        return {"queued_s": 0.0, "run_s": time.monotonic() - started}
+
+    async def send(self, scenario: str) -> Tuple[int, Dict[str, Any]]:
+        query = self.backends.tag(QUERY, scenario)
+        enabled_agents = SCENARIOS[scenario]["enabled_agents"]
+        if self.service is not None:
+            return await http_post(self.port, "/query", {"query": query, "enabled_agents": enabled_agents})
+        loop = asyncio.get_running_loop()
+        try:
+            return 200, await loop.run_in_executor(self.pool, self.run_direct, query, enabled_agents)
+        except Exception as e:
+            return 500, {"error": str(e)}
+
+    async def user(self, end: float, stats: Dict[str, Any]):
+        """One closed-loop synthetic user."""
+        while time.monotonic() < end:
+            start = time.monotonic()
+            status, body = await self.send(self.pick())
+            if status == 200:
+                stats["latencies"].append(time.monotonic() - start)
+                stats["queued"].append(body.get("queued_s", 0.0))
+                stats["run"].append(body.get("run_s", 0.0))
+            elif status == 503:
+                stats["rejected"] += 1
+                await asyncio.sleep(REJECT_BACKOFF_S)
+                continue
+            else:
+                stats["errors"][status] = stats["errors"].get(status, 0) + 1
+            if self.args.think_time:
+                await asyncio.sleep(self.random.expovariate(1 / self.args.think_time))
+
+    async def sample(self, stop: asyncio.Event, stats: Dict[str, Any]):
+        """Track peak RSS and thread count while a level runs."""
+        while not stop.is_set():
+            stats["peak_rss_mb"] = max(stats["peak_rss_mb"], rss_mb())
+            stats["peak_threads"] = max(stats["peak_threads"], threading.active_count())
+            try:
+                await asyncio.wait_for(stop.wait(), SAMPLE_INTERVAL_S)
+            except asyncio.TimeoutError:
+                pass
+
+    async def level(self, users: int) -> Dict[str, Any]:
+        """Run one concurrency level and summarise it."""
+        stats: Dict[str, Any] = {"latencies": [], "queued": [], "run": [], "rejected": 0, "errors": {},
+                                 "peak_rss_mb": rss_mb(), "peak_threads": threading.active_count()}
+        if self.args.target == "graph":
+            self.pool = ThreadPoolExecutor(max_workers=users, thread_name_prefix="load-user")
+        stop = asyncio.Event()
+        sampler = asyncio.create_task(self.sample(stop, stats))
+        start = time.monotonic()
+        await asyncio.gather(*(self.user(start + self.args.duration, stats) for _ in range(users)))
+        elapsed = time.monotonic() - start
+        stop.set()
+        await sampler
+        if self.pool is not None:
+            self.pool.shutdown()
+
+        completed = len(stats["latencies"])
+        return {
+            "users": users,
+            "completed": completed,
+            "elapsed_s": round(elapsed, 2),
+            "throughput_rps": round(completed / elapsed, 3),
+            "latency_s": percentiles(stats["latencies"]),
+            "queue_s": percentiles(stats["queued"]),
+            "run_s": percentiles(stats["run"]),
+            "rejected": stats["rejected"],
+            "errors": stats["errors"],
+            "rss_end_mb": round(rss_mb(), 1),
+            "peak_rss_mb": round(stats["peak_rss_mb"], 1),
+            "peak_threads": stats["peak_threads"],
+        }
+
+
+def find_knee(levels: List[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """The last level before throughput stopped growing by KNEE_GAIN, or None if it never stopped."""
+    for previous, current in zip(levels, levels[1:]):
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 + KNEE_GAIN):
+            return previous
+    return None
+
+
+async def run(args: argparse.Namespace, backends: FakeBackends) -> List[Dict[str, Any]]:
+    test = LoadTest(args, backends)
+    await test.start()
+    results = []
+    try:
+        for users in args.levels:
+            result = await test.level(users)
+            results.append(result)
+            print(f"{users:>5} {result['completed']:>6} {result['throughput_rps']:>8.2f} "
+                  f"{result['latency_s']['p50'] or 0:>7.2f} {result['latency_s']['p95'] or 0:>7.2f} "
+                  f"{result['latency_s']['p99'] or 0:>7.2f} {result['queue_s']['p95'] or 0:>8.2f} "
+                  f"{result['rejected']:>5} {sum(result['errors'].values()):>4} "
+                  f"{result['peak_rss_mb']:>8.1f} {result['peak_threads']:>7}", flush=True)
+    finally:
+        await test.stop()
+    return results
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--target", choices=("service", "graph"), default="service")
+    parser.add_argument("--levels", default="1,2,4,8,16", help="Comma-separated concurrent user counts")
+    parser.add_argument("--duration", type=float, default=20.0, help="Seconds per level")
+    parser.add_argument("--mix", default="research_only=3,research_chart=1,replan_loop=1",
+                        help="Scenario weights, name=weight,...")
+    parser.add_argument("--think-time", type=float, default=0.0, help="Mean seconds a user pauses between queries")
+    parser.add_argument("--llm-latency", default="lognormal:0.3,0.5", help="Fake LLM latency (see benchmarks.e2e)")
+    parser.add_argument("--search-latency", default="lognormal:0.5,0.5", help="Fake search latency")
+    parser.add_argument("--max-in-flight", type=int, default=None, help="Service run slots (default: config)")
+    parser.add_argument("--queue-size", type=int, default=None, help="Service queue size (default: config)")
+    parser.add_argument("--request-timeout", type=float, default=None, help="Service request deadline in seconds")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args(argv)
+    args.levels = [int(n) for n in args.levels.split(",")]
+
+    import log_utils
+    from config import SERVICE_MAX_IN_FLIGHT, SERVICE_QUEUE_SIZE, SERVICE_REQUEST_TIMEOUT_S
+
+    args.max_in_flight = args.max_in_flight or SERVICE_MAX_IN_FLIGHT
+    args.queue_size = args.queue_size if args.queue_size is not None else SERVICE_QUEUE_SIZE
+    args.request_timeout = args.request_timeout or SERVICE_REQUEST_TIMEOUT_S
+
+    log_utils.set_quiet()
+    backends = FakeBackends(args.llm_latency, args.search_latency, args.seed)
+    backends.register({name: scenario["scripts"] for name, scenario in SCENARIOS.items()})
+    backends.install()
+
+    target = (f"service ({args.max_in_flight} in flight, queue {args.queue_size})"
+              if args.target == "service" else "graph (direct)")
+    print(f"Target: {target}; {args.duration:g}s per level; mix {args.mix}\n")
+    print(f"{'users':>5} {'done':>6} {'req/s':>8} {'p50 s':>7} {'p95 s':>7} {'p99 s':>7} {'queue95':>8} "
+          f"{'503':>5} {'err':>4} {'rss MB':>8} {'threads':>7}")
+
+    # Reports, traces, charts and checkpoints go to a scratch directory
+    with tempfile.TemporaryDirectory(prefix="load-") as scratch:
+        cwd = os.getcwd()
+        os.chdir(scratch)
+        try:
+            results = asyncio.run(run(args, backends))
+        finally:
+            os.chdir(cwd)
+            backends.uninstall()
+
+    knee = find_knee(results)
+    if knee:
+        print(f"\nKnee: {knee['users']} users at {knee['throughput_rps']:.2f} req/s "
+              f"(p95 latency {knee['latency_s']['p95']}s)")
+    else:
+        print("\nNo knee: throughput was still growing at the highest level")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"target": args.target, "mix": args.mix, "llm_latency": args.llm_latency,
+                       "search_latency": args.search_latency, "duration_s": args.duration,
+                       "max_in_flight": args.max_in_flight, "queue_size": args.queue_size,
+                       "levels": results, "knee_users": knee["users"] if knee else None}, f, indent=2)
+    return results
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""Logging micro-benchmark: per-hop cost of an agent's logging and console output.
+
+Replays the logging an executor hop does (entry/state/plan/reply/command/exit
+logs and the response banner) against a realistic state, in four modes:
+
+- eager:       the previous code: f-string logs, json.dumps(plan, indent=2)
+               and print() banners, with INFO off as in a default run
+- verbose:     current code, console output on, INFO off
+- quiet:       current code in quiet mode, INFO off
+- quiet-info:  quiet mode with INFO records formatted and written (to /dev/null)
+
+Console output goes to /dev/null in every mode, so the numbers are CPU cost.
+
+Usage:
+    python -m benchmarks.logging_overhead [--hops 2000] [--messages 30]
+"""
+import argparse
+import contextlib
+import json
+import logging
+import os
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.types import Command
+
+import log_utils
+from agents.base_agent import BaseAgent
+from state import estimate_tokens
+
+
+class HopAgent(BaseAgent):
+    """Agent whose invoke() performs only the logging of an executor hop."""
+
+    def invoke(self, state):
+        reply = state["reply"]
+        command = Command(update={"current_step": 2, "agent_query": "next"}, goto="web_researcher")
+        self.log_entry()
+        self.log_state(state)
+        self.logger.info("[EXECUTOR] Current plan: %s", log_utils.payload(state["plan"]))
+        self.logger.info("[EXECUTOR] LLM reply: %s", log_utils.payload(reply))
+        log_utils.console("EXECUTOR RESPONSE", reply)
+        self.log_command(command)
+        self.log_exit()
+        return command
+
+
+def eager_hop(logger: logging.Logger, state):
+    """The logging of an executor hop before the quiet mode existed."""
+    name = "EXECUTOR"
+    reply = state["reply"]
+    command = Command(update={"current_step": 2, "agent_query": "next"}, goto="web_researcher")
+    logger.info("=" * 80)
+    logger.info(f"[{name}] ========== ENTER ==========")
+    logger.info("=" * 80)
+    logger.info(f"[{name}] STATE SUMMARY:")
+    logger.info(f"  - user_query: {state.get('user_query', 'N/A')}")
+    logger.info(f"  - current_step: {state.get('current_step', 'N/A')}")
+    logger.info(f"  - replan_flag: {state.get('replan_flag', False)}")
+    logger.info(f"  - agent_query: {state.get('agent_query', 'N/A')}")
+    messages = state.get("messages", [])
+    logger.info(f"  - state_size: {len(messages)} messages, ~{estimate_tokens(messages)} tokens")
+    logger.info("[EXECUTOR] Current plan: %s", json.dumps(state["plan"], indent=2))
+    logger.info("[EXECUTOR] LLM reply: %s", reply)
+    print("\n" + "=" * 50)
+    print("EXECUTOR RESPONSE:")
+    print("=" * 50)
+    print(reply)
+    print("=" * 50 + "\n")
+    logger.info(f"[{name}] COMMAND OUTPUT:")
+    logger.info(f"  - goto: {command.goto}")
+    logger.info(f"  - update keys: {list(command.update.keys())}")
+    logger.info("=" * 80)
+    logger.info(f"[{name}] ========== EXIT ==========")
+    logger.info("=" * 80)
+
+
+def make_state(n_messages: int):
+    """A mid-run state: a six-step plan, n research messages and a long executor reply."""
+    plan = {str(i): {"agent": "web_researcher" if i < 5 else "synthesizer",
+                     "action": f"Research market segment {i}: revenue, growth rates and forecasts 2025-2030"}
+            for i in range(1, 7)}
+    messages = [HumanMessage(content="What is the growth of AI from 2025 to 2030?")]
+    for i in range(n_messages):
+        messages.append(AIMessage(content=f"Finding {i}: " + "market size grew 28.4% year over year; " * 40,
+                                  name="web_researcher"))
+    reply = json.dumps({"replan": False, "goto": "web_researcher", "reason": "x" * 1500,
+                        "query": "AI market size 2025 to 2030 CAGR"})
+    return {"user_query": messages[0].content, "messages": messages, "plan": plan, "current_step": 1,
+            "replan_flag": False, "agent_query": "AI market size", "reply": reply}
+
+
+def time_hops(fn, hops: int) -> float:
+    """Run fn() hops times with stdout discarded; return microseconds per hop."""
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        fn()
+        start = time.perf_counter()
+        for _ in range(hops):
+            fn()
+        return (time.perf_counter() - start) / hops * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hops", type=int, default=2000, help="Hops timed per mode")
+    parser.add_argument("--messages", type=int, default=30, help="Messages in the state")
+    args = parser.parse_args()
+
+    state = make_state(args.messages)
+    agent = HopAgent("executor")
+    logger = agent.logger
+    logger.propagate = False
+    sink = open(os.devnull, "w")
+    handler = logging.StreamHandler(sink)
+
+    results = {}
+    logger.setLevel(logging.WARNING)
+    log_utils.set_quiet(False)
+    results["eager"] = time_hops(lambda: eager_hop(logger, state), args.hops)
+    results["verbose"] = time_hops(lambda: agent.invoke(state), args.hops)
+    log_utils.set_quiet(True)
+    results["quiet"] = time_hops(lambda: agent.invoke(state), args.hops)
+    logger.setLevel(logging.INFO)
+    logger.addHandler(handler)
+    results["quiet-info"] = time_hops(lambda: agent.invoke(state), args.hops)
+    logger.removeHandler(handler)
+    sink.close()
+
+    print(f"{args.hops} hops, {args.messages} messages in state\n")
+    print(f"{'mode':<12} {'us/hop':>10} {'vs eager':>9}")
+    for mode, micros in results.items():
+        print(f"{mode:<12} {micros:10.1f} {micros / results['eager']:8.1%}")
+
+
+if __name__ == "__main__":
+    main()
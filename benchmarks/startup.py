@@ -0,0 +1,90 @@
+"""Startup benchmark: time until a compiled graph is ready to take the first query.
+
+Each scenario runs in a fresh interpreter so imports and construction are cold:
+
+- eager:  construct all seven agents up front, then compile (the old build_graph)
+- lazy:   build_graph() with lazy agents for ENABLED_AGENTS
+- cached: a second build_graph() call with the same configuration
+
+Usage:
+    python -m benchmarks.startup [--runs 5] [--json results.json]
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCENARIOS = {
+    "eager": """
+import graph
+from config import ENABLED_AGENTS
+for name in graph.AGENT_CLASSES:
+    graph.get_agent(name)
+graph.build_graph(ENABLED_AGENTS)
+""",
+    "lazy": """
+import graph
+from config import ENABLED_AGENTS
+graph.build_graph(ENABLED_AGENTS)
+""",
+    "cached": """
+import graph
+from config import ENABLED_AGENTS
+graph.build_graph(ENABLED_AGENTS)
+_start = time.perf_counter()
+graph.build_graph(ENABLED_AGENTS)
+""",
+}
+
+# Wraps a scenario; reports total time and, for "cached", the second call alone
+_TEMPLATE = """
+import json, time
+start = time.perf_counter()
+_start = None
+{code}
+end = time.perf_counter()
+print(json.dumps({{"total": end - start, "last_call": end - (_start or start)}}))
+"""
+
+
+def run_scenario(code: str) -> dict:
+    """Run one scenario in a fresh interpreter and return its timings in seconds."""
+    env = dict(os.environ)
+    # ChatOpenAI needs a key to construct; nothing is sent
+    env.setdefault("OPENAI_API_KEY", "benchmark")
+    env.setdefault("TAVILY_API_KEY", "benchmark")
+    output = subprocess.run(
+        [sys.executable, "-c", _TEMPLATE.format(code=code)],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True,
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="Fresh interpreters per scenario")
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args()
+
+    results = {}
+    for name, code in SCENARIOS.items():
+        timings = [run_scenario(code) for _ in range(args.runs)]
+        key = "last_call" if name == "cached" else "total"
+        results[name] = {
+            "median_s": statistics.median(t[key] for t in timings),
+            "min_s": min(t[key] for t in timings),
+        }
+        print(f"{name:<8} median {results[name]['median_s'] * 1000:9.2f} ms   "
+              f"min {results[name]['min_s'] * 1000:9.2f} ms")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+"""Durable SQLite checkpointing so failed runs can resume from the last completed node."""
+import os
+import sqlite3
+import time
+import uuid
+import logging
+from typing import Any, Dict, List, Optional
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from config import CHECKPOINT_DB, CHECKPOINT_RETENTION_DAYS
+
+logger = logging.getLogger(__name__)
+
+# Index of runs stored next to LangGraph's own checkpoint tables
+_RUNS_DDL = """
+CREATE TABLE IF NOT EXISTS runs (
+    thread_id TEXT PRIMARY KEY,
+    query TEXT NOT NULL,
+    status TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+)
+"""
+
+
+class CheckpointStore:
+    """SQLite (WAL mode) checkpointer plus a small run index for resume and retention."""
+
+    def __init__(self, db_path: str = CHECKPOINT_DB):
+        """
+        Open (or create) the checkpoint database.
+
+        Args:
+            db_path: Path of the SQLite file
+        """
+        self.db_path = db_path
+        directory = os.path.dirname(db_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Graph nodes run on worker threads, so the connection is shared across them
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.execute(_RUNS_DDL)
+        self.conn.commit()
+
+        self.saver = SqliteSaver(self.conn)
+        logger.info(f"[CHECKPOINT] Using checkpoint database: {db_path}")
+
+    @staticmethod
+    def config(thread_id: str) -> Dict[str, Any]:
+        """Return the graph config that binds a run to its checkpoint thread."""
+        return {"configurable": {"thread_id": thread_id}}
+
+    def new_thread(self, query: str) -> str:
+        """
+        Register a new run and return its thread id.
+
+        Args:
+            query: User query the run answers
+
+        Returns:
+            Fresh thread id
+        """
+        thread_id = uuid.uuid4().hex
+        now = time.time()
+        with self.saver.lock:
+            self.conn.execute(
+                "INSERT INTO runs (thread_id, query, status, created_at, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (thread_id, query, "running", now, now),
+            )
+            self.conn.commit()
+        return thread_id
+
+    def mark(self, thread_id: str, status: str):
+        """Record the status of a run ("running", "failed" or "completed")."""
+        with self.saver.lock:
+            self.conn.execute(
+                "UPDATE runs SET status = ?, updated_at = ? WHERE thread_id = ?",
+                (status, time.time(), thread_id),
+            )
+            self.conn.commit()
+
+    def get_run(self, thread_id: str) -> Optional[Dict[str, Any]]:
+        """Return the run record for a thread id, or None if unknown."""
+        runs = self.list_runs(thread_id=thread_id)
+        return runs[0] if runs else None
+
+    def list_runs(self, status: Optional[str] = None, thread_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        List recorded runs, newest first.
+
+        Args:
+            status: Only return runs with this status
+            thread_id: Only return this run
+
+        Returns:
+            List of run records
+        """
+        query = "SELECT thread_id, query, status, created_at, updated_at FROM runs WHERE 1 = 1"
+        params: List[Any] = []
+        if status:
+            query += " AND status = ?"
+            params.append(status)
+        if thread_id:
+            query += " AND thread_id = ?"
+            params.append(thread_id)
+        query += " ORDER BY updated_at DESC"
+
+        with self.saver.lock:
+            rows = self.conn.execute(query, params).fetchall()
+        columns = ("thread_id", "query", "status", "created_at", "updated_at")
+        return [dict(zip(columns, row)) for row in rows]
+
+    def prune(self, max_age_days: float = CHECKPOINT_RETENTION_DAYS) -> int:
+        """
+        Delete the checkpoints of runs not updated within ``max_age_days``.
+
+        Args:
+            max_age_days: Retention window in days
+
+        Returns:
+            Number of runs deleted
+        """
+        cutoff = time.time() - max_age_days * 86400
+        with self.saver.lock:
+            expired = [row[0] for row in self.conn.execute(
+                "SELECT thread_id FROM runs WHERE updated_at < ?", (cutoff,)
+            ).fetchall()]
+
+        for thread_id in expired:
+            self.saver.delete_thread(thread_id)
+            with self.saver.lock:
+                self.conn.execute("DELETE FROM runs WHERE thread_id = ?", (thread_id,))
+                self.conn.commit()
+
+        if expired:
+            # Fold the WAL back into the main file so the deleted pages can be reused
+            with self.saver.lock:
+                self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            logger.info(f"[CHECKPOINT] Pruned {len(expired)} runs older than {max_age_days} days")
+        return len(expired)
+
+    def close(self):
+        """Close the database connection."""
+        self.conn.close()
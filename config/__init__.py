@@ -1,4 +1,78 @@
 """Configuration module initialization."""
-from config.llm_config import LLMConfig, MAX_REPLANS, ENABLED_AGENTS
+from config.llm_config import (
+    LLMConfig,
+    MAX_REPLANS,
+    ENABLED_AGENTS,
+    MAX_STATE_MESSAGES,
+    MAX_STATE_TOKENS,
+    EXECUTOR_CONTEXT_TOKENS,
+    CONTEXT_MESSAGE_CHARS,
+    CHART_GENERATOR_MAX_ITERATIONS,
+    CHECKPOINT_DB,
+    CHECKPOINT_RETENTION_DAYS,
+    SPECULATIVE_RESEARCH,
+    PARALLEL_CHART_SYNTHESIS,
+    WORKER_SOCKET,
+    SERVICE_HOST,
+    SERVICE_PORT,
+    SERVICE_MAX_IN_FLIGHT,
+    SERVICE_QUEUE_SIZE,
+    SERVICE_REQUEST_TIMEOUT_S,
+    COALESCE_QUERIES,
+    QUERY_DEADLINE_S,
+    DEADLINE_RESERVE_S,
+    LLM_TIMEOUT_S,
+    SEARCH_TIMEOUT_S,
+    REPL_TIMEOUT_S,
+    TRACING_ENABLED,
+    TRACE_DIR,
+    QUIET_MODE,
+    LOG_PAYLOAD_CHARS,
+    LOG_PAYLOAD_SAMPLE_RATE,
+    MEMORY_PROFILING,
+    MEMORY_TOP_ALLOCATIONS,
+    PROFILE_NODES,
+    PROFILER,
+    PROFILE_DIR,
+    PROFILE_TOP_FUNCTIONS,
+    METRICS_FILE,
+)
 
-__all__ = ["LLMConfig", "MAX_REPLANS", "ENABLED_AGENTS"]
+__all__ = [
+    "LLMConfig",
+    "MAX_REPLANS",
+    "ENABLED_AGENTS",
+    "MAX_STATE_MESSAGES",
+    "MAX_STATE_TOKENS",
+    "EXECUTOR_CONTEXT_TOKENS",
+    "CONTEXT_MESSAGE_CHARS",
+    "CHART_GENERATOR_MAX_ITERATIONS",
+    "CHECKPOINT_DB",
+    "CHECKPOINT_RETENTION_DAYS",
+    "SPECULATIVE_RESEARCH",
+    "PARALLEL_CHART_SYNTHESIS",
+    "WORKER_SOCKET",
+    "SERVICE_HOST",
+    "SERVICE_PORT",
+    "SERVICE_MAX_IN_FLIGHT",
+    "SERVICE_QUEUE_SIZE",
+    "SERVICE_REQUEST_TIMEOUT_S",
+    "COALESCE_QUERIES",
+    "QUERY_DEADLINE_S",
+    "DEADLINE_RESERVE_S",
+    "LLM_TIMEOUT_S",
+    "SEARCH_TIMEOUT_S",
+    "REPL_TIMEOUT_S",
+    "TRACING_ENABLED",
+    "TRACE_DIR",
+    "QUIET_MODE",
+    "LOG_PAYLOAD_CHARS",
+    "LOG_PAYLOAD_SAMPLE_RATE",
+    "MEMORY_PROFILING",
+    "MEMORY_TOP_ALLOCATIONS",
+    "PROFILE_NODES",
+    "PROFILER",
+    "PROFILE_DIR",
+    "PROFILE_TOP_FUNCTIONS",
+    "METRICS_FILE",
+]
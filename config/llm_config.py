@@ -1,10 +1,14 @@
 """LLM configuration settings."""
-from typing import Dict, Any
+from typing import Any, Callable, Dict, Optional
 
 
 class LLMConfig:
     """Configuration for different LLM models used in the system."""
     
+    # Builds an agent's chat model from (agent_type, config); None means
+    # ChatOpenAI. Offline runs and benchmarks install fakes with set_model_factory().
+    model_factory: Optional[Callable[[str, Dict[str, Any]], Any]] = None
+    
     # Planner and Executor LLM - requires structured JSON output
     PLANNER_EXECUTOR_CONFIG = {
         "model": "gpt-4o",
@@ -73,6 +77,34 @@ class LLMConfig:
             raise ValueError(f"Unknown agent type: {agent_type}")
         
         return config_map[agent_type].copy()
+    
+    @classmethod
+    def set_model_factory(cls, factory: Optional[Callable[[str, Dict[str, Any]], Any]]):
+        """
+        Replace the chat models of agents constructed from now on.
+        
+        Args:
+            factory: Called with (agent_type, config) to build a chat model,
+                or None to go back to ChatOpenAI
+        """
+        cls.model_factory = factory
+    
+    @classmethod
+    def create_llm(cls, agent_type: str):
+        """
+        Build the chat model for an agent type.
+        
+        Args:
+            agent_type: Agent type accepted by get_config
+        
+        Returns:
+            ChatOpenAI instance, or the model_factory's model if one is set
+        """
+        config = cls.get_config(agent_type)
+        if cls.model_factory is not None:
+            return cls.model_factory(agent_type, config)
+        from langchain_openai import ChatOpenAI
+        return ChatOpenAI(**config)
 
 
 # Maximum number of replans allowed per step
@@ -86,3 +118,89 @@ ENABLED_AGENTS = [
     # "chart_summarizer",  # Optional: Comment out to skip and go directly to synthesizer
     "synthesizer"
 ]
+
+# Limits enforced by the messages reducer in state.py. The original user query
+# is always kept; the oldest messages after it are dropped first.
+MAX_STATE_MESSAGES = 40
+MAX_STATE_TOKENS = 12000
+
+# Token budget for the recent-messages block of the executor prompt, and the
+# maximum number of content characters rendered per message
+EXECUTOR_CONTEXT_TOKENS = 1500
+CONTEXT_MESSAGE_CHARS = 800
+
+# Maximum model/tool round-trips for the chart generator's ReAct loop
+CHART_GENERATOR_MAX_ITERATIONS = 3
+
+# On-disk checkpoint database (SQLite, WAL mode) and how long finished or
+# abandoned runs are kept before their checkpoints are deleted
+CHECKPOINT_DB = ".checkpoints/graph.sqlite"
+CHECKPOINT_RETENTION_DAYS = 7
+
+# Start the plan's first web_researcher step while the supervisor is still
+# validating the plan. The result is committed if the plan is approved and
+# discarded if it is rejected.
+SPECULATIVE_RESEARCH = False
+
+# When the plan ends with chart_generator -> synthesizer, run both at once and
+# merge the chart notes into the final answer in the graph's join node
+PARALLEL_CHART_SYNTHESIS = True
+
+# Unix socket the resident worker (worker.py) listens on
+WORKER_SOCKET = ".checkpoints/worker.sock"
+
+# HTTP query service (service.py): concurrent graph runs, queued requests
+# beyond those (further requests get 503), and the default per-request deadline
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8080
+SERVICE_MAX_IN_FLIGHT = 2
+SERVICE_QUEUE_SIZE = 8
+SERVICE_REQUEST_TIMEOUT_S = 300
+
+# Let concurrent requests for the same query (same agents, ignoring case and
+# whitespace) share one graph run in the service and the worker
+COALESCE_QUERIES = True
+
+# Wall-clock budget of one query. When less than DEADLINE_RESERVE_S is left,
+# agents hand over to the synthesizer, which answers with what was gathered
+# and the report is marked partial.
+QUERY_DEADLINE_S = 180
+DEADLINE_RESERVE_S = 30
+
+# Timeouts of single LLM requests, web searches and REPL executions (each is
+# also capped by the time left on the query deadline)
+LLM_TIMEOUT_S = 60
+SEARCH_TIMEOUT_S = 20
+REPL_TIMEOUT_S = 30
+
+# Per-run span traces (tracing.py): one JSONL file per run in TRACE_DIR
+TRACING_ENABLED = True
+TRACE_DIR = "outputs/traces"
+
+# Quiet/production logging (log_utils.py): agents print nothing to stdout and
+# only LOG_PAYLOAD_SAMPLE_RATE of the logged payloads (plans, LLM replies)
+# longer than LOG_PAYLOAD_CHARS are rendered. AGENT_QUIET=1 also enables it.
+QUIET_MODE = False
+LOG_PAYLOAD_CHARS = 2000
+LOG_PAYLOAD_SAMPLE_RATE = 0.1
+
+# Per-node memory instrumentation (memory.py): RSS, tracemalloc diffs with the
+# top allocation sites, and serialized state size per channel, recorded in the
+# run trace and the report metadata. Costly; enable only to investigate.
+MEMORY_PROFILING = False
+MEMORY_TOP_ALLOCATIONS = 5
+
+# Per-node CPU profiling (profiling.py): invocations of the listed nodes
+# ("all" for every node) are run under cProfile, or pyinstrument with
+# PROFILER = "sampling", and write their profile and a top-functions summary
+# to PROFILE_DIR/<run_id>/. AGENT_PROFILE=planner,executor and
+# AGENT_PROFILER=sampling override these. Unlisted nodes run unwrapped.
+PROFILE_NODES = []
+PROFILER = "cprofile"
+PROFILE_DIR = "outputs/profiles"
+PROFILE_TOP_FUNCTIONS = 25
+
+# Prometheus-format metrics (metrics.py): node, LLM, search and chart latency,
+# tokens, replans and supervisor rejections. Every run rewrites METRICS_FILE
+# (None to disable); the query service also serves GET /metrics/prometheus.
+METRICS_FILE = "outputs/metrics.prom"
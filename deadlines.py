@@ -0,0 +1,95 @@
+"""Per-query wall-clock deadlines and timeouts for blocking calls.
+
+The deadline of a run is an absolute ``time.time()`` value stored in the
+graph state (so it survives checkpoints). While a node runs, BaseAgent binds
+it to a context variable, which follows the node into the threads that run
+its tool calls; tools use budget() to cap their own timeouts by it.
+"""
+import time
+import threading
+import contextvars
+from typing import Any, Callable, Optional
+
+from config import QUERY_DEADLINE_S
+
+_current: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("deadline", default=None)
+
+# Shortest timeout handed to a call, so an exhausted budget fails fast instead of blocking
+MIN_TIMEOUT_S = 1.0
+
+
+def new_deadline(seconds: Optional[float] = None) -> float:
+    """Return the deadline of a query starting now (defaults to QUERY_DEADLINE_S)."""
+    return time.time() + (QUERY_DEADLINE_S if seconds is None else seconds)
+
+
+def remaining(deadline: Optional[float]) -> Optional[float]:
+    """Seconds until a deadline, or None if there is none."""
+    return None if deadline is None else deadline - time.time()
+
+
+def bind(deadline: Optional[float]) -> contextvars.Token:
+    """Make a deadline the current one for this context; returns a token for reset()."""
+    return _current.set(deadline)
+
+
+def reset(token: contextvars.Token):
+    _current.reset(token)
+
+
+def current() -> Optional[float]:
+    """The deadline bound to this context, if any."""
+    return _current.get()
+
+
+def budget(limit: float) -> float:
+    """
+    Timeout for a call: ``limit`` capped by the time left on the current deadline.
+
+    Args:
+        limit: Timeout of the call when there is plenty of time left
+
+    Returns:
+        Timeout in seconds, never below MIN_TIMEOUT_S
+    """
+    left = remaining(current())
+    if left is None:
+        return limit
+    return max(MIN_TIMEOUT_S, min(limit, left))
+
+
+def run_with_timeout(fn: Callable[[], Any], timeout: float, name: str = "call") -> Any:
+    """
+    Run ``fn`` on a helper thread and wait at most ``timeout`` seconds for it.
+
+    Python threads cannot be killed: on timeout the call keeps running in the
+    background and its result is discarded.
+
+    Args:
+        fn: Function to call
+        timeout: Seconds to wait
+        name: Name used for the thread and in the error message
+
+    Returns:
+        The return value of fn
+
+    Raises:
+        TimeoutError: If fn did not finish in time
+    """
+    outcome = {}
+    context = contextvars.copy_context()
+
+    def target():
+        try:
+            outcome["value"] = context.run(fn)
+        except BaseException as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, name=f"timeout-{name}", daemon=True)
+    thread.start()
+    thread.join(timeout)
+    if thread.is_alive():
+        raise TimeoutError(f"{name} did not finish within {timeout:g}s")
+    if "error" in outcome:
+        raise outcome["error"]
+    return outcome["value"]
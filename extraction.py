@@ -0,0 +1,221 @@
+"""Local extraction of numeric facts from research prose into a columnar table."""
+import re
+import logging
+from typing import Any, Dict, List, Optional, TypedDict
+
+logger = logging.getLogger(__name__)
+
+
+class FactTable(TypedDict):
+    """Columnar table of numeric facts; every column has the same length."""
+    year: List[Optional[int]]
+    value: List[float]
+    unit: List[str]
+    kind: List[str]  # "percent" | "rate" | "currency" | "number"
+    label: List[str]
+    raw: List[str]
+    # The metric a fact belongs to: the words leading up to the first fact of
+    # its sentence; lines without any (e.g. "- 2025: $243.7 billion" bullets)
+    # continue the subject of the line before
+    subject: List[str]
+
+
+COLUMNS = ("year", "value", "unit", "kind", "label", "raw", "subject")
+
+_NUMBER = r"\d{1,3}(?:,\d{3})+(?:\.\d+)?|\d+(?:\.\d+)?"
+_SCALE = r"trillion|billion|million|thousand|tn|bn|mn|[TBMK]"
+
+YEAR_RE = re.compile(r"\b(?:19[5-9]\d|20\d{2})\b")
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+(?=[A-Z0-9$€£¥(\[])|\n+")
+PERCENT_RE = re.compile(rf"(?<![\w.])([-+]?(?:{_NUMBER}))\s?(%|percent\b|per cent\b)", re.IGNORECASE)
+CURRENCY_PREFIX_RE = re.compile(
+    rf"(US\$|\$|€|£|¥|\bUSD|\bEUR|\bGBP|\bJPY)\s?({_NUMBER})(?:\s?({_SCALE})\b)?",
+    re.IGNORECASE,
+)
+CURRENCY_SUFFIX_RE = re.compile(
+    rf"(?<![\w.$€£¥])({_NUMBER})\s?({_SCALE})?\s?(USD|EUR|GBP|JPY|dollars|euros|pounds|yen)\b",
+    re.IGNORECASE,
+)
+# Percentages introduced by these words are growth rates, not shares
+RATE_RE = re.compile(r"\b(?:CAGR|growth|grow(?:s|ing)?|increase[sd]?|decline[sd]?|annual(?:ly)?|rate|YoY)\b", re.IGNORECASE)
+SCALED_NUMBER_RE = re.compile(
+    rf"(?<![\w.$€£¥])({_NUMBER})\s?(trillion|billion|million|thousand)\b(?:\s+([a-z]+))?",
+    re.IGNORECASE,
+)
+# Words after a scaled number that name what is counted ("300 million users");
+# any other word ("1.5 billion by 2030") is not a unit
+COUNT_UNITS = {
+    "users", "people", "customers", "subscribers", "companies", "businesses", "devices", "units",
+    "downloads", "jobs", "workers", "employees", "parameters", "tokens", "queries", "requests",
+}
+
+SCALES = {
+    "trillion": 1e12, "tn": 1e12, "t": 1e12,
+    "billion": 1e9, "bn": 1e9, "b": 1e9,
+    "million": 1e6, "mn": 1e6, "m": 1e6,
+    "thousand": 1e3, "k": 1e3,
+}
+CURRENCIES = {
+    "us$": "USD", "$": "USD", "usd": "USD", "dollars": "USD",
+    "€": "EUR", "eur": "EUR", "euros": "EUR",
+    "£": "GBP", "gbp": "GBP", "pounds": "GBP",
+    "¥": "JPY", "jpy": "JPY", "yen": "JPY",
+}
+
+# Number of words before a fact kept as its label
+_LABEL_WORDS = 6
+
+
+def empty_table() -> FactTable:
+    """Return a table with no rows."""
+    return {column: [] for column in COLUMNS}
+
+
+def _to_float(number: str) -> float:
+    return float(number.replace(",", ""))
+
+
+def _scale(token: Optional[str]) -> float:
+    return SCALES.get(token.lower(), 1.0) if token else 1.0
+
+
+def _label(sentence: str, start: int) -> str:
+    """Use the words just before a fact as a short label for it."""
+    words = re.findall(r"[A-Za-z][\w\-]*", sentence[:start])
+    return " ".join(words[-_LABEL_WORDS:])
+
+
+def _nearest_year(years: List[re.Match], start: int) -> Optional[int]:
+    """Pick the year mentioned closest to a fact within the same sentence."""
+    if not years:
+        return None
+    return int(min(years, key=lambda match: abs(match.start() - start)).group())
+
+
+def extract_facts(text: str) -> FactTable:
+    """
+    Parse percentages, currency amounts and scaled numbers out of prose.
+
+    Amounts are normalised to base units (``$1.5 billion`` -> ``1.5e9`` USD)
+    and paired with the nearest year in the same sentence.
+
+    Args:
+        text: Research output to scan
+
+    Returns:
+        FactTable with one row per distinct fact
+    """
+    table = empty_table()
+    seen = set()
+    subject = ""
+
+    for sentence in SENTENCE_RE.split(text or ""):
+        years = list(YEAR_RE.finditer(sentence))
+        taken: List[range] = []
+        matches = []
+
+        for match in CURRENCY_PREFIX_RE.finditer(sentence):
+            value = _to_float(match.group(2)) * _scale(match.group(3))
+            matches.append((match, value, CURRENCIES[match.group(1).lower()], "currency"))
+        for match in CURRENCY_SUFFIX_RE.finditer(sentence):
+            value = _to_float(match.group(1)) * _scale(match.group(2))
+            matches.append((match, value, CURRENCIES[match.group(3).lower()], "currency"))
+        for match in PERCENT_RE.finditer(sentence):
+            kind = "rate" if RATE_RE.search(_label(sentence, match.start())) else "percent"
+            matches.append((match, _to_float(match.group(1)), "%", kind))
+        for match in SCALED_NUMBER_RE.finditer(sentence):
+            value = _to_float(match.group(1)) * _scale(match.group(2))
+            unit = (match.group(3) or "").lower()
+            matches.append((match, value, unit if unit in COUNT_UNITS else "", "number"))
+
+        if matches:
+            subject = _label(sentence, min(match.start() for match, *_ in matches)) or subject
+        elif re.search(r"[A-Za-z]", sentence):
+            # A heading or prose line introduces whatever the next bullets list
+            subject = _label(sentence, len(sentence))
+
+        for match, value, unit, kind in matches:
+            # Earlier patterns win where matches overlap ("$5 billion" is not also a plain number)
+            if any(match.start() in span or match.end() - 1 in span for span in taken):
+                continue
+            taken.append(range(match.start(), match.end()))
+
+            year = _nearest_year(years, match.start())
+            key = (kind, value, unit, year)
+            if key in seen:
+                continue
+            seen.add(key)
+
+            table["year"].append(year)
+            table["value"].append(value)
+            table["unit"].append(unit)
+            table["kind"].append(kind)
+            table["label"].append(_label(sentence, match.start()))
+            table["raw"].append(match.group(0).strip())
+            table["subject"].append(subject)
+
+    logger.info("[EXTRACTION] Extracted %d numeric facts", len(table["value"]))
+    return table
+
+
+def merge_tables(existing: Optional[FactTable], new: FactTable) -> FactTable:
+    """
+    Append the rows of ``new`` to ``existing``, skipping duplicate facts.
+
+    Args:
+        existing: Table already stored on the state (may be None)
+        new: Freshly extracted table
+
+    Returns:
+        A new merged table
+    """
+    merged = empty_table()
+    seen = set()
+    for table in (existing or empty_table(), new):
+        for row in iter_rows(table):
+            key = (row["kind"], row["value"], row["unit"], row["year"])
+            if key in seen:
+                continue
+            seen.add(key)
+            for column in COLUMNS:
+                merged[column].append(row[column])
+    return merged
+
+
+def iter_rows(table: Optional[FactTable]):
+    """Yield the rows of a table as dictionaries."""
+    if not table:
+        return
+    # Tables checkpointed before the subject column existed lack it
+    missing = [""] * len(table["value"])
+    for values in zip(*(table.get(column, missing) for column in COLUMNS)):
+        yield dict(zip(COLUMNS, values))
+
+
+def format_value(value: float, unit: str) -> str:
+    """Render a normalised value compactly, e.g. ``826.7 billion USD`` or ``28.5 %``."""
+    for word, factor in (("trillion", 1e12), ("billion", 1e9), ("million", 1e6)):
+        if abs(value) >= factor:
+            return f"{value / factor:.4g} {word} {unit}".strip()
+    return f"{value:.4g} {unit}".strip()
+
+
+def format_fact_table(table: Optional[FactTable], max_rows: int = 40) -> str:
+    """
+    Render a fact table as a compact pipe-separated text table for prompts.
+
+    Args:
+        table: Table to render
+        max_rows: Maximum number of rows to include
+
+    Returns:
+        Text table, or an empty string if there are no rows
+    """
+    rows = list(iter_rows(table))[:max_rows]
+    if not rows:
+        return ""
+    lines = ["year | value | kind | label"]
+    for row in rows:
+        year = row["year"] if row["year"] is not None else "-"
+        lines.append(f"{year} | {format_value(row['value'], row['unit'])} | {row['kind']} | {row['label']}")
+    return "\n".join(lines)
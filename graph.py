@@ -1,65 +1,197 @@
 """Graph builder for the multi-agent system."""
 import logging
-from langgraph.graph import StateGraph, START
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional
+from langgraph.graph import StateGraph, START, END
+from langgraph.types import Command
 
+import artifacts
 from state import MessageContext
-from agents import (
-    PlannerAgent,
-    ExecutorAgent,
-    WebResearchAgent,
-    ChartGeneratorAgent,
-    ChartSummarizerAgent,
-    SynthesizerAgent,
-    SupervisorAgent,
-)
+from config import ENABLED_AGENTS, SPECULATIVE_RESEARCH, PARALLEL_CHART_SYNTHESIS
+import agents
 
 logger = logging.getLogger(__name__)
 
+# Agent class names (in the agents package) by node name. Nodes that every
+# graph needs are always added; the others only when listed in enabled_agents.
+# Classes are resolved when the agent is first constructed, so their LLM client
+# imports are only paid for agents that actually run.
+AGENT_CLASSES = {
+    "planner": "PlannerAgent",
+    "supervisor": "SupervisorAgent",
+    "executor": "ExecutorAgent",
+    "web_researcher": "WebResearchAgent",
+    "chart_generator": "ChartGeneratorAgent",
+    "chart_summarizer": "ChartSummarizerAgent",
+    "synthesizer": "SynthesizerAgent",
+}
+CORE_NODES = ("planner", "supervisor", "executor", "synthesizer")
 
-def build_graph():
-    """Build and compile the agent graph."""
+# Agents are shared by every compiled graph in the process
+_agents: Dict[str, Any] = {}
+_agents_lock = threading.Lock()
+
+# Compiled graphs keyed by (enabled agents, structural config, checkpointer),
+# least recently used first; at most GRAPH_CACHE_SIZE are kept
+GRAPH_CACHE_SIZE = 16
+_graph_cache: "OrderedDict[tuple, Any]" = OrderedDict()
+_graph_cache_lock = threading.Lock()
+
+
+def join_chart_and_synthesis(state: Dict[str, Any]) -> Command:
+    """
+    Join node for the parallel finish: merge the chart notes into the final answer.
+    
+    Runs once chart_generator and synthesizer, started together by the
+    executor, have both finished.
+    """
+    chart = artifacts.latest(state.get("artifacts"), "chart")
+    final_answer = state.get("final_answer", "")
+    
+    notes = chart["notes"] if chart else None
+    if notes:
+        final_answer = f"{final_answer}\n\n**Chart:** {notes}"
+    logger.info("[JOIN] Chart and synthesis joined (chart notes: %s)", bool(notes))
+    
+    return Command(
+        update={"final_answer": final_answer, "parallel_finish": False},
+        goto=END,
+    )
+
+
+def get_agent(name: str):
+    """
+    Return the shared agent instance for a node, constructing it on first use.
+    
+    Args:
+        name: Node name, one of AGENT_CLASSES
+    
+    Returns:
+        Agent instance
+    """
+    agent = _agents.get(name)
+    if agent is None:
+        with _agents_lock:
+            agent = _agents.get(name)
+            if agent is None:
+                logger.info("Constructing agent: %s", name)
+                agent = getattr(agents, AGENT_CLASSES[name])()
+                _agents[name] = agent
+    return agent
+
+
+def lazy_node(name: str, method: str = "invoke") -> Callable[[Dict[str, Any]], Any]:
+    """
+    Build a node function that constructs its agent only when the node first runs.
+    
+    Args:
+        name: Node name, one of AGENT_CLASSES
+        method: Agent method to call with the state
+    
+    Returns:
+        Node function
+    """
+    def node(state: Dict[str, Any]):
+        agent = get_agent(name)
+        # Calling the agent runs invoke() under the query deadline (see BaseAgent.__call__)
+        return agent(state) if method == "invoke" else getattr(agent, method)(state)
+    
+    node.__name__ = f"{name}_{method}"
+    return node
+
+
+def enabled_agents_error(enabled_agents: Any) -> Optional[str]:
+    """
+    Check an agent list received from a client (service, worker).
+    
+    Agent sets key the compiled-graph cache, so only lists of known agent
+    names are accepted; anything else would fail deep in graph building or
+    add a cache entry per spelling.
+    
+    Returns:
+        The error message, or None if the list is valid
+    """
+    if (not isinstance(enabled_agents, list)
+            or not all(isinstance(name, str) and name in AGENT_CLASSES for name in enabled_agents)):
+        return f'"enabled_agents" must be a list of agent names: {", ".join(AGENT_CLASSES)}'
+    return None
+
+
+def build_graph(enabled_agents: Optional[Iterable[str]] = None, checkpointer=None):
+    """
+    Return the compiled agent graph for a set of enabled agents.
+    
+    Compiled graphs are cached per enabled-agent set, structural config and
+    checkpointer (the GRAPH_CACHE_SIZE most recently used), so repeated calls
+    are free. Agents are constructed lazily
+    the first time their node runs.
+    
+    Args:
+        enabled_agents: Agents the graph may route to (defaults to ENABLED_AGENTS)
+        checkpointer: Optional LangGraph checkpointer (see checkpointing.py);
+            required to resume failed runs
+    
+    Returns:
+        Compiled graph
+    """
+    enabled = frozenset(ENABLED_AGENTS if enabled_agents is None else enabled_agents)
+    key = (enabled, SPECULATIVE_RESEARCH, PARALLEL_CHART_SYNTHESIS, id(checkpointer))
+    
+    with _graph_cache_lock:
+        graph = _graph_cache.get(key)
+        if graph is None:
+            graph = _compile_graph(enabled, checkpointer)
+            _graph_cache[key] = graph
+            if len(_graph_cache) > GRAPH_CACHE_SIZE:
+                _graph_cache.popitem(last=False)
+        else:
+            _graph_cache.move_to_end(key)
+    return graph
+
+
+def _compile_graph(enabled: frozenset, checkpointer=None):
+    """Build and compile the agent graph (uncached)."""
     logger.info("=" * 80)
     logger.info("BUILDING AGENT GRAPH")
     logger.info("=" * 80)
     
-    # Initialize agents
-    planner = PlannerAgent()
-    supervisor = SupervisorAgent()
-    executor = ExecutorAgent()
-    web_researcher = WebResearchAgent()
-    chart_generator = ChartGeneratorAgent()
-    chart_summarizer = ChartSummarizerAgent()
-    synthesizer = SynthesizerAgent()
-    
     # Build the graph
     flow = StateGraph(MessageContext)
     
-    # Add nodes
-    flow.add_node("planner", planner.invoke)
-    flow.add_node("supervisor", supervisor.invoke)
-    flow.add_node("executor", executor.invoke)
-    flow.add_node("web_researcher", web_researcher.invoke)
-    flow.add_node("chart_generator", chart_generator.invoke)
-    flow.add_node("chart_summarizer", chart_summarizer.invoke)
-    flow.add_node("synthesizer", synthesizer.invoke)
+    # Add nodes; agents are constructed when their node first runs
+    nodes = [name for name in AGENT_CLASSES if name in CORE_NODES or name in enabled]
+    for name in nodes:
+        flow.add_node(name, lazy_node(name))
+    if PARALLEL_CHART_SYNTHESIS and "chart_generator" in enabled:
+        flow.add_node("join", join_chart_and_synthesis)
+        nodes.append("join")
+    if SPECULATIVE_RESEARCH and "web_researcher" in enabled:
+        # Started by the planner next to the supervisor; no outgoing edges
+        flow.add_node("speculative_researcher", lazy_node("web_researcher", "speculate"))
+        nodes.append("speculative_researcher")
     
     # Add edges
     # Start -> planner (creates the initial plan)
     flow.add_edge(START, "planner")
     
-    # Planner -> supervisor (validates the plan before execution)
-    flow.add_edge("planner", "supervisor")
+    # Planner -> supervisor (validates the plan before execution) is routed by
+    # the planner's Command, not a static edge: a static edge would also run
+    # the supervisor after the planner skipped to synthesis at the deadline
     
     # Supervisor routes to either:
     # - executor (if plan approved)
     # - planner (if replanning needed)
     # The routing is handled by Command returns in supervisor.invoke()
     
-    logger.info("Nodes added: planner, supervisor, executor, web_researcher, chart_generator, chart_summarizer, synthesizer")
+    # With PARALLEL_CHART_SYNTHESIS the executor starts chart_generator and
+    # synthesizer together; both route to join, which ends the run
+    
+    logger.info("Nodes added: %s", ", ".join(nodes))
     logger.info("Edges: START -> planner -> supervisor -> [executor | planner]")
     
     # Compile the graph
-    graph = flow.compile()
-    logger.info("Graph compiled successfully")
+    graph = flow.compile(checkpointer=checkpointer)
+    logger.info("Graph compiled successfully (checkpointer: %s)", type(checkpointer).__name__ if checkpointer else None)
     
     return graph
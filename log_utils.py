@@ -0,0 +1,97 @@
+"""Low-overhead logging for the agents' hot path.
+
+Expensive log arguments (plans, LLM replies, tool output) are wrapped in
+payload(): the wrapper is passed to the logger as a %-style argument, so it is
+only serialized when a handler actually emits the record, and then compactly
+and truncated to LOG_PAYLOAD_CHARS. Console banners go through console(),
+which prints nothing in quiet mode.
+
+Quiet mode (QUIET_MODE, or AGENT_QUIET=1 in the environment) is meant for
+batch runs and the servers: no stdout output from the agents, and only
+LOG_PAYLOAD_SAMPLE_RATE of the payloads over the limit are rendered; the rest
+are logged as a one-line summary.
+"""
+import os
+import json
+import random
+from typing import Any, Optional
+
+from config import QUIET_MODE, LOG_PAYLOAD_CHARS, LOG_PAYLOAD_SAMPLE_RATE
+
+_quiet = QUIET_MODE or os.getenv("AGENT_QUIET", "").lower() in ("1", "true", "yes")
+
+
+def is_quiet() -> bool:
+    return _quiet
+
+
+def set_quiet(enabled: bool = True):
+    """Turn quiet mode on or off for the whole process."""
+    global _quiet
+    _quiet = enabled
+
+
+def _render(obj: Any) -> str:
+    if isinstance(obj, str):
+        return obj
+    try:
+        return json.dumps(obj, default=str, ensure_ascii=False)
+    except (TypeError, ValueError):
+        return str(obj)
+
+
+class Payload:
+    """Log argument that is rendered lazily, truncated and (in quiet mode) sampled."""
+
+    __slots__ = ("obj", "limit")
+
+    def __init__(self, obj: Any, limit: int):
+        self.obj = obj
+        self.limit = limit
+
+    def __str__(self) -> str:
+        text = _render(self.obj)
+        if len(text) <= self.limit:
+            return text
+        if _quiet and random.random() >= LOG_PAYLOAD_SAMPLE_RATE:
+            return f"<{type(self.obj).__name__}, {len(text)} chars, not sampled>"
+        return f"{text[:self.limit]}... [{len(text) - self.limit} more chars]"
+
+    __repr__ = __str__
+
+
+def payload(obj: Any, limit: Optional[int] = None) -> Payload:
+    """
+    Wrap a large value for logging, e.g. ``logger.info("Plan: %s", payload(plan))``.
+
+    Args:
+        obj: String or JSON-serialisable value
+        limit: Maximum characters to log (defaults to LOG_PAYLOAD_CHARS)
+
+    Returns:
+        Lazy log argument
+    """
+    return Payload(obj, LOG_PAYLOAD_CHARS if limit is None else limit)
+
+
+def console(title: str, content: Any, limit: Optional[int] = None):
+    """
+    Print a titled block for interactive runs; does nothing in quiet mode.
+
+    Args:
+        title: Block heading
+        content: Text to show
+        limit: Optional maximum characters of content to show
+    """
+    if _quiet:
+        return
+    text = str(content)
+    if limit is not None:
+        text = text[:limit]
+    print(f"\n{'=' * 50}\n{title}:\n{'=' * 50}\n{text}\n{'=' * 50}\n")
+
+
+def say(message: str):
+    """Print a line of CLI output unless in quiet mode."""
+    if not _quiet:
+        print(message)
@@ -1,75 +1,223 @@
-
 """Main entry point for the multi-agent system."""
+import time
+import argparse
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
 from dotenv import load_dotenv
-from langchain.schema import HumanMessage
+from langchain_core.messages import HumanMessage
+from langgraph.types import Command
 
+import artifacts
+import deadlines
+import memory
+import metrics
+import tracing
+from log_utils import say, set_quiet
 from graph import build_graph
-from config import ENABLED_AGENTS
+from config import ENABLED_AGENTS, TRACING_ENABLED
 from output_manager import OutputManager
+from checkpointing import CheckpointStore
 
-load_dotenv(override=True)
+DEFAULT_QUERY = "what is current Growth of AI in 2025 to 2030?, provide statistical data and trends. prepared with chart"
 
 
-def main():
-    """Run the multi-agent system."""
-    output_mgr = OutputManager(output_dir="outputs")
-    graph = build_graph()
-    
-    query = "what is current Growth of AI in 2025 to 2030?, provide statistical data and trends. prepared with chart"
-    
-    print(f"\nExecuting query: {query}\n")
-    
-    state = {
+def initial_state(query: str, enabled_agents: List[str], deadline_s: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Build the input state of a new run.
+
+    Args:
+        query: User query
+        enabled_agents: Agents the run may use
+        deadline_s: Wall-clock budget in seconds (defaults to QUERY_DEADLINE_S)
+
+    Returns:
+        Initial graph state
+    """
+    return {
         "messages": [HumanMessage(content=query)],
         "user_query": query,
-        "enabled_agents": ENABLED_AGENTS,
+        "enabled_agents": enabled_agents,
+        "deadline": deadlines.new_deadline(deadline_s),
     }
-    
+
+
+def save_report(final_state, query: str, output_mgr: OutputManager, run_id: Optional[str] = None) -> str:
+    """
+    Show the final answer and save the markdown report for a finished run.
+
+    Args:
+        final_state: Final graph state
+        query: User query the run answered
+        output_mgr: Output manager to write the report with
+        run_id: Thread id of the run, part of the report's file name
+
+    Returns:
+        Path to the saved report
+    """
+    final_answer = final_state.get("final_answer", "No final answer generated")
+    if final_answer:
+        say(f"\nFinal Answer:\n{final_answer}\n")
+
+    # The chart as recorded by the tool that saved it
+    chart = artifacts.latest(final_state.get("artifacts"), "chart")
+    if chart:
+        chart_path = output_mgr.copy_chart_to_outputs(chart["path"])
+        chart = {**chart, "path": chart_path} if chart_path else None
+
+    # Create metadata
+    metadata = {
+        "enabled_agents": final_state.get("enabled_agents", []),
+        "total_steps": final_state.get("current_step", 0),
+        "chart_generated": chart is not None,
+    }
+    if final_state.get("artifacts"):
+        metadata["artifacts"] = final_state["artifacts"]
+    if final_state.get("speculation_stats"):
+        metadata["speculation"] = final_state["speculation_stats"]
+    if final_state.get("partial"):
+        metadata["partial"] = True
+    if final_state.get("memory_stats"):
+        metadata["memory"] = memory.summarize(final_state["memory_stats"])
+
+    # Save report
+    report_path = output_mgr.save_markdown_report(
+        query=query,
+        final_answer=final_answer,
+        chart=chart,
+        metadata=metadata,
+        partial=bool(final_state.get("partial")),
+        run_id=run_id,
+    )
+
+    say(f"Report saved: {report_path}")
+    if chart:
+        say(f"Chart saved: {chart['path']}")
+
+    return report_path
+
+
+def run_graph(
+    graph,
+    store: CheckpointStore,
+    thread_id: str,
+    state,
+    query: str,
+    on_update: Optional[Callable[[Any], None]] = None,
+    stream_mode: Union[str, List[str]] = "updates",
+    subgraphs: bool = False,
+) -> Tuple[Dict[str, Any], str]:
+    """
+    Run (or resume) a checkpointed graph thread and save its report.
+
+    Args:
+        graph: Compiled graph with the store's checkpointer
+        store: Checkpoint store holding the thread
+        thread_id: Checkpoint thread of this run
+        state: Initial state, or None (or a Command carrying state updates) to
+            continue from the last checkpoint
+        query: User query the run answers
+        on_update: Called with each chunk of graph.stream; with the default
+            stream_mode that is each node's update ({node: update}) as it finishes
+        stream_mode: LangGraph stream mode(s) to pass to graph.stream
+        subgraphs: Also stream from sub-agent graphs (chunks gain a namespace)
+
+    Returns:
+        Final graph state and the path of the saved report
+    """
+    output_mgr = OutputManager(output_dir="outputs")
+    config = store.config(thread_id)
+    # LLM calls anywhere in the run are recorded in the metrics
+    config["callbacks"] = [metrics.MetricsCallbackHandler()]
+    if TRACING_ENABLED:
+        # LLM and tool calls anywhere in the run become child spans
+        config["callbacks"].append(tracing.TracingCallbackHandler())
+
+    started = time.perf_counter()
     try:
-        final_state = graph.invoke(state)
-        
-        final_answer = final_state.get("final_answer", "No final answer generated")
-        if final_answer:
-            print(f"\nFinal Answer:\n{final_answer}\n")
-        
-        # Extract chart information from messages
-        chart_path = None
-        chart_notes = None
-        
-        for msg in final_state.get("messages", []):
-            if hasattr(msg, "name") and msg.name == "chart_generator":
-                chart_path, chart_notes = output_mgr.extract_chart_info(msg.content)
-                if chart_path:
-                    chart_path = output_mgr.copy_chart_to_outputs(chart_path)
-                break
-        
-        # Create metadata
-        metadata = {
-            "enabled_agents": final_state.get("enabled_agents", []),
-            "total_steps": final_state.get("current_step", 0),
-            "chart_generated": chart_path is not None,
-        }
-        
-        # Save report
-        report_path = output_mgr.save_markdown_report(
-            query=query,
-            final_answer=final_answer,
-            chart_path=chart_path,
-            chart_notes=chart_notes,
-            metadata=metadata
-        )
-        
-        print(f"Report saved: {report_path}")
-        if chart_path:
-            print(f"Chart saved: {chart_path}")
-        
-        return final_state
-        
-        
+        with tracing.trace(thread_id, query=query, resumed=state is None or isinstance(state, Command)):
+            for update in graph.stream(state, config, stream_mode=stream_mode, subgraphs=subgraphs):
+                if on_update:
+                    on_update(update)
+        final_state = graph.get_state(config).values
     except Exception as e:
-        print(f"Execution failed: {e}")
+        store.mark(thread_id, "failed")
+        metrics.record_run(time.perf_counter() - started, "failed")
+        say(f"Execution failed: {e}")
+        say(f"Resume from the last completed step with: python main.py --resume {thread_id}")
         raise
 
+    store.mark(thread_id, "completed")
+    report_path = save_report(final_state, query, output_mgr, thread_id)
+    metrics.record_run(time.perf_counter() - started, "partial" if final_state.get("partial") else "completed",
+                       final_state)
+    return final_state, report_path
+
+
+def main(query: str = DEFAULT_QUERY):
+    """Run the multi-agent system."""
+    load_dotenv(override=True)
+    store = CheckpointStore()
+    store.prune()
+    graph = build_graph(ENABLED_AGENTS, checkpointer=store.saver)
+
+    thread_id = store.new_thread(query)
+    say(f"\nExecuting query: {query}\n")
+    say(f"Run id: {thread_id}\n")
+
+    state = initial_state(query, ENABLED_AGENTS)
+    final_state, _ = run_graph(graph, store, thread_id, state, query)
+    return final_state
+
+
+def resume(thread_id: str):
+    """
+    Resume a failed or interrupted run from its last completed node.
+
+    Nodes that already finished are not executed again, so their LLM and
+    search calls are not re-issued. The run gets a fresh QUERY_DEADLINE_S.
+
+    Args:
+        thread_id: Run id printed when the run started
+
+    Returns:
+        Final graph state
+    """
+    load_dotenv(override=True)
+    store = CheckpointStore()
+    run = store.get_run(thread_id)
+    if not run:
+        raise ValueError(f"No checkpointed run with id {thread_id}")
+
+    snapshot = build_graph(checkpointer=store.saver).get_state(store.config(thread_id))
+    if not snapshot.next:
+        say(f"Run {thread_id} already completed.")
+        return snapshot.values
+
+    # Continue on a graph with the same agents the run started with
+    graph = build_graph(snapshot.values.get("enabled_agents"), checkpointer=store.saver)
+
+    say(f"\nResuming run {thread_id} at: {', '.join(snapshot.next)}\n")
+    store.mark(thread_id, "running")
+    # Continue the pending nodes with a fresh time budget
+    resume_input = Command(update={"deadline": deadlines.new_deadline()})
+    final_state, _ = run_graph(graph, store, thread_id, resume_input, run["query"])
+    return final_state
+
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Run the multi-agent data analysis system.")
+    parser.add_argument("query", nargs="?", default=DEFAULT_QUERY, help="Question to answer")
+    parser.add_argument("--resume", metavar="RUN_ID", help="Resume a failed run from its last checkpoint")
+    parser.add_argument("--prune-checkpoints", action="store_true",
+                        help="Delete checkpoints older than the retention window and exit")
+    parser.add_argument("--quiet", action="store_true", help="No console output from the run (production logging)")
+    args = parser.parse_args()
+    if args.quiet:
+        set_quiet()
+
+    if args.prune_checkpoints:
+        print(f"Pruned {CheckpointStore().prune()} runs")
+    elif args.resume:
+        resume(args.resume)
+    else:
+        main(args.query)
@@ -0,0 +1,125 @@
+"""Opt-in memory instrumentation of graph nodes (MEMORY_PROFILING).
+
+For every node invocation BaseAgent records, with NodeMemory:
+
+- process RSS before and after the node,
+- the net Python allocation of the node and its top allocation sites, from
+  tracemalloc snapshots taken around it,
+- the serialized (checkpoint-format) size of each state channel the node
+  receives and of each channel in the update it returns.
+
+Records are set on the node's trace span and appended to the run's
+``memory_stats`` channel, which main.save_report summarises in the report
+metadata. tracemalloc is process-wide, so when nodes run in parallel (chart
+and synthesis) their allocation diffs overlap; RSS and state sizes are exact.
+"""
+import os
+import resource
+import tracemalloc
+from typing import Any, Dict, List, Optional
+
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+
+from config import MEMORY_TOP_ALLOCATIONS
+
+# Frames kept per traced allocation; one is enough to attribute it to a line
+TRACE_FRAMES = 1
+
+_serde = JsonPlusSerializer()
+
+
+def rss_mb() -> float:
+    """Current resident set size in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def serialized_size(value: Any) -> int:
+    """Bytes a value takes in a checkpoint."""
+    try:
+        return len(_serde.dumps_typed(value)[1])
+    except Exception:
+        return len(str(value).encode())
+
+
+def channel_sizes(values: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """Serialized size of each non-empty channel of a state or update."""
+    return {name: serialized_size(value) for name, value in (values or {}).items() if value is not None}
+
+
+class NodeMemory:
+    """Measures one node invocation; use as ``with NodeMemory(state) as mem: ...; mem.record(update)``."""
+
+    def __init__(self, state: Dict[str, Any]):
+        # The records themselves are instrumentation, not state the node works with
+        self.state_bytes = channel_sizes({name: value for name, value in state.items() if name != "memory_stats"})
+
+    def __enter__(self) -> "NodeMemory":
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(TRACE_FRAMES)
+        self.rss_before = rss_mb()
+        self.before = tracemalloc.take_snapshot()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.after = tracemalloc.take_snapshot()
+        self.rss_after = rss_mb()
+        return False
+
+    def record(self, node: str, update: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Summarise the measurement.
+
+        Args:
+            node: Node name
+            update: State update the node returned
+
+        Returns:
+            JSON-serialisable memory record of the node
+        """
+        diff = self.after.compare_to(self.before, "lineno")
+        top: List[str] = [
+            f"{stat.traceback[0].filename}:{stat.traceback[0].lineno} {stat.size_diff / 1024:+.1f} KB"
+            for stat in diff[:MEMORY_TOP_ALLOCATIONS] if stat.size_diff
+        ]
+        update_bytes = channel_sizes(update)
+        return {
+            "node": node,
+            "rss_before_mb": round(self.rss_before, 1),
+            "rss_after_mb": round(self.rss_after, 1),
+            "rss_delta_mb": round(self.rss_after - self.rss_before, 2),
+            "allocated_kb": round(sum(stat.size_diff for stat in diff) / 1024, 1),
+            "top_allocations": top,
+            "state_bytes": self.state_bytes,
+            "update_bytes": update_bytes,
+        }
+
+
+def summarize(records: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Condense a run's memory records for the report metadata.
+
+    Returns:
+        Peak RSS, the largest state seen and, per node, invocations, total
+        RSS growth, net allocation and the largest channel it returned
+    """
+    nodes: Dict[str, Dict[str, Any]] = {}
+    for record in records:
+        node = nodes.setdefault(record["node"], {"calls": 0, "rss_delta_mb": 0.0, "allocated_kb": 0.0,
+                                                 "largest_update": None})
+        node["calls"] += 1
+        node["rss_delta_mb"] = round(node["rss_delta_mb"] + record["rss_delta_mb"], 2)
+        node["allocated_kb"] = round(node["allocated_kb"] + record["allocated_kb"], 1)
+        if record["update_bytes"]:
+            channel, size = max(record["update_bytes"].items(), key=lambda item: item[1])
+            if node["largest_update"] is None or size > node["largest_update"][1]:
+                node["largest_update"] = [channel, size]
+    largest_state = max(records, key=lambda r: sum(r["state_bytes"].values()), default=None)
+    return {
+        "peak_rss_mb": max((r["rss_after_mb"] for r in records), default=None),
+        "largest_state_bytes": largest_state["state_bytes"] if largest_state else {},
+        "nodes": nodes,
+    }
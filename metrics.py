@@ -0,0 +1,255 @@
+"""In-process metrics in Prometheus text format.
+
+Counters and histograms for unattended runs, recorded by hooks in the agents
+and tools:
+
+- BaseAgent.__call__: node latency and node errors,
+- MetricsCallbackHandler (attached by run_graph): LLM latency, requests,
+  tokens and prompt-cache hits per model,
+- tools.web_search and tools.python_repl_tool: search calls and latency,
+  chart (REPL) render time,
+- the supervisor: plan rejections; run_graph: runs, run latency and replans
+  per run.
+
+The registry is process-wide. The query service exposes it at
+``GET /metrics/prometheus``; every run also rewrites METRICS_FILE (a file for
+node_exporter's textfile collector), which for a one-shot ``main.py`` run
+holds that run's numbers.
+"""
+import os
+import time
+import logging
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from config import METRICS_FILE
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0)
+REPLAN_BUCKETS = (0, 1, 2, 3, 5)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(names: Sequence[str], values: Sequence[Any], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Metric:
+    """A named metric with a fixed set of label names."""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(labels)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        return tuple(str(labels.get(name, "")) for name in self.label_names)
+
+    def header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.description}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(Metric):
+    """A monotonically increasing count."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = ()):
+        super().__init__(name, description, labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1, **labels: Any):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        return self.header() + [f"{self.name}{_labels(self.label_names, key)} {_number(value)}"
+                                for key, value in values]
+
+
+class Histogram(Metric):
+    """Observations counted into cumulative buckets, with their sum and count."""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, description: str, labels: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        super().__init__(name, description, labels)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: per-bucket counts (last one is +Inf), sum
+        self._values: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+
+    def observe(self, value: float, **labels: Any):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            else:
+                counts[-1] += 1
+            total[0] += value
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            counts, _ = self._values.get(self._key(labels), ([0], [0.0]))
+            return sum(counts)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, (list(counts), total[0])) for key, (counts, total) in self._values.items())
+        lines = self.header()
+        for key, (counts, total) in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{_number(bound)}"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {_number(total)}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+
+class Registry:
+    """The set of metrics rendered together."""
+
+    def __init__(self):
+        self._metrics: Dict[str, Metric] = {}
+
+    def register(self, metric: Metric) -> Metric:
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, description: str, labels: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, description, labels))
+
+    def histogram(self, name: str, description: str, labels: Sequence[str] = (),
+                  buckets: Sequence[float] = LATENCY_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, description, labels, buckets))
+
+    def render(self) -> str:
+        """All metrics in the Prometheus text exposition format."""
+        lines: List[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+RUNS = REGISTRY.counter("agent_runs_total", "Graph runs by outcome", ["status"])
+RUN_DURATION = REGISTRY.histogram("agent_run_duration_seconds", "Wall time of graph runs")
+RUN_REPLANS = REGISTRY.histogram("agent_run_replans", "Replans per completed run", buckets=REPLAN_BUCKETS)
+NODE_DURATION = REGISTRY.histogram("agent_node_duration_seconds", "Wall time of graph node invocations", ["node"])
+NODE_ERRORS = REGISTRY.counter("agent_node_errors_total", "Node invocations that raised", ["node"])
+SUPERVISOR_REJECTIONS = REGISTRY.counter("agent_supervisor_rejections_total", "Plans sent back to the planner")
+LLM_DURATION = REGISTRY.histogram("agent_llm_request_duration_seconds", "Latency of LLM requests", ["model"])
+LLM_REQUESTS = REGISTRY.counter("agent_llm_requests_total", "LLM requests by outcome", ["model", "status"])
+LLM_TOKENS = REGISTRY.counter("agent_llm_tokens_total", "Tokens reported by the LLM provider",
+                              ["model", "kind"])
+LLM_CACHE_HITS = REGISTRY.counter("agent_llm_cache_hits_total", "LLM requests that read from the prompt cache",
+                                  ["model"])
+SEARCH_CALLS = REGISTRY.counter("agent_search_calls_total", "Web searches by outcome", ["status"])
+SEARCH_DURATION = REGISTRY.histogram("agent_search_duration_seconds", "Latency of web searches")
+CHART_RENDER = REGISTRY.histogram("agent_chart_render_seconds", "Execution time of chart (REPL) code")
+
+
+class MetricsCallbackHandler(BaseCallbackHandler):
+    """Records LLM latency, outcomes, tokens and prompt-cache hits per model."""
+
+    def __init__(self):
+        self._started: Dict[UUID, Tuple[float, str]] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        params = kwargs.get("invocation_params") or {}
+        model = ((metadata or {}).get("ls_model_name") or params.get("model") or params.get("model_name")
+                 or params.get("_type") or "unknown")
+        self._started[run_id] = (time.perf_counter(), model)
+
+    def _finish(self, run_id: UUID, status: str) -> Optional[str]:
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return None
+        start, model = started
+        LLM_DURATION.observe(time.perf_counter() - start, model=model)
+        LLM_REQUESTS.inc(model=model, status=status)
+        return model
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        model = self._finish(run_id, "ok")
+        if model is None:
+            return
+        try:
+            usage = response.generations[0][0].message.usage_metadata or {}
+        except (AttributeError, IndexError):
+            usage = {}
+        for kind in ("input_tokens", "output_tokens"):
+            if usage.get(kind):
+                LLM_TOKENS.inc(usage[kind], model=model, kind=kind.split("_")[0])
+        cache_read = (usage.get("input_token_details") or {}).get("cache_read")
+        if cache_read:
+            LLM_TOKENS.inc(cache_read, model=model, kind="cache_read")
+            LLM_CACHE_HITS.inc(model=model)
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id, "error")
+
+
+def record_run(duration_s: float, status: str, final_state: Optional[Dict[str, Any]] = None):
+    """Count a finished graph run and write METRICS_FILE."""
+    RUNS.inc(status=status)
+    RUN_DURATION.observe(duration_s)
+    if final_state is not None:
+        RUN_REPLANS.observe((final_state.get("replan_attempts") or {}).get("total", 0))
+    if METRICS_FILE:
+        try:
+            write_file(METRICS_FILE)
+        except OSError as e:
+            logger.warning("[METRICS] Could not write %s: %s", METRICS_FILE, e)
+
+
+def write_file(path: str):
+    """Atomically replace ``path`` with the current metrics."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(REGISTRY.render())
+    os.replace(tmp, path)
+
+
+def format_metric(name: str, description: str, kind: str, samples: Iterable[Tuple[Dict[str, Any], float]]) -> str:
+    """Render a metric kept outside the registry (e.g. the service's queue depth) at scrape time."""
+    lines = [f"# HELP {name} {description}", f"# TYPE {name} {kind}"]
+    for labels, value in samples:
+        lines.append(f"{name}{_labels(list(labels), list(labels.values()))} {_number(value)}")
+    return "\n".join(lines) + "\n"
@@ -1,12 +1,22 @@
 """Output manager for saving charts and reports."""
 import os
+import re
 import json
+import hashlib
+import threading
+import uuid
 from datetime import datetime
 from typing import Dict, Any, Optional
 import logging
 
+from artifacts import Artifact
+
 logger = logging.getLogger(__name__)
 
+# Chart file names: "<descriptive slug>_<first HASH_CHARS of the sha256>.<ext>"
+MAX_SLUG_CHARS = 60
+HASH_CHARS = 12
+
 
 class OutputManager:
     """Manages saving charts and markdown reports."""
@@ -22,27 +32,47 @@ class OutputManager:
         os.makedirs(output_dir, exist_ok=True)
         logger.info(f"[OUTPUT_MANAGER] Output directory: {output_dir}")
     
-    def generate_filename(self, prefix: str, extension: str) -> str:
+    def generate_filename(self, prefix: str, extension: str, run_id: Optional[str] = None) -> str:
         """
-        Generate a unique filename with timestamp.
+        Generate a unique filename with timestamp and run id.
+        
+        Runs finish concurrently (service workers, load tests), so the
+        timestamp alone is not unique; the run id (a random one if not given)
+        keeps their files apart.
         
         Args:
             prefix: Prefix for the filename
             extension: File extension (without dot)
+            run_id: Id of the run the file belongs to (e.g. its thread id)
         
         Returns:
             Filename string
         """
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        return f"{prefix}_{timestamp}.{extension}"
+        run_id = re.sub(r"[^A-Za-z0-9_-]+", "_", run_id or uuid.uuid4().hex[:HASH_CHARS])
+        return f"{prefix}_{timestamp}_{run_id}.{extension}"
+    
+    @staticmethod
+    def _write_replace(path: str, data: bytes):
+        """Write a file under a temporary name and rename it into place, so readers never see it half written."""
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            if os.path.exists(tmp_path):
+                os.unlink(tmp_path)
+            raise
     
     def save_markdown_report(
         self,
         query: str,
         final_answer: str,
-        chart_path: Optional[str] = None,
-        chart_notes: Optional[str] = None,
-        metadata: Optional[Dict[str, Any]] = None
+        chart: Optional[Artifact] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        partial: bool = False,
+        run_id: Optional[str] = None
     ) -> str:
         """
         Save a markdown report with the query, answer, and chart.
@@ -50,14 +80,15 @@ class OutputManager:
         Args:
             query: User's original question
             final_answer: Final synthesized answer
-            chart_path: Path to the chart file (if any)
-            chart_notes: Notes about the chart (if any)
+            chart: Record of the chart file (if any), from the run's artifacts
             metadata: Additional metadata to include
+            partial: The run hit its deadline before every step finished
+            run_id: Id of the run (its thread id), part of the file name
         
         Returns:
             Path to the saved markdown file
         """
-        filename = self.generate_filename("report", "md")
+        filename = self.generate_filename("report", "md", run_id)
         filepath = os.path.join(self.output_dir, filename)
         
         # Build markdown content
@@ -75,12 +106,16 @@ class OutputManager:
 
 ## Analysis & Results
 
-{final_answer}
+"""
+        if partial:
+            content += "> **Partial answer:** the time budget ran out before every planned step finished.\n\n"
+        content += f"""{final_answer}
 
 """
         
         # Add chart section if chart exists
-        if chart_path:
+        if chart:
+            chart_path, chart_notes = chart["path"], chart["notes"]
             # Get relative path from outputs directory
             if os.path.exists(chart_path):
                 rel_chart_path = os.path.relpath(chart_path, self.output_dir)
@@ -96,7 +131,8 @@ class OutputManager:
                 content += f"**Chart Summary:** {chart_notes}\n\n"
             
             content += f"![Chart]({rel_chart_path})\n\n"
-            content += f"**Chart File:** `{chart_path}`\n\n"
+            content += (f"**Chart File:** `{chart_path}` "
+                        f"({chart['mime']}, {chart['size']} bytes, sha256 `{chart['sha256'][:12]}`)\n\n")
         
         # Add metadata section
         if metadata:
@@ -117,66 +153,62 @@ class OutputManager:
 """
         
         # Save the file
-        with open(filepath, 'w', encoding='utf-8') as f:
-            f.write(content)
+        self._write_replace(filepath, content.encode("utf-8"))
         
         logger.info(f"[OUTPUT_MANAGER] Saved markdown report: {filepath}")
         return filepath
     
-    def extract_chart_info(self, content: str) -> tuple[Optional[str], Optional[str]]:
+    def save_chart_bytes(self, data: bytes, name: str = "chart", extension: str = "png") -> str:
         """
-        Extract chart path and notes from agent output.
+        Write a rendered chart once, under a name derived from its content.
+        
+        The file name ends in the content hash, so concurrent runs never
+        overwrite each other's charts and an identical chart is not written
+        twice. The file is written to a temporary name and renamed into place.
         
         Args:
-            content: Agent message content
+            data: Encoded image
+            name: Descriptive part of the file name
+            extension: File extension (without dot)
         
         Returns:
-            Tuple of (chart_path, chart_notes)
+            Path of the chart in the outputs directory
         """
-        chart_path = None
-        chart_notes = None
-        
-        if "CHART_PATH:" in content:
-            try:
-                # Extract chart path
-                path_line = [line for line in content.split("\n") if "CHART_PATH:" in line][0]
-                chart_path = path_line.split("CHART_PATH:")[1].strip()
-                
-                # Extract chart notes
-                if "CHART_NOTES:" in content:
-                    notes_line = [line for line in content.split("\n") if "CHART_NOTES:" in line][0]
-                    chart_notes = notes_line.split("CHART_NOTES:")[1].strip()
-                
-                logger.info(f"[OUTPUT_MANAGER] Extracted chart info - Path: {chart_path}, Notes: {chart_notes}")
-            except Exception as e:
-                logger.error(f"[OUTPUT_MANAGER] Error extracting chart info: {e}")
-        
-        return chart_path, chart_notes
+        digest = hashlib.sha256(data).hexdigest()
+        slug = re.sub(r"[^A-Za-z0-9_-]+", "_", name).strip("_")[:MAX_SLUG_CHARS] or "chart"
+        path = os.path.join(self.output_dir, f"{slug}_{digest[:HASH_CHARS]}.{extension}")
+        if os.path.exists(path):
+            return path
+        
+        self._write_replace(path, data)
+        logger.info(f"[OUTPUT_MANAGER] Saved chart: {path}")
+        return path
     
     def copy_chart_to_outputs(self, chart_path: str) -> Optional[str]:
         """
-        Copy chart file to outputs directory.
+        Place a chart file in the outputs directory.
+        
+        Charts already in the outputs directory (saved there by the REPL or by
+        save_chart_bytes) are used in place; others are copied under a
+        content-hash name.
         
         Args:
             chart_path: Original chart path
         
         Returns:
-            New path in outputs directory, or None if failed
+            Path in outputs directory, or None if failed
         """
+        if chart_path and os.path.dirname(os.path.abspath(chart_path)) == os.path.abspath(self.output_dir):
+            return chart_path
         if not chart_path or not os.path.exists(chart_path):
             logger.warning(f"[OUTPUT_MANAGER] Chart file not found: {chart_path}")
             return None
         
         try:
-            import shutil
-            filename = os.path.basename(chart_path)
-            new_path = os.path.join(self.output_dir, filename)
-            
-            # If file already in outputs, just return the path
-            if os.path.abspath(chart_path) == os.path.abspath(new_path):
-                return new_path
-            
-            shutil.copy2(chart_path, new_path)
+            with open(chart_path, "rb") as f:
+                data = f.read()
+            name, extension = os.path.splitext(os.path.basename(chart_path))
+            new_path = self.save_chart_bytes(data, name, extension.lstrip(".") or "png")
             logger.info(f"[OUTPUT_MANAGER] Copied chart to: {new_path}")
             return new_path
         except Exception as e:
@@ -0,0 +1,214 @@
+"""Opt-in CPU profiling of selected graph nodes (PROFILE_NODES).
+
+For CPU-bound slowness (prompt building, JSON parsing, chart rendering,
+report writing) rather than waiting on the LLM or search. Every invocation of
+a profiled node writes, under ``PROFILE_DIR/<run_id>/``:
+
+- ``<n>_<node>.prof``: the cProfile stats (pstats, snakeviz, gprof2dot), and
+- ``<n>_<node>.txt``: the top PROFILE_TOP_FUNCTIONS functions by cumulative time,
+
+or, with PROFILER = "sampling" and pyinstrument installed, a ``.html`` and a
+``.txt`` call tree of the sampling profiler. The profiled node names come from
+PROFILE_NODES or the AGENT_PROFILE environment variable (comma separated,
+"all" for every node); AGENT_PROFILER overrides PROFILER.
+
+Agents listed are wrapped once, when they are constructed; other agents, and
+all agents when profiling is off, run unwrapped. cProfile only sees the thread
+it is enabled in, so tool calls that run on worker threads (REPL timeouts,
+parallel ReAct tool calls) show up as waits in the node that made them.
+Only one node is profiled at a time: a node that starts while another is
+being profiled (the parallel chart_generator and synthesizer) runs
+unprofiled and logs that it did.
+
+Usage:
+    AGENT_PROFILE=planner,chart_generator python main.py "..."
+    python profiling.py summary outputs/profiles/<run_id>          # all nodes of a run
+    python profiling.py summary outputs/profiles/<run_id>/*_executor.prof
+"""
+import os
+import io
+import glob
+import pstats
+import argparse
+import cProfile
+import functools
+import itertools
+import logging
+import threading
+from typing import Any, Callable, Dict, FrozenSet, List
+
+from config import PROFILE_NODES, PROFILER, PROFILE_DIR, PROFILE_TOP_FUNCTIONS
+
+logger = logging.getLogger(__name__)
+
+try:
+    from pyinstrument import Profiler as SamplingProfiler
+except ImportError:
+    SamplingProfiler = None
+
+# Sampling interval of the sampling profiler
+SAMPLE_INTERVAL_S = 0.001
+
+_sequence = itertools.count(1)
+# Held while a node is being profiled
+_active = threading.Lock()
+
+
+def profiled_nodes() -> FrozenSet[str]:
+    """Node names to profile, from AGENT_PROFILE or PROFILE_NODES."""
+    names = os.getenv("AGENT_PROFILE")
+    selected = names.split(",") if names is not None else PROFILE_NODES
+    return frozenset(name.strip() for name in selected if name.strip())
+
+
+def enabled_for(node: str) -> bool:
+    nodes = profiled_nodes()
+    return node in nodes or "all" in nodes
+
+
+def profiler_kind() -> str:
+    kind = os.getenv("AGENT_PROFILER", PROFILER)
+    if kind == "sampling" and SamplingProfiler is None:
+        logger.warning("[PROFILING] pyinstrument is not installed; using cProfile")
+        return "cprofile"
+    return kind
+
+
+def _run_id() -> str:
+    """The graph run (thread) id of the current node, or "adhoc" outside a run."""
+    try:
+        from langgraph.config import get_config
+        return str(get_config()["configurable"].get("thread_id") or "adhoc")
+    except (RuntimeError, KeyError):
+        return "adhoc"
+
+
+def _output_base(node: str) -> str:
+    directory = os.path.join(PROFILE_DIR, _run_id())
+    os.makedirs(directory, exist_ok=True)
+    return os.path.join(directory, f"{next(_sequence):03d}_{node}")
+
+
+def top_functions(stats: pstats.Stats, limit: int = PROFILE_TOP_FUNCTIONS) -> str:
+    """Render the functions with the highest cumulative time."""
+    stream = io.StringIO()
+    stats.stream = stream
+    stats.strip_dirs().sort_stats(pstats.SortKey.CUMULATIVE).print_stats(limit)
+    return stream.getvalue()
+
+
+def _write(path: str, text: str):
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(text)
+
+
+def profiled(invoke: Callable[[Dict[str, Any]], Any], node: str) -> Callable[[Dict[str, Any]], Any]:
+    """
+    Wrap an agent's invoke() so every call is profiled.
+
+    Args:
+        invoke: Bound invoke method of the agent
+        node: Node name, used in the file names
+
+    Returns:
+        The profiling wrapper
+    """
+    import tracing
+
+    kind = profiler_kind()
+
+    @functools.wraps(invoke)
+    def wrapper(state: Dict[str, Any]):
+        # Only one profiler can be active per process; a node that runs while
+        # another is being profiled (parallel branches) runs unprofiled
+        if not _active.acquire(blocking=False):
+            logger.info("[PROFILING] %s not profiled: another node's profile is active", node)
+            return invoke(state)
+        try:
+            if kind == "sampling":
+                profiler = SamplingProfiler(interval=SAMPLE_INTERVAL_S)
+                profiler.start()
+                try:
+                    return invoke(state)
+                finally:
+                    profiler.stop()
+                    _save(tracing, node, ".txt", {
+                        ".html": profiler.output_html,
+                        ".txt": lambda: profiler.output_text(unicode=False, color=False),
+                    })
+            profiler = cProfile.Profile()
+            try:
+                profiler.enable()
+            except ValueError as e:
+                # A profiler started outside this module (e.g. python -m cProfile)
+                logger.info("[PROFILING] %s not profiled: %s", node, e)
+                return invoke(state)
+            try:
+                return invoke(state)
+            finally:
+                profiler.disable()
+                _save(tracing, node, ".prof", {
+                    ".prof": profiler.dump_stats,
+                    ".txt": lambda: top_functions(pstats.Stats(profiler)),
+                })
+        finally:
+            _active.release()
+
+    return wrapper
+
+
+def _save(tracing, node: str, recorded: str, outputs: Dict[str, Callable[..., Any]]):
+    """
+    Write a node's profile files; a failure is logged, never raised into the node.
+
+    Args:
+        tracing: The tracing module
+        node: Node name
+        recorded: Extension of the file recorded on the node's span
+        outputs: Per extension, a function writing the file (given its path; .prof)
+            or returning its text
+    """
+    try:
+        base = _output_base(node)
+        for extension, output in outputs.items():
+            if extension == ".prof":
+                output(base + extension)
+            else:
+                _write(base + extension, output())
+    except (OSError, TypeError, ValueError) as e:
+        logger.warning("[PROFILING] Could not write the %s profile: %s", node, e)
+        return
+    _recorded(tracing, node, base + recorded)
+
+
+def _recorded(tracing, node: str, path: str):
+    logger.info("[PROFILING] %s profile written to %s", node, path)
+    span = tracing.current_span()
+    if span:
+        span.set(profile=path)
+
+
+def summary(paths: List[str], limit: int = PROFILE_TOP_FUNCTIONS) -> str:
+    """Top functions by cumulative time over several .prof files (or run directories)."""
+    files: List[str] = []
+    for path in paths:
+        files.extend(sorted(glob.glob(os.path.join(path, "*.prof"))) if os.path.isdir(path) else [path])
+    if not files:
+        raise FileNotFoundError(f"No .prof files in {', '.join(paths)}")
+    return top_functions(pstats.Stats(*files), limit)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-node CPU profiles")
+    commands = parser.add_subparsers(dest="command", required=True)
+    summary_cmd = commands.add_parser("summary", help="Top functions of .prof files or run directories, combined")
+    summary_cmd.add_argument("paths", nargs="+")
+    summary_cmd.add_argument("--top", type=int, default=PROFILE_TOP_FUNCTIONS)
+    args = parser.parse_args()
+
+    if args.command == "summary":
+        print(summary(args.paths, args.top))
+
+
+if __name__ == "__main__":
+    main()
@@ -3,12 +3,15 @@ from prompts.agent_descriptions import get_agent_descriptions, get_enabled_agent
 from prompts.planner_prompts import build_plan_prompt
 from prompts.executor_prompts import build_executor_prompt
 from prompts.supervisor_prompts import build_supervisor_prompt
+from prompts.context_renderer import count_tokens, render_recent_messages
 from prompts.agent_prompts import (
     agent_system_prompt,
+    build_chart_request,
     WEB_RESEARCH_PROMPT,
     CHART_GENERATOR_PROMPT,
     CHART_SUMMARIZER_PROMPT,
     SYNTHESIZER_INSTRUCTIONS,
+    SYNTHESIZER_PARTIAL_NOTE,
 )
 
 __all__ = [
@@ -17,9 +20,13 @@ __all__ = [
     "build_plan_prompt",
     "build_executor_prompt",
     "build_supervisor_prompt",
+    "count_tokens",
+    "render_recent_messages",
     "agent_system_prompt",
+    "build_chart_request",
     "WEB_RESEARCH_PROMPT",
     "CHART_GENERATOR_PROMPT",
     "CHART_SUMMARIZER_PROMPT",
     "SYNTHESIZER_INSTRUCTIONS",
+    "SYNTHESIZER_PARTIAL_NOTE",
 ]
@@ -36,16 +36,33 @@ You can only generate charts. You are working with a researcher
 colleague.
 1) Use matplotlib to generate charts. Add this import: matplotlib.use('Agg') for non-GUI backend.
 2) Don't display the chart. DO NOT use plt.show().
-3) Save the chart to the 'outputs' directory with a descriptive filename:
-   plt.savefig('outputs/chart_description.png', dpi=300, bbox_inches='tight')
-   Make sure to create the outputs directory if it doesn't exist.
-4) At the very end of your message, output EXACTLY two lines
-   so the summarizer can find them:
-   CHART_PATH: outputs/chart_description.png
-   CHART_NOTES: <one concise sentence summarizing the main insight in the chart>
-Do not include any other trailing text after these two lines.
+3) Save the chart with the save_chart helper that is defined in the REPL (do not call plt.savefig):
+   save_chart('chart_description', notes='<one concise sentence summarizing the main insight in the chart>')
+   It saves the current figure; the tool reports where it was saved.
+4) The data is also available in the REPL as `research_data`, a dict of equal-length
+   column lists: year, value (normalised, e.g. 1.5e9 for $1.5 billion), unit, kind, label.
+5) End with a one-sentence description of the chart.
 """
 
+
+def build_chart_request(chart_request: str, data: str) -> str:
+    """
+    Build the single input message for the chart generator.
+    
+    Args:
+        chart_request: What to chart, as written by the executor
+        data: Data points gathered by earlier research steps
+    
+    Returns:
+        Message content with the request and the data to plot
+    """
+    return (
+        f"Chart request: {chart_request}\n\n"
+        f"Data gathered by the researcher:\n{data or 'No research data available.'}\n\n"
+        "Plot only the data above; do not invent values."
+    )
+
+
 # Chart Summarizer Agent Prompt
 CHART_SUMMARIZER_PROMPT = """
 You can only generate image captions. You are working with a researcher colleague and a chart generator colleague. 
@@ -57,9 +74,11 @@ The summary should be no more than 3 sentences and should not mention the chart
 # Synthesizer Agent Prompt
 SYNTHESIZER_INSTRUCTIONS = """
 You are the Synthesizer. Use the context below to directly 
-answer the user's question. Perform any lightweight calculations, 
-comparisons, or inferences required. Do not invent facts not 
-supported by the context. If data is missing, say what's missing
+answer the user's question. Growth rates (CAGR), percentage changes, 
+projections, totals and rankings are precomputed in the 
+[computed_statistics] block: quote those figures instead of 
+recalculating them, and only do arithmetic they don't cover. 
+Do not invent facts not supported by the context. If data is missing, say what's missing
 and, if helpful, offer a clearly labeled best-effort estimate 
 with assumptions.
 
@@ -70,3 +89,10 @@ the following guidance:
 - If any message contains citations, include them as a brief 'Citations: [...]' line.
 - Keep the output crisp; avoid meta commentary or tool instructions.
 """
+
+# Appended to SYNTHESIZER_INSTRUCTIONS when the run hit its deadline
+SYNTHESIZER_PARTIAL_NOTE = """
+Note: the time budget for this question ran out before every planned step
+finished, so the context may be incomplete. Answer from what is available
+and state briefly that the answer is partial.
+"""
@@ -0,0 +1,123 @@
+"""Compact, token-budgeted rendering of recent messages for prompts."""
+import logging
+from functools import lru_cache
+from typing import List, Optional
+
+import tiktoken
+from langchain_core.messages import BaseMessage
+
+from config import EXECUTOR_CONTEXT_TOKENS, CONTEXT_MESSAGE_CHARS
+
+logger = logging.getLogger(__name__)
+
+# Messages that only echo the plan or its review; the plan itself is already
+# part of every executor prompt, so these are dropped from the context.
+PLAN_ECHO_NAMES = {"initial_plan", "replan", "supervisor"}
+
+# Encoding used by the gpt-4o family
+_ENCODING = "o200k_base"
+
+
+@lru_cache(maxsize=1)
+def _get_encoding() -> Optional[tiktoken.Encoding]:
+    """Load the tokenizer once per process; None if it cannot be loaded."""
+    try:
+        return tiktoken.get_encoding(_ENCODING)
+    except Exception as e:
+        # tiktoken downloads the encoding on first use, which fails offline
+        logger.warning("[CONTEXT] Tokenizer unavailable, estimating tokens instead: %s", e)
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count tokens in a string with the same tokenizer the models use.
+
+    Args:
+        text: Text to measure
+
+    Returns:
+        Number of tokens
+    """
+    encoding = _get_encoding()
+    if encoding is None:
+        return len(text) // 4
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_text(text: str, max_chars: int) -> str:
+    """
+    Collapse whitespace and truncate text to at most ``max_chars`` characters.
+
+    Args:
+        text: Text to shorten
+        max_chars: Maximum number of characters to keep
+
+    Returns:
+        The shortened text, with an ellipsis marker if it was cut
+    """
+    text = " ".join(text.split())
+    if len(text) <= max_chars:
+        return text
+    return text[:max_chars].rstrip() + " …[truncated]"
+
+
+def format_message(msg: BaseMessage, max_chars: int = CONTEXT_MESSAGE_CHARS) -> str:
+    """
+    Format one message as a single compact line: ``[name/role] content``.
+
+    Args:
+        msg: Message to format
+        max_chars: Maximum number of content characters
+
+    Returns:
+        Formatted line
+    """
+    name = getattr(msg, "name", None) or "user"
+    content = msg.content if isinstance(msg.content, str) else str(msg.content)
+    return f"[{name}/{msg.type}] {truncate_text(content, max_chars)}"
+
+
+def render_recent_messages(
+    messages: List[BaseMessage],
+    token_budget: int = EXECUTOR_CONTEXT_TOKENS,
+    max_chars: int = CONTEXT_MESSAGE_CHARS,
+) -> str:
+    """
+    Render the most recent messages into a compact block that fits a token budget.
+
+    Messages are taken newest first so the latest agent output always gets
+    room; plan echoes are skipped. Rendering stops at the first message that
+    would exceed the budget, except for the newest one, which is cut down to
+    fit instead.
+
+    Args:
+        messages: Conversation messages, oldest first
+        token_budget: Maximum number of tokens for the rendered block
+        max_chars: Maximum content characters per message
+
+    Returns:
+        Rendered lines in chronological order, or "(none)"
+    """
+    lines: List[str] = []
+    used = 0
+
+    for msg in reversed(messages or []):
+        if getattr(msg, "name", None) in PLAN_ECHO_NAMES:
+            continue
+
+        line = format_message(msg, max_chars)
+        tokens = count_tokens(line)
+        if used + tokens > token_budget:
+            if lines:
+                break
+            # Newest message alone is over budget: shrink it proportionally
+            line = format_message(msg, max(1, max_chars * token_budget // tokens))
+            tokens = count_tokens(line)
+
+        lines.append(line)
+        used += tokens
+
+    if not lines:
+        return "(none)"
+    return "\n".join(reversed(lines))
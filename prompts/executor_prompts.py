@@ -1,8 +1,9 @@
 """Executor prompt templates."""
 from typing import Dict, Any
-from langchain.schema import HumanMessage
+from langchain_core.messages import HumanMessage
 
 from prompts.agent_descriptions import get_agent_descriptions, get_enabled_agents
+from prompts.context_renderer import render_recent_messages
 from config import MAX_REPLANS
 
 
@@ -48,7 +49,7 @@ def build_executor_prompt(
         plan: The execution plan
         replan_flag: Whether we just replanned
         replan_attempts: Dictionary tracking replan attempts per step
-        recent_messages: Recent messages for context
+        recent_messages: Conversation messages; rendered within EXECUTOR_CONTEXT_TOKENS
         enabled_agents: List of enabled agent names
     
     Returns:
@@ -65,6 +66,7 @@ def build_executor_prompt(
     enabled_for_executor = [a for a in enabled if a in ['web_researcher', 'cortex_researcher', 'chart_generator', 'chart_summarizer', 'synthesizer']]
     agent_enum = '|'.join(sorted(set(enabled_for_executor + ['planner'])))
     agent_list = '`, `'.join(sorted(set(enabled_for_executor + ['planner'])))
+    recent_context = render_recent_messages(recent_messages or [])
     
     executor_prompt = f"""
 You are the **executor** in a multi‑agent system with these agents:
@@ -117,7 +119,8 @@ Context you can rely on:
 - Current step index ......: {current_step}
 - Current plan step .......: {plan_block}
 - Just‑replanned flag .....: {replan_flag}
-- Previous messages .......: {recent_messages[-4:] if recent_messages else []}
+- Previous messages (oldest first):
+{recent_context}
 
 Respond **only** with JSON, no extra text.
 """
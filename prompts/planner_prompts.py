@@ -1,7 +1,7 @@
 """Planner prompt templates."""
 import json
 from typing import Dict, Any
-from langchain.schema import HumanMessage
+from langchain_core.messages import HumanMessage
 
 from prompts.agent_descriptions import get_agent_descriptions, get_enabled_agents
 from config import MAX_REPLANS
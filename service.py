@@ -0,0 +1,571 @@
+"""Local HTTP query service with a bounded request queue and admission control.
+
+Endpoints:
+    POST /query    {"query": "...", "enabled_agents": [...], "timeout": 120}
+                   -> 200 {"run_id", "final_answer", "report_path", "queued_s", "run_s"}
+                   -> 503 with Retry-After when the queue is full
+                   -> 504 when the request's deadline passes first
+    POST /stream   same body (or GET /stream?query=...); admitted like /query,
+                   then answers with server-sent events (see streaming.py)
+                   ending in a "done" or "error" event
+    GET  /health   liveness plus queue depth and in-flight runs
+    GET  /metrics  request counters, latency percentiles and coalescing ratio
+    GET  /metrics/prometheus
+                   the same counters plus node, LLM, search and chart metrics
+                   of the runs (metrics.py), in Prometheus text format
+
+With COALESCE_QUERIES, a /query whose normalized query and agent set match a
+run already queued or in progress does not take a queue slot; it waits for
+that run and gets the same answer and report (marked "coalesced": true).
+The run gets the latest deadline of the requests waiting for it and is only
+skipped once all of them have timed out.
+/stream requests always start their own run so they can report its progress.
+
+At most SERVICE_MAX_IN_FLIGHT graph runs execute at once (each on its own
+thread); up to SERVICE_QUEUE_SIZE more wait in the queue. Everything beyond
+that is rejected immediately, so memory stays bounded under any request rate.
+
+Usage:
+    python service.py [--host 127.0.0.1] [--port 8080] [--quiet]
+"""
+import json
+import math
+import time
+import asyncio
+import argparse
+import logging
+import statistics
+from urllib.parse import parse_qs
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import metrics
+from streaming import STREAM_MODES, format_sse, to_events
+from singleflight import SingleFlight, flight_key
+from log_utils import set_quiet
+from config import (
+    ENABLED_AGENTS,
+    COALESCE_QUERIES,
+    DEADLINE_RESERVE_S,
+    SERVICE_HOST,
+    SERVICE_PORT,
+    SERVICE_MAX_IN_FLIGHT,
+    SERVICE_QUEUE_SIZE,
+    SERVICE_REQUEST_TIMEOUT_S,
+)
+
+logger = logging.getLogger(__name__)
+
+# Largest accepted request body
+MAX_BODY_BYTES = 64 * 1024
+# Completed-run latencies kept for percentiles and Retry-After estimates
+LATENCY_WINDOW = 500
+
+# A client must send its request line, headers and body within this time
+HEADER_TIMEOUT_S = 10.0
+# Largest accepted request head (request line and headers) and header count
+MAX_HEADER_BYTES = 16 * 1024
+MAX_HEADERS = 64
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           408: "Request Timeout", 413: "Payload Too Large", 431: "Request Header Fields Too Large",
+           500: "Internal Server Error", 503: "Service Unavailable", 504: "Gateway Timeout"}
+
+
+class Job:
+    """A query waiting for, or occupying, a graph run slot."""
+
+    def __init__(self, query: str, enabled_agents: List[str], deadline: float, stream: bool = False,
+                 flight: Optional[tuple] = None):
+        self.query = query
+        self.enabled_agents = enabled_agents
+        self.deadline = deadline
+        # Single-flight key this job leads; duplicates wait on its outcome
+        self.flight = flight
+        self.loop = asyncio.get_running_loop()
+        self.future = self.loop.create_future()
+        # Progress events for /stream clients, fed from the run's thread
+        self.events: Optional[asyncio.Queue] = asyncio.Queue() if stream else None
+        self.enqueued_at = time.monotonic()
+        # Requests waiting for the result: the job's own client plus those
+        # coalesced onto it; the job is abandoned once none is left
+        self.waiters = 1
+        self.abandoned = False
+
+    def attach(self, deadline: float):
+        """Add a request coalesced onto this job; the run gets the latest deadline of its waiters."""
+        self.waiters += 1
+        self.deadline = max(self.deadline, deadline)
+
+    def detach(self):
+        """Drop a waiter whose client gave up."""
+        self.waiters -= 1
+        self.abandoned = self.waiters <= 0
+
+    def publish(self, event: Dict[str, Any]):
+        """Queue an event for the streaming client (safe to call from any thread)."""
+        if self.events is not None and not self.abandoned:
+            self.loop.call_soon_threadsafe(self.events.put_nowait, event)
+
+
+class QueryService:
+    """Runs graph queries from a bounded queue on a fixed number of worker threads."""
+
+    def __init__(self, max_in_flight: int = SERVICE_MAX_IN_FLIGHT, queue_size: int = SERVICE_QUEUE_SIZE,
+                 request_timeout: float = SERVICE_REQUEST_TIMEOUT_S):
+        """
+        Open the checkpoint store and compile the default graph.
+
+        Args:
+            max_in_flight: Maximum concurrent graph runs
+            queue_size: Maximum requests waiting for a run slot
+            request_timeout: Default deadline of a request in seconds
+        """
+        from dotenv import load_dotenv
+        from checkpointing import CheckpointStore
+        from graph import build_graph
+
+        load_dotenv(override=True)
+        self.max_in_flight = max_in_flight
+        self.queue_size = queue_size
+        self.request_timeout = request_timeout
+
+        self.store = CheckpointStore()
+        self.store.prune()
+        build_graph(ENABLED_AGENTS, checkpointer=self.store.saver)
+
+        self.queue: Optional[asyncio.Queue] = None
+        self.run_loops: List[asyncio.Task] = []
+        self.executor = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="graph-run")
+        self.in_flight = 0
+        self.started_at = time.time()
+        self.counters = {"accepted": 0, "rejected": 0, "completed": 0, "failed": 0, "timed_out": 0}
+        self.flights = SingleFlight()
+        # Job leading each in-flight key, for coalesced requests to attach to
+        self.flight_jobs: Dict[tuple, Job] = {}
+        self.run_latencies: deque = deque(maxlen=LATENCY_WINDOW)
+        self.queue_latencies: deque = deque(maxlen=LATENCY_WINDOW)
+
+    async def start(self, host: str = SERVICE_HOST, port: int = SERVICE_PORT) -> asyncio.AbstractServer:
+        """Start the run loops and the HTTP listener."""
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self.run_loops = [asyncio.create_task(self._run_loop()) for _ in range(self.max_in_flight)]
+        server = await asyncio.start_server(self._handle_connection, host, port)
+        logger.info("[SERVICE] Listening on %s:%d (in-flight %d, queue %d)",
+                    host, port, self.max_in_flight, self.queue_size)
+        return server
+
+    def close(self):
+        for task in self.run_loops:
+            task.cancel()
+        self.executor.shutdown(wait=False, cancel_futures=True)
+        self.store.close()
+
+    # ------------------------------------------------------------------
+    # Graph runs
+    # ------------------------------------------------------------------
+
+    async def _run_loop(self):
+        """Take jobs off the queue and run them, one at a time per loop."""
+        loop = asyncio.get_running_loop()
+        while True:
+            job = await self.queue.get()
+            try:
+                # Every waiting client already got a 504; do not spend a run slot on it
+                if job.abandoned or time.monotonic() >= job.deadline:
+                    self._finish_flight(job, error=asyncio.TimeoutError("Deadline passed while queued"))
+                    continue
+                self.queue_latencies.append(time.monotonic() - job.enqueued_at)
+                self.in_flight += 1
+                try:
+                    result = await loop.run_in_executor(self.executor, self._run_job, job)
+                except Exception as e:
+                    self.counters["failed"] += 1
+                    job.publish({"event": "error", "message": str(e)})
+                    self._finish_flight(job, error=e)
+                    if not job.future.done():
+                        job.future.set_exception(e)
+                else:
+                    self.counters["completed"] += 1
+                    self.run_latencies.append(result["run_s"])
+                    job.publish({"event": "done", **result})
+                    self._finish_flight(job, result)
+                    if not job.future.done():
+                        job.future.set_result(result)
+                finally:
+                    self.in_flight -= 1
+            finally:
+                self.queue.task_done()
+
+    def _finish_flight(self, job: Job, result: Optional[Dict[str, Any]] = None,
+                       error: Optional[BaseException] = None):
+        """Hand a led job's outcome to the requests coalesced onto it."""
+        if job.flight is not None:
+            self.flight_jobs.pop(job.flight, None)
+            self.flights.finish(job.flight, result, error)
+
+    def _run_job(self, job: Job) -> Dict[str, Any]:
+        """Run one query through the graph (on a worker thread)."""
+        from graph import build_graph
+        from main import initial_state, run_graph
+
+        started = time.monotonic()
+        graph = build_graph(job.enabled_agents, checkpointer=self.store.saver)
+        thread_id = self.store.new_thread(job.query)
+        # The graph gets what is left of the request's deadline, so it can still
+        # answer (partially) before the client gives up
+        state = initial_state(job.query, job.enabled_agents, job.deadline - time.monotonic())
+        if job.events is not None:
+            job.publish({"event": "run_started", "run_id": thread_id})
+            final_state, report_path = run_graph(
+                graph, self.store, thread_id, state, job.query,
+                on_update=lambda chunk: [job.publish(event) for event in to_events(chunk)],
+                stream_mode=STREAM_MODES,
+                subgraphs=True,
+            )
+        else:
+            final_state, report_path = run_graph(graph, self.store, thread_id, state, job.query)
+        return {
+            "run_id": thread_id,
+            "final_answer": final_state.get("final_answer"),
+            "report_path": report_path,
+            "queued_s": round(started - job.enqueued_at, 3),
+            "run_s": round(time.monotonic() - started, 3),
+        }
+
+    def retry_after(self) -> int:
+        """Seconds a rejected client should wait: roughly one queue's worth of runs per slot."""
+        typical_run = statistics.median(self.run_latencies) if self.run_latencies else 30.0
+        return max(1, math.ceil(typical_run * (self.queue.qsize() + 1) / self.max_in_flight))
+
+    # ------------------------------------------------------------------
+    # Endpoints
+    # ------------------------------------------------------------------
+
+    def parse_request(self, body: Dict[str, Any]) -> Tuple[Optional[tuple], Optional[tuple]]:
+        """
+        Validate a query request body.
+
+        Returns:
+            ((query, enabled_agents, timeout), None), or (None, error response)
+        """
+        query = body.get("query")
+        if not isinstance(query, str) or not query.strip():
+            return None, (400, {"error": 'Field "query" must be a non-empty string'}, {})
+        from graph import enabled_agents_error
+
+        enabled_agents = body.get("enabled_agents") or ENABLED_AGENTS
+        agents_error = enabled_agents_error(enabled_agents)
+        if agents_error:
+            return None, (400, {"error": f"Field {agents_error}"}, {})
+        timeout = body.get("timeout")
+        try:
+            timeout = self.request_timeout if timeout is None else float(timeout)
+        except (TypeError, ValueError):
+            timeout = math.nan
+        if not math.isfinite(timeout):
+            return None, (400, {"error": 'Field "timeout" must be a number of seconds'}, {})
+        # Below the reserve kept for the synthesizer, every agent would skip to synthesis
+        if timeout < DEADLINE_RESERVE_S:
+            return None, (400, {"error": f'Field "timeout" must be at least {DEADLINE_RESERVE_S:g} seconds'}, {})
+        return (query, enabled_agents, timeout), None
+
+    def admit(self, query: str, enabled_agents: List[str], timeout: float, stream: bool = False,
+              flight: Optional[tuple] = None) -> Tuple[Optional[Job], Optional[tuple]]:
+        """
+        Queue a query if there is room.
+
+        Args:
+            query: Question to answer
+            enabled_agents: Agents to use
+            timeout: Deadline of the request in seconds
+            stream: Collect progress events for a /stream client
+            flight: Single-flight key the job leads
+
+        Returns:
+            (job, None) when queued, or (None, error response)
+        """
+        if self.queue.full():
+            self.counters["rejected"] += 1
+            return None, (503, {"error": "Too many requests queued"}, {"Retry-After": str(self.retry_after())})
+
+        job = Job(query, enabled_agents, time.monotonic() + timeout, stream, flight)
+        self.queue.put_nowait(job)
+        self.counters["accepted"] += 1
+        return job, None
+
+    async def submit(self, body: Dict[str, Any]) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        """Admit a query (or attach it to an identical one), wait for the result and return a response."""
+        request, error = self.parse_request(body)
+        if error:
+            return error
+        query, enabled_agents, timeout = request
+
+        key = None
+        if COALESCE_QUERIES:
+            key = flight_key(query, enabled_agents)
+            flight, leader = self.flights.acquire(key)
+            if not leader:
+                return await self._await_flight(flight, timeout, self.flight_jobs.get(key))
+
+        job, error = self.admit(query, enabled_agents, timeout, flight=key)
+        if error:
+            # Nothing can have attached yet: the event loop has not yielded since acquire()
+            if key is not None:
+                self.flights.finish(key, error=RuntimeError(error[1]["error"]))
+            return error
+        if key is not None:
+            self.flight_jobs[key] = job
+
+        try:
+            result = await asyncio.wait_for(asyncio.shield(job.future), timeout)
+        except asyncio.TimeoutError:
+            # A started run cannot be interrupted; it finishes and saves its report.
+            # A queued one still runs for the requests coalesced onto it
+            job.detach()
+            self.counters["timed_out"] += 1
+            return 504, {"error": f"No result within {timeout:.3g}s"}, {}
+        except Exception as e:
+            return 500, {"error": str(e)}, {}
+        return 200, result, {}
+
+    async def _await_flight(self, flight, timeout: float,
+                            job: Optional[Job] = None) -> Tuple[int, Dict[str, Any], Dict[str, str]]:
+        """Wait for the run a request was coalesced onto, keeping its job alive until this request's deadline."""
+        if job is not None:
+            job.attach(time.monotonic() + timeout)
+        try:
+            result = await asyncio.wait_for(asyncio.shield(asyncio.wrap_future(flight)), timeout)
+        except asyncio.TimeoutError:
+            if job is not None:
+                job.detach()
+            self.counters["timed_out"] += 1
+            return 504, {"error": f"No result within {timeout:.3g}s"}, {}
+        except Exception as e:
+            return 500, {"error": str(e)}, {}
+        return 200, {**result, "coalesced": True}, {}
+
+    def health(self) -> Dict[str, Any]:
+        return {
+            "status": "ok",
+            "uptime_s": round(time.time() - self.started_at, 1),
+            "in_flight": self.in_flight,
+            "queued": self.queue.qsize(),
+            "capacity": {"in_flight": self.max_in_flight, "queue": self.queue_size},
+        }
+
+    def metrics(self) -> Dict[str, Any]:
+        return {
+            **self.health(),
+            "requests": dict(self.counters),
+            "run_latency_s": _percentiles(self.run_latencies),
+            "queue_latency_s": _percentiles(self.queue_latencies),
+            "coalescing": self.flights.stats(),
+        }
+
+    def prometheus(self) -> str:
+        """The run metrics and the service's own counters in Prometheus text format."""
+        coalescing = self.flights.stats()
+        return "".join([
+            metrics.REGISTRY.render(),
+            metrics.format_metric("agent_service_requests_total", "Query requests by outcome", "counter",
+                                  [({"outcome": outcome}, count) for outcome, count in sorted(self.counters.items())]),
+            metrics.format_metric("agent_service_in_flight", "Graph runs executing", "gauge", [({}, self.in_flight)]),
+            metrics.format_metric("agent_service_queued", "Requests waiting for a run slot", "gauge",
+                                  [({}, self.queue.qsize())]),
+            metrics.format_metric("agent_service_coalesced_requests_total",
+                                  "Requests answered by another request's run", "counter",
+                                  [({}, coalescing["coalesced"])]),
+            metrics.format_metric("agent_service_coalescable_requests_total",
+                                  "Requests eligible for coalescing", "counter", [({}, coalescing["requests"])]),
+        ])
+
+    async def route(self, method: str, path: str, body: bytes) -> Tuple[int, Any, Dict[str, str]]:
+        """Dispatch one request to its endpoint (a str payload is sent as Prometheus text)."""
+        if path == "/health":
+            return (200, self.health(), {}) if method == "GET" else (405, {"error": "Use GET"}, {})
+        if path == "/metrics":
+            return (200, self.metrics(), {}) if method == "GET" else (405, {"error": "Use GET"}, {})
+        if path == "/metrics/prometheus":
+            return (200, self.prometheus(), {}) if method == "GET" else (405, {"error": "Use GET"}, {})
+        if path == "/query":
+            if method != "POST":
+                return 405, {"error": "Use POST"}, {}
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                return 400, {"error": "Body must be JSON"}, {}
+            if not isinstance(payload, dict):
+                return 400, {"error": "Body must be a JSON object"}, {}
+            return await self.submit(payload)
+        return 404, {"error": f"Unknown path {path}"}, {}
+
+    async def stream(self, body: Dict[str, Any], writer: asyncio.StreamWriter) -> Optional[tuple]:
+        """
+        Admit a query and write its progress to the client as server-sent events.
+
+        Returns:
+            An error response if the query was not admitted, otherwise None
+        """
+        request, error = self.parse_request(body)
+        if error:
+            return error
+        job, error = self.admit(*request, stream=True)
+        if error:
+            return error
+
+        writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\n"
+                     b"Cache-Control: no-cache\r\nConnection: close\r\n\r\n")
+        await writer.drain()
+        try:
+            while True:
+                remaining = job.deadline - time.monotonic()
+                try:
+                    event = await asyncio.wait_for(job.events.get(), max(remaining, 0))
+                except asyncio.TimeoutError:
+                    self.counters["timed_out"] += 1
+                    event = {"event": "error", "message": "Deadline exceeded"}
+                writer.write(format_sse(event))
+                await writer.drain()
+                if event["event"] in ("done", "error"):
+                    return None
+        finally:
+            # Stop buffering events once the client is gone or the deadline passed
+            job.abandoned = True
+
+    async def _stream_request(self, method: str, params: str, body: bytes, writer: asyncio.StreamWriter):
+        """Parse a /stream request (GET query string or POST JSON body) and stream it."""
+        if method == "GET":
+            payload = {name: values[0] for name, values in parse_qs(params).items()}
+        elif method == "POST":
+            try:
+                payload = json.loads(body or b"{}")
+            except ValueError:
+                return 400, {"error": "Body must be JSON"}, {}
+            if not isinstance(payload, dict):
+                return 400, {"error": "Body must be a JSON object"}, {}
+        else:
+            return 405, {"error": "Use GET or POST"}, {}
+        return await self.stream(payload, writer)
+
+    @staticmethod
+    async def _read_head(reader: asyncio.StreamReader) -> Tuple[List[str], Dict[str, str], Optional[tuple]]:
+        """
+        Read the request line and headers, up to MAX_HEADER_BYTES and MAX_HEADERS.
+
+        Returns:
+            (request line words, headers, None), or an error response in place of None
+        """
+        too_large = (431, {"error": f"Request head exceeds {MAX_HEADER_BYTES} bytes or {MAX_HEADERS} headers"}, {})
+        try:
+            line = await reader.readline()
+            size = len(line)
+            request_line = line.decode("latin-1").split()
+            headers: Dict[str, str] = {}
+            while True:
+                line = await reader.readline()
+                size += len(line)
+                line = line.decode("latin-1").strip()
+                if not line:
+                    return request_line, headers, None
+                if size > MAX_HEADER_BYTES or len(headers) >= MAX_HEADERS:
+                    return request_line, headers, too_large
+                name, _, value = line.partition(":")
+                headers[name.strip().lower()] = value.strip()
+        except ValueError:
+            # A single line beyond the stream reader's limit
+            return [], {}, too_large
+
+    async def _respond(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter,
+                       request_line: List[str], length: int) -> tuple:
+        """Read the body and handle the request; (None, None, None) when a stream already answered it."""
+        try:
+            body = await asyncio.wait_for(reader.readexactly(length), HEADER_TIMEOUT_S) if length else b""
+        except asyncio.TimeoutError:
+            return 408, {"error": "Request not received in time"}, {}
+        method, (path, _, params) = request_line[0].upper(), request_line[1].partition("?")
+        if path == "/stream":
+            response = await self._stream_request(method, params, body, writer)
+            return response if response is not None else (None, None, None)
+        return await self.route(method, path, body)
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """Serve one HTTP/1.1 request per connection."""
+        try:
+            try:
+                request_line, headers, error = await asyncio.wait_for(self._read_head(reader), HEADER_TIMEOUT_S)
+            except asyncio.TimeoutError:
+                request_line, headers, error = [], {}, (408, {"error": "Request not received in time"}, {})
+
+            if error:
+                status, payload, extra = error
+            elif len(request_line) < 2:
+                status, payload, extra = 400, {"error": "Malformed request line"}, {}
+            else:
+                try:
+                    length = int(headers.get("content-length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    status, payload, extra = 400, {"error": "Content-Length must be a non-negative integer"}, {}
+                elif length > MAX_BODY_BYTES:
+                    status, payload, extra = 413, {"error": f"Body exceeds {MAX_BODY_BYTES} bytes"}, {}
+                else:
+                    status, payload, extra = await self._respond(reader, writer, request_line, length)
+                    if status is None:
+                        return
+
+            if isinstance(payload, str):
+                data, content_type = payload.encode(), metrics.CONTENT_TYPE
+            else:
+                data, content_type = json.dumps(payload, default=str).encode(), "application/json"
+            head = [f"HTTP/1.1 {status} {REASONS.get(status, '')}",
+                    f"Content-Type: {content_type}",
+                    f"Content-Length: {len(data)}",
+                    "Connection: close"]
+            head += [f"{name}: {value}" for name, value in extra.items()]
+            writer.write(("\r\n".join(head) + "\r\n\r\n").encode() + data)
+            await writer.drain()
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError) as e:
+            logger.info("[SERVICE] Dropped connection: %s", e)
+        finally:
+            writer.close()
+
+
+def _percentiles(values) -> Dict[str, Optional[float]]:
+    """Return count, p50, p95 and p99 of a sample (None when empty)."""
+    ordered = sorted(values)
+    if not ordered:
+        return {"count": 0, "p50": None, "p95": None, "p99": None}
+
+    def pick(q: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))], 3)
+
+    return {"count": len(ordered), "p50": pick(0.50), "p95": pick(0.95), "p99": pick(0.99)}
+
+
+async def serve(host: str = SERVICE_HOST, port: int = SERVICE_PORT):
+    """Run the service until cancelled."""
+    service = QueryService()
+    server = await service.start(host, port)
+    print(f"Query service listening on http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        service.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="HTTP query service for the multi-agent system.")
+    parser.add_argument("--host", default=SERVICE_HOST)
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--quiet", action="store_true", help="No console output from the runs (production logging)")
+    args = parser.parse_args()
+    if args.quiet:
+        set_quiet()
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,107 @@
+"""Coalescing of identical concurrent queries.
+
+Concurrent requests with the same normalized query and enabled-agent set share
+one graph run: the first caller (the leader) runs it, later callers attach to
+its future and receive the same result and report.
+"""
+import logging
+import threading
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, FrozenSet, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+FlightKey = Tuple[str, FrozenSet[str]]
+
+
+def normalize_query(query: str) -> str:
+    """Case-fold a query and collapse its whitespace."""
+    return " ".join(query.casefold().split())
+
+
+def flight_key(query: str, enabled_agents: Iterable[str]) -> FlightKey:
+    """Return the key under which identical queries are coalesced."""
+    return normalize_query(query), frozenset(enabled_agents)
+
+
+class SingleFlight:
+    """Tracks in-flight executions by key and lets duplicate callers share them."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights: Dict[FlightKey, Future] = {}
+        self.requests = 0
+        self.executions = 0
+        self.coalesced = 0
+
+    def acquire(self, key: FlightKey) -> Tuple[Future, bool]:
+        """
+        Join the in-flight execution for a key, or become its leader.
+
+        A leader must call finish() with the outcome, whether it succeeds or not.
+
+        Args:
+            key: Flight key (see flight_key)
+
+        Returns:
+            (future, True) for the leader, (future of the existing execution, False) otherwise
+        """
+        with self._lock:
+            self.requests += 1
+            future = self._flights.get(key)
+            if future is not None:
+                self.coalesced += 1
+                logger.info("[SINGLEFLIGHT] Coalesced onto in-flight run: %s", key[0][:80])
+                return future, False
+            future = Future()
+            self._flights[key] = future
+            self.executions += 1
+            return future, True
+
+    def finish(self, key: FlightKey, result: Any = None, error: Optional[BaseException] = None):
+        """
+        Publish the leader's outcome to every caller attached to a key.
+
+        The key is released first, so requests arriving afterwards start a new run.
+        """
+        with self._lock:
+            future = self._flights.pop(key, None)
+        if future is None or future.done():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key: FlightKey, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run ``fn`` unless an identical execution is in flight, then return its result.
+
+        Args:
+            key: Flight key (see flight_key)
+            fn: Function performing the execution
+
+        Returns:
+            (result, coalesced) where coalesced is True if another caller ran fn
+        """
+        future, leader = self.acquire(key)
+        if not leader:
+            return future.result(), True
+        try:
+            result = fn()
+        except BaseException as e:
+            self.finish(key, error=e)
+            raise
+        self.finish(key, result)
+        return result, False
+
+    def stats(self) -> Dict[str, Any]:
+        """Return request, execution and coalescing counts."""
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "coalescing_ratio": round(self.coalesced / self.requests, 4) if self.requests else 0.0,
+                "in_flight": len(self._flights),
+            }
@@ -1,10 +1,138 @@
 """State definitions for the agent system."""
+import logging
+import operator
 from typing import Optional, List, Dict, Any, Annotated
+from langchain_core.messages import (
+    AIMessage,
+    AnyMessage,
+    BaseMessage,
+    HumanMessage,
+    ToolMessage,
+    convert_to_messages,
+)
 from langgraph.graph import MessagesState, add_messages
 
+from config import MAX_STATE_MESSAGES, MAX_STATE_TOKENS
+from artifacts import Artifact
+from extraction import FactTable
+
+logger = logging.getLogger(__name__)
+
+# Longest tool-call argument string kept in a collapsed tool summary
+_TOOL_ARGS_PREVIEW = 120
+
+
+def estimate_tokens(messages: List[BaseMessage]) -> int:
+    """
+    Cheaply estimate the token count of a list of messages.
+
+    Uses the ~4 characters per token rule of thumb; the reducer runs on every
+    state update, so it must not pay for a real tokenizer.
+
+    Args:
+        messages: Messages to measure
+
+    Returns:
+        Approximate number of tokens
+    """
+    return sum(len(str(msg.content)) for msg in messages) // 4
+
+
+def _is_tool_chatter(msg: BaseMessage) -> bool:
+    """Return True for tool results and AI messages that only request tools."""
+    return isinstance(msg, ToolMessage) or (isinstance(msg, AIMessage) and bool(msg.tool_calls))
+
+
+def _collapse_tool_chatter(messages: List[BaseMessage]) -> List[BaseMessage]:
+    """
+    Replace a sub-agent's tool calls and tool results with one summary message.
+
+    The summary is named after the agent that produced the update (the last
+    named, non-tool message) and takes the position of the first tool message.
+
+    Args:
+        messages: Messages returned by a single node update
+
+    Returns:
+        Messages with the tool chatter collapsed
+    """
+    chatter = [msg for msg in messages if _is_tool_chatter(msg)]
+    if not chatter:
+        return messages
+
+    agent_name = next(
+        (msg.name for msg in reversed(messages) if msg.name and not _is_tool_chatter(msg)),
+        "agent",
+    )
+    calls = []
+    for msg in chatter:
+        if isinstance(msg, AIMessage):
+            for call in msg.tool_calls:
+                args = str(call.get("args", {}))
+                if len(args) > _TOOL_ARGS_PREVIEW:
+                    args = args[:_TOOL_ARGS_PREVIEW] + "..."
+                calls.append(f"{call.get('name')}({args})")
+    result_chars = sum(len(str(msg.content)) for msg in chatter if isinstance(msg, ToolMessage))
+    summary = HumanMessage(
+        content=(
+            f"[{agent_name}] made {len(calls)} tool call(s): {'; '.join(calls)}. "
+            f"{result_chars} characters of tool output omitted."
+        ),
+        name=f"{agent_name}_tools",
+    )
+
+    collapsed = []
+    for msg in messages:
+        if not _is_tool_chatter(msg):
+            collapsed.append(msg)
+        elif summary is not None:
+            collapsed.append(summary)
+            summary = None
+
+    logger.debug("[STATE] Collapsed %d tool messages from %s", len(chatter), agent_name)
+    return collapsed
+
+
+def compact_messages(left: List[AnyMessage], right: Any) -> List[AnyMessage]:
+    """
+    Reducer for the ``messages`` channel.
+
+    Works like ``add_messages`` (messages with an existing id replace the old
+    copy instead of being appended), but also collapses sub-agent tool chatter
+    into one summary message per update and enforces ``MAX_STATE_MESSAGES`` and
+    ``MAX_STATE_TOKENS``. The first message (the user's query) is always kept.
+
+    Args:
+        left: Current messages in the state
+        right: Message or messages returned by a node
+
+    Returns:
+        The merged, compacted message list
+    """
+    if not isinstance(right, list):
+        right = [right]
+    right = _collapse_tool_chatter(convert_to_messages(right))
+    merged = add_messages(left, right)
+
+    if len(merged) <= 1:
+        return merged
+
+    head, tail = merged[:1], merged[1:]
+    tokens = estimate_tokens(merged)
+    dropped = 0
+    while len(tail) > 1 and (len(tail) + 1 > MAX_STATE_MESSAGES or tokens > MAX_STATE_TOKENS):
+        tokens -= len(str(tail[0].content)) // 4
+        tail = tail[1:]
+        dropped += 1
+
+    if dropped:
+        logger.info("[STATE] Dropped %d oldest messages to stay within limits", dropped)
+    return head + tail
+
 
 class MessageContext(MessagesState):
     """Extended state for multi-agent communication."""
+    messages: Annotated[List[AnyMessage], compact_messages]
     user_query: Optional[str]
     enabled_agents: Optional[List[str]]
     plan: Optional[List[Dict[int, Dict[str, Any]]]]
@@ -18,3 +146,18 @@ class MessageContext(MessagesState):
     final_answer: Optional[str]
     # Store agent outputs directly for reliable synthesis
     agent_outputs: Optional[Dict[str, str]]  # {"web_researcher": "...", "chart_generator": "..."}
+    # Numeric facts extracted locally from research output (see extraction.py)
+    research_data: Optional[FactTable]
+    # Result of the first research step run while the supervisor validates the
+    # plan (SPECULATIVE_RESEARCH), and how often speculation paid off
+    speculative_research: Optional[Dict[str, Any]]
+    speculation_stats: Optional[Dict[str, int]]
+    # Set while chart_generator and synthesizer run side by side (PARALLEL_CHART_SYNTHESIS)
+    parallel_finish: Optional[bool]
+    # Wall-clock deadline of the query (time.time() value) and whether it cut the run short
+    deadline: Optional[float]
+    partial: Optional[bool]
+    # Per-node memory records (MEMORY_PROFILING); parallel nodes append side by side
+    memory_stats: Annotated[List[Dict[str, Any]], operator.add]
+    # Files produced by tools (charts), recorded by the tool that wrote them
+    artifacts: Annotated[List[Artifact], operator.add]
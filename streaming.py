@@ -0,0 +1,166 @@
+"""Typed progress events for a graph run, as an iterator and as server-sent events.
+
+Events are JSON-serialisable dictionaries with an "event" field:
+
+    run_started    {"run_id"}
+    node_started   {"node"}
+    node_finished  {"node", "error"}
+    plan           {"plan"}                  the planner's (re)plan
+    search_issued  {"query"}                 a web search is about to run
+    chart_ready    {"path"}                  the chart generator saved a chart
+    token          {"node", "text"}          synthesizer output, as it is generated
+    done           {"run_id", "final_answer", "report_path"}
+    error          {"message"}
+
+Nodes and tools publish the search_issued and chart_ready events with emit();
+the others are derived from LangGraph's "tasks", "updates" and "messages"
+stream modes by to_events(). Runs are streamed with subgraphs=True so that
+events emitted by tools inside sub-agents (e.g. the researcher's ReAct loop)
+reach the stream; everything except custom events is taken from the top-level
+graph only.
+"""
+import json
+import queue
+import logging
+import threading
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional
+
+from langgraph.config import get_stream_writer
+
+logger = logging.getLogger(__name__)
+
+# graph.stream modes consumed by to_events()
+STREAM_MODES = ["tasks", "updates", "messages", "custom"]
+
+# Nodes whose LLM output is streamed as token events
+TOKEN_NODES = ("synthesizer",)
+
+
+def emit(event: str, **data: Any):
+    """
+    Publish a custom event to the run's event stream.
+
+    Does nothing when called outside a graph run (e.g. a tool called directly).
+
+    Args:
+        event: Event type
+        **data: Event fields
+    """
+    try:
+        writer = get_stream_writer()
+    # RuntimeError without a runnable context; KeyError inside one that is not
+    # a graph run (a tool's own .invoke())
+    except (RuntimeError, KeyError):
+        return
+    writer({"event": event, **data})
+
+
+def to_events(chunk: Any) -> List[Dict[str, Any]]:
+    """
+    Translate one ``graph.stream(..., stream_mode=STREAM_MODES, subgraphs=True)`` chunk into events.
+
+    Args:
+        chunk: (namespace, mode, payload) tuple yielded by graph.stream
+
+    Returns:
+        Zero or more events
+    """
+    namespace, mode, payload = chunk
+
+    if mode == "custom":
+        return [payload] if isinstance(payload, dict) and "event" in payload else []
+    # Sub-agent internals (ReAct steps) are not part of the event vocabulary
+    if namespace:
+        return []
+
+    if mode == "tasks":
+        if "input" in payload:
+            return [{"event": "node_started", "node": payload["name"]}]
+        return [{"event": "node_finished", "node": payload["name"], "error": payload.get("error")}]
+
+    if mode == "updates":
+        return [
+            {"event": "plan", "plan": update["plan"]}
+            for node, update in payload.items()
+            if node == "planner" and isinstance(update, dict) and update.get("plan")
+        ]
+
+    if mode == "messages":
+        message, metadata = payload
+        # Model output only; this mode also replays the messages a node returns
+        # in its update, and the synthesizer returns its answer as a HumanMessage
+        node = metadata.get("langgraph_node")
+        if node in TOKEN_NODES and message.type in ("ai", "AIMessageChunk") and message.content:
+            return [{"event": "token", "node": node, "text": message.content}]
+    return []
+
+
+@lru_cache(maxsize=1)
+def _default_store():
+    """Checkpoint store shared by stream_events() calls that do not pass one."""
+    from checkpointing import CheckpointStore
+    return CheckpointStore()
+
+
+def stream_events(query: str, enabled_agents: Optional[List[str]] = None, store=None) -> Iterator[Dict[str, Any]]:
+    """
+    Run a query and yield its progress events as they happen.
+
+    The run executes on a background thread; it is checkpointed and its report
+    saved exactly like ``main.main()``. Stopping iteration early does not stop it.
+
+    Args:
+        query: Question to answer
+        enabled_agents: Agents to use (defaults to ENABLED_AGENTS)
+        store: CheckpointStore to run on (defaults to one shared store)
+
+    Yields:
+        Event dictionaries, ending with a "done" or "error" event
+    """
+    from config import ENABLED_AGENTS
+    from graph import build_graph
+    from main import initial_state, run_graph
+
+    enabled_agents = enabled_agents or ENABLED_AGENTS
+    events: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+    store = store or _default_store()
+    thread_id = store.new_thread(query)
+    state = initial_state(query, enabled_agents)
+
+    def run():
+        graph = build_graph(enabled_agents, checkpointer=store.saver)
+        try:
+            final_state, report_path = run_graph(
+                graph, store, thread_id, state, query,
+                on_update=lambda chunk: [events.put(event) for event in to_events(chunk)],
+                stream_mode=STREAM_MODES,
+                subgraphs=True,
+            )
+            events.put({"event": "done", "run_id": thread_id,
+                        "final_answer": final_state.get("final_answer"), "report_path": report_path})
+        except Exception as e:
+            events.put({"event": "error", "message": str(e)})
+
+    yield {"event": "run_started", "run_id": thread_id}
+    threading.Thread(target=run, name=f"stream-{thread_id[:8]}", daemon=True).start()
+    while True:
+        event = events.get()
+        yield event
+        if event["event"] in ("done", "error"):
+            return
+
+
+def format_sse(event: Dict[str, Any]) -> bytes:
+    """Encode an event as one server-sent event frame."""
+    return f"event: {event['event']}\ndata: {json.dumps(event, default=str)}\n\n".encode()
+
+
+if __name__ == "__main__":
+    import sys
+
+    for event in stream_events(" ".join(sys.argv[1:]) or "What is the current growth of AI?"):
+        if event["event"] == "token":
+            print(event["text"], end="", flush=True)
+        else:
+            print(json.dumps(event, default=str))
@@ -0,0 +1,62 @@
+import unittest
+
+from analytics import compute_statistics
+from extraction import empty_table, extract_facts, merge_tables
+
+
+def _table(*rows, unit="USD", kind="currency"):
+    table = empty_table()
+    for year, value, label, subject in rows:
+        for column, cell in zip(("year", "value", "unit", "kind", "label", "raw", "subject"),
+                                (year, value, unit, kind, label, str(value), subject)):
+            table[column].append(cell)
+    return table
+
+
+class ComputeStatisticsTest(unittest.TestCase):
+
+    def test_metrics_sharing_a_unit_are_not_mixed(self):
+        table = extract_facts(
+            "Nvidia revenue was $60.9 billion in 2023. "
+            "The global AI market was valued at $184.0 billion in 2024 and is projected to reach "
+            "$826.7 billion by 2030. Microsoft revenue was $245.1 billion in 2024."
+        )
+        stats = compute_statistics(table)
+
+        self.assertEqual(len(stats["series"]), 1)
+        self.assertEqual([year for year, _ in stats["series"][0]["points"]], [2024, 2030])
+        self.assertEqual(stats["series"][0]["label"], "global AI market was valued at")
+        self.assertEqual(stats["totals"], [])
+
+    def test_conflicting_values_for_a_year_give_no_series(self):
+        table = _table((2023, 10e9, "revenue", "revenue"), (2023, 12e9, "revenue", "revenue"),
+                       (2024, 15e9, "revenue", "revenue"))
+        stats = compute_statistics(table)
+
+        self.assertEqual(stats["series"], [])
+        self.assertEqual(stats["totals"], [])
+
+    def test_distinct_parts_of_one_metric_are_totalled(self):
+        table = _table((2024, 5e9, "from cloud", "revenue"), (2024, 3e9, "from ads", "revenue"))
+        stats = compute_statistics(table)
+
+        self.assertEqual(len(stats["totals"]), 1)
+        self.assertEqual(stats["totals"][0]["sum"], 8e9)
+
+    def test_rankings_do_not_mix_units(self):
+        table = merge_tables(
+            _table((2024, 5e9, "from cloud", "revenue"), (2024, 3e9, "from ads", "revenue")),
+            _table((2024, 40.0, "cloud share", "revenue"), (2024, 25.0, "ads share", "revenue"),
+                   unit="%", kind="percent"),
+        )
+        table = merge_tables(table, _table((2024, 4e9, "from cloud", "revenue"), unit="EUR"))
+        stats = compute_statistics(table)
+
+        self.assertEqual(sorted((r["kind"], r["unit"], len(r["rows"])) for r in stats["rankings"]),
+                         [("currency", "USD", 2), ("percent", "%", 2)])
+        for ranking in stats["rankings"]:
+            self.assertEqual(ranking["label"], "revenue")
+
+
+if __name__ == "__main__":
+    unittest.main()
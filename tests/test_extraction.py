@@ -0,0 +1,28 @@
+import unittest
+
+from extraction import extract_facts, iter_rows
+
+
+class ExtractFactsTest(unittest.TestCase):
+
+    def test_sentence_starting_with_a_year_is_its_own_sentence(self):
+        rows = list(iter_rows(extract_facts(
+            "Cloud revenue was $10 billion in 2024. 2030 forecasts for the ad business reach $40 billion.")))
+
+        self.assertEqual([(row["year"], row["value"]) for row in rows], [(2024, 10e9), (2030, 40e9)])
+        self.assertEqual(rows[0]["subject"], "Cloud revenue was")
+        self.assertEqual(rows[1]["subject"], "forecasts for the ad business reach")
+
+    def test_sentence_starting_with_an_amount_is_its_own_sentence(self):
+        rows = list(iter_rows(extract_facts("Profit was 5% in 2023. $3 billion was invested in 2025.")))
+
+        self.assertEqual([(row["kind"], row["year"]) for row in rows], [("percent", 2023), ("currency", 2025)])
+
+    def test_scaled_number_unit_is_a_known_count_word(self):
+        rows = list(iter_rows(extract_facts("The app reached 300 million users and 1.5 billion by 2030.")))
+
+        self.assertEqual([row["unit"] for row in rows], ["users", ""])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+import time
+import unittest
+
+from langchain_core.messages import HumanMessage
+
+from benchmarks.fakes import FakeBackends, FakeChatModel, SEARCH_RESULTS
+import deadlines
+from config import DEADLINE_RESERVE_S, LLM_TIMEOUT_S
+from log_utils import set_quiet
+
+
+class ReactDeadlineTest(unittest.TestCase):
+
+    def setUp(self):
+        # Each search takes longer than the time left above the reserve
+        self.backends = FakeBackends(search_latency="0.5")
+        self.backends.install()
+        self.addCleanup(FakeBackends.uninstall)
+        set_quiet()
+        self.addCleanup(set_quiet, False)
+
+    def test_researcher_cut_short_returns_search_results_as_partial(self):
+        from agents.web_research_agent import WebResearchAgent
+
+        query = "AI market size 2025 2030"
+        state = {
+            "messages": [HumanMessage(content=query)],
+            "agent_query": query,
+            "deadline": time.time() + DEADLINE_RESERVE_S + 0.3,
+        }
+        update = WebResearchAgent()(state).update
+
+        self.assertTrue(update["partial"])
+        research = update["agent_outputs"]["web_researcher"]
+        self.assertNotEqual(research, query)
+        self.assertIn(SEARCH_RESULTS["results"][0]["title"], research)
+
+    def test_researcher_with_time_left_is_not_partial(self):
+        from agents.web_research_agent import WebResearchAgent
+
+        query = "AI market size 2025 2030"
+        state = {"messages": [HumanMessage(content=query)], "agent_query": query,
+                 "deadline": time.time() + DEADLINE_RESERVE_S + 60}
+        update = WebResearchAgent()(state).update
+
+        self.assertNotIn("partial", update)
+
+    def test_sub_agent_model_calls_get_the_time_left_as_timeout(self):
+        from agents.base_agent import BaseAgent
+
+        model = BaseAgent.react_model(FakeChatModel(agent_type="researcher", backends=self.backends), [])
+        token = deadlines.bind(time.time() + 5)
+        self.addCleanup(deadlines.reset, token)
+
+        timeout = model({}, None).kwargs["timeout"]
+        self.assertLessEqual(timeout, 5)
+        self.assertLess(timeout, LLM_TIMEOUT_S)
+
+
+if __name__ == "__main__":
+    unittest.main()
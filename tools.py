@@ -1,42 +1,183 @@
-from langchain_experimental.utilities import PythonREPL
 from langchain_core.tools import tool, StructuredTool
-from typing import Annotated
-from langchain_tavily import TavilySearch
+from typing import Annotated, Optional
+from functools import lru_cache
+from contextvars import ContextVar
+import io
 import os
-import matplotlib
-matplotlib.use('Agg')  # Use non-interactive backend for thread safety
+import time
+import threading
 
-# Ensure outputs directory exists
-os.makedirs("outputs", exist_ok=True)
+import artifacts
+import deadlines
+import metrics
+from streaming import emit
+from config import REPL_TIMEOUT_S, SEARCH_TIMEOUT_S
+
+# PythonREPL, TavilySearch and matplotlib are imported on first use so that
+# importing this module is cheap and has no side effects.
+
+
+@lru_cache(maxsize=1)
+def get_repl():
+    """Return the shared Python REPL used by python_repl_tool, creating it on first use."""
+    from langchain_experimental.utilities import PythonREPL
+    import matplotlib
+    matplotlib.use('Agg')  # Use non-interactive backend for thread safety
+    return PythonREPL()
+
+
+# The REPL redirects the process-wide sys.stdout while it runs code, so
+# concurrent graph runs take turns executing it
+_repl_lock = threading.Lock()
+
+# Variables for the current run; context variables follow the run into the
+# threads that execute its tool calls, so concurrent runs do not see each other's
+_repl_variables: ContextVar[dict] = ContextVar("repl_variables", default={})
+
+# Resolution of charts rendered with save_chart()
+CHART_DPI = 300
+
+
+def set_repl_variables(**variables):
+    """Make values available as global variables to code run by python_repl_tool in this run."""
+    _repl_variables.set({**_repl_variables.get(), **variables})
+
+
+def _render_png(fig=None) -> bytes:
+    """Render a matplotlib figure (the current one by default) to PNG in memory and close it."""
+    import matplotlib.pyplot as plt
+    figure = fig if fig is not None else plt.gcf()
+    buffer = io.BytesIO()
+    figure.savefig(buffer, format="png", dpi=CHART_DPI, bbox_inches="tight")
+    plt.close(figure)
+    return buffer.getvalue()
+
+
+# Replacement for _render_png (anything taking the figure or None and
+# returning PNG bytes), e.g. a fake renderer installed by the offline benchmarks
+_chart_renderer = None
+
+
+def set_chart_renderer(renderer):
+    """Render save_chart() figures with ``renderer`` instead of matplotlib; None restores matplotlib."""
+    global _chart_renderer
+    _chart_renderer = renderer
+
+
+def _chart_saver(rendered: list):
+    """Build the save_chart() helper of one REPL execution; it collects (name, notes, png bytes) in ``rendered``."""
+    render = _chart_renderer if _chart_renderer is not None else _render_png
+
+    def save_chart(name: str = "chart", notes: Optional[str] = None, fig=None):
+        """Render a matplotlib figure (the current one by default) to PNG in memory and close it."""
+        rendered.append((name, notes, render(fig)))
+
+    return save_chart
 
-repl = PythonREPL()
 
 @tool
 def python_repl_tool(
     code: Annotated[str, "The python code to execute to generate your chart."],
 ):
     """Use this to execute python code. You will be used to execute python code
-    that generates charts. Charts should be saved to the 'outputs' directory.
+    that generates charts. Save charts with save_chart(name, notes).
     This is visible to the user."""
+    produced = []
     try:
         os.makedirs("outputs", exist_ok=True)
         # Inject matplotlib backend setting for thread safety
         setup_code = "import matplotlib\nmatplotlib.use('Agg')\n"
-        result = repl.run(setup_code + code)
+        repl = get_repl()
+        variables = _repl_variables.get()
+        timeout = deadlines.budget(REPL_TIMEOUT_S)
+
+        def execute():
+            # Waits for an earlier execution that is still running past its timeout
+            if not _repl_lock.acquire(timeout=timeout):
+                raise TimeoutError("the REPL is still busy with an earlier execution")
+            started = time.perf_counter()
+            # Under the lock, files that change in outputs/ were written by this code
+            before = artifacts.snapshot("outputs")
+            rendered = []
+            try:
+                repl.globals.update(variables, save_chart=_chart_saver(rendered))
+                return repl.run(setup_code + code)
+            finally:
+                try:
+                    # Recorded when the code finishes, also after the caller timed out
+                    metrics.CHART_RENDER.observe(time.perf_counter() - started)
+                    # Images the code wrote itself (plt.savefig) are recorded from disk ...
+                    for path in artifacts.changed_charts(before, artifacts.snapshot("outputs")):
+                        produced.append(artifacts.describe(path, "chart"))
+                    # ... charts rendered with save_chart() are written once, from memory
+                    for name, notes, data in rendered:
+                        path = _output_manager().save_chart_bytes(data, name)
+                        produced.append(artifacts.describe(path, "chart", notes, data))
+                finally:
+                    _repl_lock.release()
+
+        result = deadlines.run_with_timeout(execute, timeout, "python_repl_tool")
     except BaseException as e:
         return f"Failed to execute. Error: {repr(e)}"
+    for artifact in produced:
+        artifacts.record(artifact)
+        emit("chart_ready", path=artifact["path"])
     result_str = (
         f"Successfully executed:\n```python\n{code}\n```\nStdout: {result}"
     )
+    if produced:
+        result_str += f"\nSaved: {', '.join(artifact['path'] for artifact in produced)}"
     return (
         result_str
         + "\n\nIf you have completed all tasks, respond with FINAL ANSWER."
     )
 
 
+@lru_cache(maxsize=1)
+def _output_manager():
+    from output_manager import OutputManager
+    return OutputManager(output_dir="outputs")
+
+
+# Replacement for Tavily (anything with .invoke(query)), e.g. a fake backend
+# installed by the offline benchmarks
+_search_backend = None
+
+
+def set_search_backend(backend):
+    """Send web searches to ``backend`` instead of Tavily; None restores Tavily."""
+    global _search_backend
+    _search_backend = backend
+
+
+@lru_cache(maxsize=1)
+def _tavily():
+    from langchain_tavily import TavilySearch
+    return TavilySearch(max_results=5)
+
+
+def get_search():
+    """Return the search backend used by web_search (the shared Tavily client by default)."""
+    return _search_backend if _search_backend is not None else _tavily()
+
+
 def web_search(query: str) -> str:
         """Use this to search the web for information."""
-        return TavilySearch(max_results=5).invoke(query)
+        emit("search_issued", query=query)
+        started = time.perf_counter()
+        status = "error"
+        try:
+            result = deadlines.run_with_timeout(
+                lambda: get_search().invoke(query), deadlines.budget(SEARCH_TIMEOUT_S), "web_search"
+            )
+            status = "ok"
+            return result
+        except TimeoutError as e:
+            status = "timeout"
+            return f"Search failed: {e}. Continue with the information you already have."
+        finally:
+            metrics.SEARCH_CALLS.inc(status=status)
+            metrics.SEARCH_DURATION.observe(time.perf_counter() - started)
 
 web_search_tool = StructuredTool.from_function(
     web_search, name="web_research", 
@@ -0,0 +1,324 @@
+"""Structured per-node tracing with a local JSONL span exporter.
+
+Every run is one trace (its trace id is the run id). run_graph opens the root
+span, BaseAgent.__call__ opens one span per node invocation, and
+TracingCallbackHandler adds child spans for each LLM call and tool call
+(web search, REPL execution). Finished spans are appended to
+``TRACE_DIR/<trace_id>.jsonl`` using OpenTelemetry's span field names; when
+the ``opentelemetry`` package is installed they are also recorded through its
+tracer, so any configured OTel exporter receives them.
+
+Usage:
+    python tracing.py list
+    python tracing.py waterfall outputs/traces/<run_id>.jsonl
+    python tracing.py folded outputs/traces/<run_id>.jsonl > run.folded   # flamegraph.pl / speedscope
+"""
+import os
+import json
+import time
+import argparse
+import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from config import TRACING_ENABLED, TRACE_DIR
+
+logger = logging.getLogger(__name__)
+
+try:
+    from opentelemetry import trace as otel_trace
+    _otel_tracer = otel_trace.get_tracer("data-agent")
+except ImportError:
+    otel_trace = None
+    _otel_tracer = None
+
+_current: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("span", default=None)
+_export_lock = threading.Lock()
+
+
+class Span:
+    """A timed operation within a trace."""
+
+    def __init__(self, name: str, trace_id: str, parent: Optional["Span"] = None,
+                 attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = os.urandom(8).hex()
+        self.parent = parent
+        self.attributes: Dict[str, Any] = dict(attributes or {})
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.error: Optional[str] = None
+        self.otel = None
+        if _otel_tracer is not None:
+            context = otel_trace.set_span_in_context(parent.otel) if parent and parent.otel else None
+            self.otel = _otel_tracer.start_span(name, context=context, start_time=self.start_ns)
+
+    def set(self, **attributes: Any):
+        """Add attributes; None values are skipped."""
+        self.attributes.update({key: value for key, value in attributes.items() if value is not None})
+
+    def end(self, error: Optional[BaseException] = None):
+        """Finish the span and export it."""
+        if self.end_ns is not None:
+            return
+        self.end_ns = time.time_ns()
+        if error is not None:
+            self.error = f"{type(error).__name__}: {error}"
+        if self.otel is not None:
+            self.otel.set_attributes({key: _otel_value(value) for key, value in self.attributes.items()})
+            if self.error:
+                self.otel.set_status(otel_trace.Status(otel_trace.StatusCode.ERROR, self.error))
+            self.otel.end(end_time=self.end_ns)
+        _export(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serialize with OpenTelemetry span field names."""
+        return {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "parentSpanId": self.parent.span_id if self.parent else "",
+            "name": self.name,
+            "startTimeUnixNano": self.start_ns,
+            "endTimeUnixNano": self.end_ns,
+            "attributes": self.attributes,
+            "status": {"code": "ERROR", "message": self.error} if self.error else {"code": "OK"},
+        }
+
+
+def _otel_value(value: Any) -> Any:
+    return value if isinstance(value, (str, bool, int, float)) else str(value)
+
+
+def trace_path(trace_id: str) -> str:
+    return os.path.join(TRACE_DIR, f"{trace_id}.jsonl")
+
+
+def _export(span: Span):
+    """Append a finished span to its trace file."""
+    try:
+        line = json.dumps(span.to_dict(), default=str)
+        with _export_lock:
+            os.makedirs(TRACE_DIR, exist_ok=True)
+            with open(trace_path(span.trace_id), "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+    except OSError as e:
+        logger.warning("[TRACING] Could not export span %s: %s", span.name, e)
+
+
+def current_span() -> Optional[Span]:
+    return _current.get()
+
+
+def start_span(name: str, **attributes: Any) -> Optional[Span]:
+    """
+    Start a child of the current span without making it current.
+
+    Returns:
+        The span (end it with span.end()), or None outside a trace
+    """
+    parent = _current.get()
+    if parent is None:
+        return None
+    return Span(name, parent.trace_id, parent, attributes)
+
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Run a block as a child span of the current span.
+
+    Yields None outside a trace, so callers need no tracing checks beyond ``if s:``.
+    """
+    child = start_span(name, **attributes)
+    if child is None:
+        yield None
+        return
+    token = _current.set(child)
+    try:
+        yield child
+    except BaseException as e:
+        child.end(error=e)
+        raise
+    finally:
+        _current.reset(token)
+        child.end()
+
+
+@contextmanager
+def trace(trace_id: str, name: str = "run", **attributes: Any) -> Iterator[Optional[Span]]:
+    """
+    Open the root span of a trace (one per graph run).
+
+    Yields None when TRACING_ENABLED is off.
+    """
+    if not TRACING_ENABLED:
+        yield None
+        return
+    root = Span(name, trace_id, None, attributes)
+    token = _current.set(root)
+    try:
+        yield root
+    except BaseException as e:
+        root.end(error=e)
+        raise
+    finally:
+        _current.reset(token)
+        root.end()
+
+
+class TracingCallbackHandler(BaseCallbackHandler):
+    """Records LLM and tool calls as child spans of the span current when they start."""
+
+    def __init__(self):
+        self._spans: Dict[UUID, Span] = {}
+
+    def _start(self, run_id: UUID, name: str, **attributes: Any):
+        child = start_span(name, **attributes)
+        if child is not None:
+            self._spans[run_id] = child
+
+    def _end(self, run_id: UUID, error: Optional[BaseException] = None, **attributes: Any):
+        child = self._spans.pop(run_id, None)
+        if child is not None:
+            child.set(**attributes)
+            child.end(error)
+
+    def on_chat_model_start(self, serialized, messages, *, run_id, metadata=None, **kwargs):
+        params = kwargs.get("invocation_params") or {}
+        model = (metadata or {}).get("ls_model_name") or params.get("model") or params.get("model_name")
+        prompt_chars = sum(len(str(msg.content)) for batch in messages for msg in batch)
+        self._start(run_id, "llm", model=model, prompt_chars=prompt_chars)
+
+    def on_llm_end(self, response, *, run_id, **kwargs):
+        usage: Dict[str, Any] = {}
+        try:
+            usage = response.generations[0][0].message.usage_metadata or {}
+        except (AttributeError, IndexError):
+            pass
+        cache_read = (usage.get("input_token_details") or {}).get("cache_read")
+        self._end(
+            run_id,
+            input_tokens=usage.get("input_tokens"),
+            output_tokens=usage.get("output_tokens"),
+            cache_read_tokens=cache_read,
+            cache_hit=bool(cache_read) if usage else None,
+        )
+
+    def on_llm_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+    def on_tool_start(self, serialized, input_str, *, run_id, **kwargs):
+        name = (serialized or {}).get("name") or kwargs.get("name") or "tool"
+        self._start(run_id, f"tool:{name}", tool=name, input_bytes=len(str(input_str).encode()))
+
+    def on_tool_end(self, output, *, run_id, **kwargs):
+        content = getattr(output, "content", output)
+        self._end(run_id, output_bytes=len(str(content).encode()))
+
+    def on_tool_error(self, error, *, run_id, **kwargs):
+        self._end(run_id, error)
+
+
+# ----------------------------------------------------------------------
+# Trace viewer
+# ----------------------------------------------------------------------
+
+def load_spans(path: str) -> List[Dict[str, Any]]:
+    """Read the spans of a trace file, ordered by start time."""
+    with open(path, encoding="utf-8") as f:
+        spans = [json.loads(line) for line in f if line.strip()]
+    return sorted(spans, key=lambda s: s["startTimeUnixNano"])
+
+
+def _children(spans: List[Dict[str, Any]]) -> Dict[str, List[Dict[str, Any]]]:
+    children: Dict[str, List[Dict[str, Any]]] = {}
+    for s in spans:
+        children.setdefault(s["parentSpanId"], []).append(s)
+    return children
+
+
+def _label(s: Dict[str, Any]) -> str:
+    attrs = s["attributes"]
+    details = [f"{key}={attrs[key]}" for key in ("model", "input_tokens", "output_tokens", "cache_hit",
+                                                  "output_bytes") if key in attrs]
+    status = " ERROR" if s["status"]["code"] == "ERROR" else ""
+    return s["name"] + (f" ({', '.join(details)})" if details else "") + status
+
+
+def format_waterfall(spans: List[Dict[str, Any]], width: int = 50) -> str:
+    """Render spans as an indented waterfall with offset, duration and a time bar."""
+    if not spans:
+        return "(no spans)"
+    start = min(s["startTimeUnixNano"] for s in spans)
+    total = max(s["endTimeUnixNano"] for s in spans) - start or 1
+    children = _children(spans)
+    ids = {s["spanId"] for s in spans}
+    lines = [f"{'offset':>9} {'duration':>9}  {'timeline':<{width}}  span"]
+
+    def walk(s: Dict[str, Any], depth: int):
+        offset = s["startTimeUnixNano"] - start
+        duration = s["endTimeUnixNano"] - s["startTimeUnixNano"]
+        left = int(offset / total * width)
+        bar = " " * left + "#" * max(1, int(duration / total * width))
+        lines.append(f"{offset / 1e9:8.2f}s {duration / 1e9:8.2f}s  {bar[:width]:<{width}}  "
+                     f"{'  ' * depth}{_label(s)}")
+        for child in children.get(s["spanId"], []):
+            walk(child, depth + 1)
+
+    # Roots, plus orphans whose parent was never exported (e.g. an interrupted run)
+    for s in spans:
+        if not s["parentSpanId"] or s["parentSpanId"] not in ids:
+            walk(s, 0)
+    return "\n".join(lines)
+
+
+def format_folded(spans: List[Dict[str, Any]]) -> str:
+    """Render spans as folded stacks ("run;node:planner;llm <self-time µs>") for flamegraph tools."""
+    by_id = {s["spanId"]: s for s in spans}
+    children = _children(spans)
+    lines = []
+    for s in spans:
+        stack, parent = [s["name"]], by_id.get(s["parentSpanId"])
+        while parent is not None:
+            stack.append(parent["name"])
+            parent = by_id.get(parent["parentSpanId"])
+        duration = s["endTimeUnixNano"] - s["startTimeUnixNano"]
+        child_time = sum(c["endTimeUnixNano"] - c["startTimeUnixNano"] for c in children.get(s["spanId"], []))
+        # Parallel children can overlap and exceed the parent; self time is never negative
+        self_us = max(0, duration - child_time) // 1000
+        if self_us:
+            lines.append(f"{';'.join(reversed(stack))} {self_us}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect traces written by the tracing layer.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("list", help="List trace files, newest first")
+    waterfall = commands.add_parser("waterfall", help="Show a trace as a waterfall")
+    waterfall.add_argument("path")
+    waterfall.add_argument("--width", type=int, default=50)
+    folded = commands.add_parser("folded", help="Print a trace as folded stacks for flame graphs")
+    folded.add_argument("path")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        if not os.path.isdir(TRACE_DIR):
+            return
+        paths = [os.path.join(TRACE_DIR, name) for name in os.listdir(TRACE_DIR) if name.endswith(".jsonl")]
+        for path in sorted(paths, key=os.path.getmtime, reverse=True):
+            print(path)
+    elif args.command == "waterfall":
+        print(format_waterfall(load_spans(args.path), args.width))
+    else:
+        print(format_folded(load_spans(args.path)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""Resident worker: keeps a compiled graph warm and serves queries over a Unix socket.
+
+Running ``python main.py`` pays for interpreter startup, imports, graph
+compilation and agent construction on every query. The worker pays once and
+then answers queries from a thin client.
+
+Protocol (newline-delimited JSON): the client sends one request line and reads
+event lines until a "done" or "error" event.
+
+    -> {"query": "...", "enabled_agents": ["web_researcher", ...]}
+    <- {"event": "accepted", "run_id": "..."}
+    <- {"event": "progress", "node": "planner", "step": 0}
+    <- {"event": "done", "run_id": "...", "report_path": "...", "final_answer": "..."}
+
+With COALESCE_QUERIES, a query identical to one already running (same agents,
+ignoring case and whitespace) gets a "coalesced" event instead of "accepted"
+and then the other run's "done" event.
+
+Usage:
+    python worker.py serve [--socket PATH] [--quiet]
+    python worker.py submit "your question" [--socket PATH]
+"""
+import os
+import sys
+import json
+import socket
+import argparse
+import logging
+import socketserver
+from typing import Any, Dict, Iterator, List, Optional
+
+from config import ENABLED_AGENTS, COALESCE_QUERIES, WORKER_SOCKET
+from singleflight import SingleFlight, flight_key
+from log_utils import set_quiet
+
+logger = logging.getLogger(__name__)
+
+
+class WorkerServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    """Unix socket server holding the checkpoint store and the warm graphs."""
+
+    daemon_threads = True
+
+    def __init__(self, socket_path: str):
+        """
+        Bind the socket, open the checkpoint store and warm up the default graph.
+
+        Args:
+            socket_path: Path of the Unix socket to listen on
+        """
+        from dotenv import load_dotenv
+        from checkpointing import CheckpointStore
+
+        load_dotenv(override=True)
+        _remove_stale_socket(socket_path)
+        super().__init__(socket_path, WorkerHandler)
+
+        self.socket_path = socket_path
+        self.store = CheckpointStore()
+        self.store.prune()
+        self.flights = SingleFlight()
+        warm_up(ENABLED_AGENTS, self.store.saver)
+
+    def server_close(self):
+        super().server_close()
+        self.store.close()
+        if os.path.exists(self.socket_path):
+            os.unlink(self.socket_path)
+
+
+class WorkerHandler(socketserver.StreamRequestHandler):
+    """Handles one client connection: one query, streamed back as events."""
+
+    def setup(self):
+        super().setup()
+        self.connected = True
+
+    def send(self, event: Dict[str, Any]):
+        """Write one event line; a client that hung up does not stop the run."""
+        if not self.connected:
+            return
+        try:
+            self.wfile.write((json.dumps(event, default=str) + "\n").encode())
+            self.wfile.flush()
+        except OSError:
+            self.connected = False
+            logger.info("[WORKER] Client disconnected; run continues")
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            query = request["query"]
+        except (ValueError, KeyError, TypeError):
+            self.send({"event": "error", "message": 'Expected a JSON line with a "query" field'})
+            return
+
+        from graph import enabled_agents_error
+
+        enabled_agents = request.get("enabled_agents") or ENABLED_AGENTS
+        agents_error = enabled_agents_error(enabled_agents)
+        if agents_error:
+            self.send({"event": "error", "message": f"Field {agents_error}"})
+            return
+        flights = self.server.flights
+        key = flight_key(query, enabled_agents)
+        if COALESCE_QUERIES:
+            flight, leader = flights.acquire(key)
+            if not leader:
+                self.send({"event": "coalesced"})
+                try:
+                    result = flight.result()
+                except Exception as e:
+                    self.send({"event": "error", "message": str(e)})
+                else:
+                    self.send(result)
+                logger.info("[WORKER] Coalescing: %s", flights.stats())
+                return
+
+        try:
+            result = self.run(query, enabled_agents)
+        except Exception as e:
+            if COALESCE_QUERIES:
+                flights.finish(key, error=e)
+            self.send({"event": "error", "message": str(e)})
+            return
+        if COALESCE_QUERIES:
+            flights.finish(key, result)
+        self.send(result)
+
+    def run(self, query: str, enabled_agents) -> Dict[str, Any]:
+        """Run one query, streaming its progress to this client, and return the "done" event."""
+        from graph import build_graph
+        from main import initial_state, run_graph
+
+        store = self.server.store
+        graph = build_graph(enabled_agents, checkpointer=store.saver)
+        thread_id = store.new_thread(query)
+        self.send({"event": "accepted", "run_id": thread_id})
+
+        state = initial_state(query, enabled_agents)
+
+        def on_update(update: Dict[str, Any]):
+            for node, values in update.items():
+                step = values.get("current_step") if isinstance(values, dict) else None
+                self.send({"event": "progress", "node": node, "step": step})
+
+        # Runs execute concurrently, one per connection thread; the shared
+        # Python REPL serializes its own executions (tools._repl_lock)
+        logger.info("[WORKER] Running %s: %s", thread_id, query)
+        final_state, report_path = run_graph(graph, store, thread_id, state, query, on_update)
+
+        return {
+            "event": "done",
+            "run_id": thread_id,
+            "report_path": report_path,
+            "final_answer": final_state.get("final_answer"),
+        }
+
+
+def warm_up(enabled_agents: List[str], checkpointer=None):
+    """
+    Compile the graph and construct its agents and tools before the first query.
+
+    Args:
+        enabled_agents: Agents of the graph to warm up
+        checkpointer: Checkpointer the runs will use
+    """
+    import graph
+    import tools
+
+    graph.build_graph(enabled_agents, checkpointer=checkpointer)
+    for name in graph.AGENT_CLASSES:
+        if name in graph.CORE_NODES or name in enabled_agents:
+            graph.get_agent(name)
+    if "chart_generator" in enabled_agents:
+        tools.get_repl()
+    if "web_researcher" in enabled_agents:
+        tools.get_search()
+    logger.info("[WORKER] Warmed up agents: %s", ", ".join(enabled_agents))
+
+
+def _remove_stale_socket(socket_path: str):
+    """Delete a socket file left behind by a dead worker; refuse if one is still listening."""
+    if not os.path.exists(socket_path):
+        directory = os.path.dirname(socket_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        return
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except OSError:
+            os.unlink(socket_path)
+            return
+    raise RuntimeError(f"A worker is already listening on {socket_path}")
+
+
+def serve(socket_path: str = WORKER_SOCKET):
+    """Run the worker until interrupted."""
+    with WorkerServer(socket_path) as server:
+        print(f"Worker listening on {socket_path}")
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+
+
+def submit(query: str, socket_path: str = WORKER_SOCKET,
+           enabled_agents: Optional[List[str]] = None) -> Iterator[Dict[str, Any]]:
+    """
+    Send a query to a running worker and yield its events as they arrive.
+
+    Args:
+        query: Question to answer
+        socket_path: Socket of the worker
+        enabled_agents: Agents to use (defaults to the worker's ENABLED_AGENTS)
+
+    Yields:
+        Event dictionaries, ending with a "done" or "error" event
+    """
+    request = {"query": query}
+    if enabled_agents:
+        request["enabled_agents"] = enabled_agents
+
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conn:
+        conn.connect(socket_path)
+        conn.sendall((json.dumps(request) + "\n").encode())
+        with conn.makefile("r", encoding="utf-8") as lines:
+            for line in lines:
+                event = json.loads(line)
+                yield event
+                if event["event"] in ("done", "error"):
+                    return
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Resident worker for the multi-agent system.")
+    parser.add_argument("--socket", default=WORKER_SOCKET, help="Unix socket path")
+    commands = parser.add_subparsers(dest="command", required=True)
+    serve_parser = commands.add_parser("serve", help="Start the worker")
+    serve_parser.add_argument("--quiet", action="store_true", help="No console output from the runs (production logging)")
+    submit_parser = commands.add_parser("submit", help="Send a query to a running worker")
+    submit_parser.add_argument("query", help="Question to answer")
+    submit_parser.add_argument("--agents", nargs="+", help="Enabled agents for this query")
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        if args.quiet:
+            set_quiet()
+        serve(args.socket)
+        return
+
+    try:
+        for event in submit(args.query, args.socket, args.agents):
+            if event["event"] == "accepted":
+                print(f"Run id: {event['run_id']}")
+            elif event["event"] == "coalesced":
+                print("Attached to an identical query that is already running")
+            elif event["event"] == "progress":
+                print(f"  {event['node']} (step {event['step']})")
+            elif event["event"] == "done":
+                print(f"\nFinal Answer:\n{event['final_answer']}\n")
+                print(f"Report saved: {event['report_path']}")
+            else:
+                print(f"Execution failed: {event['message']}", file=sys.stderr)
+                sys.exit(1)
+    except (FileNotFoundError, ConnectionRefusedError):
+        print(f"No worker listening on {args.socket}; start one with: python worker.py serve", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()